@@ -4,6 +4,7 @@ from .config import Config
 from .models import User
 from .database import Database
 from .auth_service import AuthService
+from . import http_caching, metrics, warmup
 import os
 
 login_manager = LoginManager()
@@ -15,9 +16,10 @@ def create_app():
 
     # Initialize extensions
     login_manager.init_app(app)
-    
-    # Initialize database
-    Database()  # This will create tables if they don't exist
+    # Before http_caching so request timings include response compression
+    metrics.init_app(app)
+    http_caching.init_app(app)
+    warmup.init_app(app)
 
     # Create necessary directories
     os.makedirs(os.path.join(app.instance_path, 'temp'), exist_ok=True)
@@ -27,13 +29,28 @@ def create_app():
     from .auth.routes import auth_bp
     from .main.routes import main_bp
     from .friends.routes import friends_bp
+    from .leaderboard.routes import leaderboard_bp
+    from .admin.routes import admin_bp
     from app.forum import routes as forum_routes
     
     app.register_blueprint(auth_bp)
     app.register_blueprint(main_bp)
     app.register_blueprint(friends_bp)
+    app.register_blueprint(leaderboard_bp)
+    app.register_blueprint(admin_bp)
     app.register_blueprint(forum_routes.forum_bp, url_prefix='/forum')
 
+    @app.template_filter('datetimeformat')
+    def datetimeformat(value, format='%Y-%m-%d %H:%M:%S'):
+        if value is None:
+            return ""
+        return value.strftime(format)
+
+    @app.cli.command('init-db')
+    def init_db():
+        """Create the database and tables (otherwise done on first use)"""
+        Database()
+
     return app
 
 @login_manager.user_loader
@@ -0,0 +1,72 @@
+import os
+from functools import wraps
+from flask import Blueprint, render_template, request, redirect, url_for, flash, abort, send_file
+from flask_login import login_required, current_user
+from app.config import Config
+from app.database import Database
+from app.profiling import profile_sample_rate
+
+admin_bp = Blueprint('admin', __name__)
+
+def admin_required(view):
+    """Restrict a view to users listed in ADMIN_USERNAMES"""
+    @wraps(view)
+    @login_required
+    def wrapper(*args, **kwargs):
+        if not current_user.is_admin:
+            abort(403)
+        return view(*args, **kwargs)
+    return wrapper
+
+@admin_bp.route('/admin/ingest-profiles')
+@admin_required
+def ingest_profiles():
+    """Compare the slowest recently profiled ingests stage by stage"""
+    db = Database()
+    days = request.args.get('days', 7, type=int)
+    profiles = db.get_slowest_ingests(days=days)
+
+    # Columns in first-seen order so stages line up across rows
+    stages, parser_stages = {}, {}
+    for profile in profiles:
+        stages.update(dict.fromkeys(profile['stages']))
+        parser_stages.update(dict.fromkeys(profile['parser_stages']))
+
+    return render_template('admin/ingest_profiles.html',
+                         profiles=profiles,
+                         stages=list(stages),
+                         parser_stages=list(parser_stages),
+                         days=days,
+                         sample_rate=profile_sample_rate(db),
+                         sample_rate_overridden=db.get_setting('ingest_profile_rate') is not None,
+                         default_rate=Config.INGEST_PROFILE_RATE)
+
+@admin_bp.route('/admin/ingest-profiles/sampling', methods=['POST'])
+@admin_required
+def set_profile_sampling():
+    """Change the fraction of uploads that are profiled, or reset it to the config default"""
+    db = Database()
+    if request.form.get('reset'):
+        db.set_setting('ingest_profile_rate', None)
+        flash('Profiling sample rate reset to the configured default.', 'success')
+    else:
+        try:
+            rate = float(request.form.get('rate', ''))
+        except ValueError:
+            rate = -1
+        if not 0 <= rate <= 1:
+            flash('Sample rate must be between 0 and 1.', 'danger')
+        else:
+            db.set_setting('ingest_profile_rate', str(rate))
+            flash(f'Profiling {rate:.0%} of uploads.', 'success')
+    return redirect(url_for('admin.ingest_profiles'))
+
+@admin_bp.route('/admin/ingest-profiles/<int:file_id>.prof')
+@admin_required
+def download_profile(file_id):
+    """Download the cProfile capture of an ingest"""
+    profile_path = Database().get_ingest_profile_path(file_id)
+    if not profile_path or not os.path.exists(profile_path):
+        abort(404)
+    return send_file(os.path.abspath(profile_path), as_attachment=True,
+                     download_name=os.path.basename(profile_path))
@@ -0,0 +1,150 @@
+import math
+import os
+import threading
+import time
+from typing import Optional
+from .config import Config
+from .metrics import Metrics
+
+MB = 1024 * 1024
+
+def available_memory() -> Optional[int]:
+    """Bytes of memory the kernel could hand out without swapping, if known"""
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (ValueError, OSError, AttributeError):
+        return None
+
+def estimate_parse_memory(file_size: int) -> int:
+    """Rough peak bytes one parser process needs for a save of this size"""
+    return Config.PARSE_MEMORY_BASE_MB * MB + int(file_size * Config.PARSE_MEMORY_FACTOR)
+
+class IngestBusy(RuntimeError):
+    """Raised when a parse cannot be admitted; `retry_after` is a hint in seconds"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class _Slot:
+    """An admitted parse's reservation, released on exit"""
+
+    def __init__(self, controller: Optional['AdmissionController'], reserved: int):
+        self._controller = controller
+        self._reserved = reserved
+        self._start = time.monotonic()
+        self._released = False
+
+    def release(self) -> None:
+        if not self._released and self._controller:
+            self._released = True
+            self._controller._release(self._reserved, time.monotonic() - self._start)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+        return False
+
+class AdmissionController:
+    """Caps concurrent parses by the memory they are estimated to need
+
+    Each parse reserves estimate_parse_memory(file size) from a budget of
+    ADMISSION_MEMORY_MB, and only starts while the machine still has
+    ADMISSION_HEADROOM_MB available besides, which also accounts for other
+    worker processes. Uploads that do not fit wait up to
+    ADMISSION_QUEUE_TIMEOUT in a queue of at most ADMISSION_MAX_QUEUED, and
+    are otherwise turned away with IngestBusy and a retry hint. A parse
+    is always admitted when no other is running, even if it exceeds the
+    budget or the headroom.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(AdmissionController, cls).__new__(cls)
+            cls._instance._init()
+        return cls._instance
+
+    def _init(self):
+        self._cond = threading.Condition()
+        self.budget = Config.ADMISSION_MEMORY_MB * MB or int((available_memory() or 0) * 0.75) or math.inf
+        self.headroom = Config.ADMISSION_HEADROOM_MB * MB
+        self._reserved = 0
+        self._active = 0
+        self._queued = 0
+        self._avg_hold = 10.0  # Seconds a parse holds its slot, smoothed
+        self._publish()
+
+    def _publish(self) -> None:
+        metrics = Metrics()
+        metrics.set('admission_parses_active', self._active)
+        metrics.set('admission_queue_depth', self._queued)
+        metrics.set('admission_memory_reserved_bytes', self._reserved)
+        if self.budget != math.inf:
+            metrics.set('admission_memory_budget_bytes', self.budget)
+
+    def _fits(self, need: int) -> bool:
+        if not self._active:
+            return True  # A lone parse always runs, or nothing ever would
+        if self._reserved + need > self.budget:
+            return False
+        available = available_memory()
+        return available is None or available - need >= self.headroom
+
+    def retry_after(self, waiting: int = 0) -> int:
+        """Seconds to suggest before retrying, from recent parse times and the queue ahead"""
+        ahead = self._queued + waiting
+        return max(1, min(math.ceil(self._avg_hold * (1 + ahead / max(self._active, 1))), 300))
+
+    def busy(self, reason: str, waiting: int = 0) -> IngestBusy:
+        """Count a rejection and build the error to raise for it"""
+        Metrics().inc('admission_rejected_total', reason=reason)
+        retry_after = self.retry_after(waiting)
+        return IngestBusy(f"The server is busy processing other saves. Please try again in "
+                          f"{retry_after} seconds.", retry_after)
+
+    def acquire(self, file_size: int) -> _Slot:
+        """Wait until a save of this size can be parsed and reserve its memory"""
+        if not Config.ADMISSION_ENABLED:
+            return _Slot(None, 0)
+        need = min(estimate_parse_memory(file_size), self.budget)
+        start = time.monotonic()
+        with self._cond:
+            if not self._fits(need):
+                if self._queued >= Config.ADMISSION_MAX_QUEUED:
+                    raise self.busy('queue_full')
+                self._queued += 1
+                self._publish()
+                try:
+                    deadline = start + Config.ADMISSION_QUEUE_TIMEOUT
+                    while not self._fits(need):
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise self.busy('timeout')
+                        # Re-check periodically: other processes free memory without notifying us
+                        self._cond.wait(min(remaining, 1.0))
+                finally:
+                    self._queued -= 1
+                    self._publish()
+            self._reserved += need
+            self._active += 1
+            self._publish()
+        Metrics().observe('admission_wait_seconds', time.monotonic() - start)
+        return _Slot(self, need)
+
+    def _release(self, reserved: int, held: float) -> None:
+        with self._cond:
+            self._reserved -= reserved
+            self._active -= 1
+            self._avg_hold += 0.2 * (held - self._avg_hold)
+            self._publish()
+            self._cond.notify_all()
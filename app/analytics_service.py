@@ -0,0 +1,115 @@
+import numpy as np
+from typing import Dict, Any, List, Optional, Sequence
+from .database import Database
+
+
+class IncomeSeries:
+    """Annual income for several countries as a dense (country x year) matrix.
+
+    Missing years are NaN so that every operation below stays vectorized
+    and plotting libraries draw gaps instead of zeros.
+    """
+
+    def __init__(self, tags: np.ndarray, years: np.ndarray, income: np.ndarray):
+        self.tags = tags
+        self.years = years
+        self.income = income
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[tuple]) -> 'IncomeSeries':
+        """Build a series from (country_tag, year, income) rows"""
+        if not rows:
+            return cls(np.array([], dtype=str), np.array([], dtype=np.int32),
+                       np.empty((0, 0), dtype=np.float64))
+
+        tag_col, year_col, income_col = zip(*rows)
+        tags, tag_idx = np.unique(np.asarray(tag_col, dtype=str), return_inverse=True)
+        years, year_idx = np.unique(np.asarray(year_col, dtype=np.int32), return_inverse=True)
+
+        income = np.full((len(tags), len(years)), np.nan)
+        income[tag_idx, year_idx] = np.asarray(income_col, dtype=np.float64)
+        return cls(tags, years, income)
+
+    def growth_rates(self) -> np.ndarray:
+        """Year-over-year relative change; NaN where the previous year is missing or zero"""
+        prev = self.income[:, :-1]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            growth = (self.income[:, 1:] - prev) / np.abs(prev)
+        growth[~np.isfinite(growth)] = np.nan
+        first = np.full((self.income.shape[0], 1), np.nan)
+        return np.hstack([first, growth])
+
+    def moving_average(self, window: int = 5) -> np.ndarray:
+        """Trailing moving average over the last `window` years, ignoring gaps"""
+        if window < 1:
+            raise ValueError("window must be at least 1")
+        valid = ~np.isnan(self.income)
+        sums = np.cumsum(np.pad(np.where(valid, self.income, 0.0), ((0, 0), (1, 0))), axis=1)
+        counts = np.cumsum(np.pad(valid.astype(np.int64), ((0, 0), (1, 0))), axis=1)
+
+        hi = np.arange(1, self.income.shape[1] + 1)
+        lo = np.maximum(hi - window, 0)
+        window_sums = sums[:, hi] - sums[:, lo]
+        window_counts = counts[:, hi] - counts[:, lo]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(window_counts > 0, window_sums / window_counts, np.nan)
+
+    def threshold_years(self, threshold: float) -> Dict[str, Optional[int]]:
+        """First year each country's income reached `threshold`, or None"""
+        reached = self.income >= threshold
+        if reached.size == 0:
+            return {}
+        first = self.years[reached.argmax(axis=1)]
+        return {
+            str(tag): int(year) if hit else None
+            for tag, year, hit in zip(self.tags, first, reached.any(axis=1))
+        }
+
+    def rank_over_time(self) -> np.ndarray:
+        """Income rank per year (1 = richest); 0 where a country has no data"""
+        missing = np.isnan(self.income)
+        order = np.argsort(-np.where(missing, -np.inf, self.income), axis=0, kind='stable')
+        ranks = np.empty_like(order)
+        positions = np.broadcast_to(np.arange(1, order.shape[0] + 1)[:, None], order.shape)
+        np.put_along_axis(ranks, order, positions, axis=0)
+        ranks[missing] = 0
+        return ranks
+
+    def compare(self, tags: Sequence[str]) -> 'IncomeSeries':
+        """Subset of the series restricted to the given country tags"""
+        mask = np.isin(self.tags, list(tags))
+        return IncomeSeries(self.tags[mask], self.years, self.income[mask])
+
+    def to_dict(self, window: int = 5, threshold: Optional[float] = None) -> Dict[str, Any]:
+        """JSON-friendly payload shared by the pages and the chart API"""
+        def clean(matrix: np.ndarray) -> List[List[Optional[float]]]:
+            return [[None if np.isnan(v) else float(v) for v in row] for row in matrix]
+
+        result = {
+            'tags': [str(t) for t in self.tags],
+            'years': self.years.tolist(),
+            'income': clean(self.income),
+            'growth': clean(self.growth_rates()),
+            'moving_average': clean(self.moving_average(window)),
+            'rank': self.rank_over_time().tolist(),
+        }
+        if threshold is not None:
+            result['threshold_years'] = self.threshold_years(threshold)
+        return result
+
+
+class AnalyticsService:
+    @staticmethod
+    def file_income(checksum: str, owner_id: int) -> IncomeSeries:
+        """Load every country's income series for the owner's copy of a save in a single query"""
+        return IncomeSeries.from_rows(Database().get_income_rows(checksum, owner_id))
+
+    @staticmethod
+    def user_income(user_id: int) -> IncomeSeries:
+        """Load the best income per country and year across all of a user's saves"""
+        return IncomeSeries.from_rows(Database().get_user_income_rows(user_id))
+
+    @staticmethod
+    def campaign_income(campaign_id: int) -> IncomeSeries:
+        """Load the unified income timeline across every save of a campaign"""
+        return IncomeSeries.from_rows(Database().get_campaign_income_rows(campaign_id))
@@ -0,0 +1,163 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from typing import Any, Dict, Iterable, Optional
+from .config import Config
+from .metrics import Metrics
+
+ARTIFACT_DIR = os.path.join('processed', 'artifacts')
+DICTIONARY_DIR = os.path.join(ARTIFACT_DIR, 'dictionaries')
+KINDS = ('original', 'output')
+CHUNK_SIZE = 1 << 20
+FRAME_HEADER_SIZE = 18  # ZSTD_FRAMEHEADERSIZE_MAX, enough to read dictionary ID and content size
+
+def _zstd():
+    import zstandard  # Imported on first use, like boto3
+    return zstandard
+
+class ArtifactStore:
+    """Content-addressed, zstd-compressed store for original saves and parser outputs
+
+    Artifacts live at processed/artifacts/<kind>/<aa>/<sha256>.zst, so the
+    same bytes are only ever stored once; an original's address is the
+    file checksum. Parser outputs are compressed with a dictionary trained
+    on earlier outputs (see artifacts.py train); every frame records the
+    dictionary it needs, so retraining never breaks older artifacts.
+    Legacy uncompressed paths are still read transparently.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ArtifactStore, cls).__new__(cls)
+            cls._instance._dictionaries = {}
+        return cls._instance
+
+    @staticmethod
+    def is_artifact(path: str) -> bool:
+        """Whether a stored path points into the artifact store"""
+        return bool(path) and path.endswith('.zst')
+
+    @staticmethod
+    def path_for(kind: str, digest: str) -> str:
+        return os.path.join(ARTIFACT_DIR, kind, digest[:2], f"{digest}.zst")
+
+    # Dictionaries
+    def _load_dictionary(self, dict_id: int):
+        if dict_id not in self._dictionaries:
+            with open(os.path.join(DICTIONARY_DIR, f"{dict_id}.zdict"), 'rb') as f:
+                self._dictionaries[dict_id] = _zstd().ZstdCompressionDict(f.read())
+        return self._dictionaries[dict_id]
+
+    def current_dictionary(self):
+        """The dictionary new outputs are compressed with, or None before training"""
+        try:
+            with open(os.path.join(DICTIONARY_DIR, 'current'), 'r') as f:
+                return self._load_dictionary(int(f.read().strip()))
+        except FileNotFoundError:
+            return None
+
+    def train_dictionary(self, samples: Iterable[bytes], size: int = 112 * 1024) -> int:
+        """Train a dictionary on sample outputs, make it current and return its ID"""
+        zstd = _zstd()
+        dictionary = zstd.train_dictionary(size, list(samples), level=Config.ARTIFACT_ZSTD_LEVEL)
+        os.makedirs(DICTIONARY_DIR, exist_ok=True)
+        dict_id = dictionary.dict_id()
+        with open(os.path.join(DICTIONARY_DIR, f"{dict_id}.zdict"), 'wb') as f:
+            f.write(dictionary.as_bytes())
+        with open(os.path.join(DICTIONARY_DIR, 'current'), 'w') as f:
+            f.write(str(dict_id))
+        self._dictionaries[dict_id] = dictionary
+        return dict_id
+
+    # Writes
+    def put(self, src_path: str, kind: str, digest: Optional[str] = None) -> str:
+        """Compress a file into the store and return its artifact path
+
+        Without a known `digest` the file is hashed while it is compressed.
+        Storing bytes that are already present is a no-op.
+        """
+        if kind not in KINDS:
+            raise ValueError(f"Unknown artifact kind {kind!r}")
+        if digest and os.path.exists(self.path_for(kind, digest)):
+            os.utime(self.path_for(kind, digest))  # Restart the reaper's grace period
+            return self.path_for(kind, digest)
+
+        zstd = _zstd()
+        dictionary = self.current_dictionary() if kind == 'output' else None
+        compressor = zstd.ZstdCompressor(level=Config.ARTIFACT_ZSTD_LEVEL, dict_data=dictionary,
+                                         threads=-1 if kind == 'original' else 0)
+        os.makedirs(os.path.join(ARTIFACT_DIR, kind), exist_ok=True)
+        raw_size = os.path.getsize(src_path)
+        sha256 = hashlib.sha256()
+
+        start = time.perf_counter()
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.join(ARTIFACT_DIR, kind), suffix='.tmp')
+        try:
+            with open(src_path, 'rb') as src, os.fdopen(fd, 'wb') as dst:
+                with compressor.stream_writer(dst, size=raw_size, closefd=False) as writer:
+                    for chunk in iter(lambda: src.read(CHUNK_SIZE), b''):
+                        sha256.update(chunk)
+                        writer.write(chunk)
+            path = self.path_for(kind, digest or sha256.hexdigest())
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # An existing artifact holds the same bytes; replacing it is harmless
+            stored_size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+        metrics = Metrics()
+        metrics.observe('artifact_write_seconds', time.perf_counter() - start, kind=kind)
+        metrics.inc('artifact_raw_bytes_total', raw_size, kind=kind)
+        metrics.inc('artifact_stored_bytes_total', stored_size, kind=kind)
+        return path
+
+    # Reads
+    def open(self, path: str):
+        """Binary file object yielding the artifact's original bytes, decompressed as read"""
+        if not self.is_artifact(path):
+            return open(path, 'rb')
+        zstd = _zstd()
+        f = open(path, 'rb')
+        try:
+            params = zstd.get_frame_parameters(f.read(FRAME_HEADER_SIZE))
+            f.seek(0)
+            dictionary = self._load_dictionary(params.dict_id) if params.dict_id else None
+            return zstd.ZstdDecompressor(dict_data=dictionary).stream_reader(f, closefd=True)
+        except BaseException:
+            f.close()
+            raise
+
+    def fetch(self, path: str, dest_path: str) -> None:
+        """Decompress an artifact to a plain file"""
+        with self.open(path) as src, open(dest_path, 'wb') as dst:
+            shutil.copyfileobj(src, dst, CHUNK_SIZE)
+
+    def original_path(self, checksum: str) -> Optional[str]:
+        """Artifact path of a stored original save, if present"""
+        path = self.path_for('original', checksum)
+        return path if os.path.exists(path) else None
+
+    # Reporting
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Artifact count and raw vs. stored bytes per kind, read from frame headers"""
+        zstd = _zstd()
+        result = {}
+        for kind in KINDS:
+            totals = {'artifacts': 0, 'raw_bytes': 0, 'stored_bytes': 0}
+            for root, _, files in os.walk(os.path.join(ARTIFACT_DIR, kind)):
+                for name in files:
+                    if not name.endswith('.zst'):
+                        continue
+                    path = os.path.join(root, name)
+                    with open(path, 'rb') as f:
+                        params = zstd.get_frame_parameters(f.read(FRAME_HEADER_SIZE))
+                    totals['artifacts'] += 1
+                    totals['raw_bytes'] += max(params.content_size, 0)
+                    totals['stored_bytes'] += os.path.getsize(path)
+            result[kind] = totals
+        return result
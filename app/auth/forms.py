@@ -1,7 +1,6 @@
 from flask_wtf import FlaskForm
 from wtforms import StringField, PasswordField, SubmitField
-from wtforms.validators import DataRequired, Email, EqualTo, Length, ValidationError
-from app.database import Database
+from wtforms.validators import DataRequired, Email, EqualTo, Length
 
 class RegistrationForm(FlaskForm):
     username = StringField('Username', validators=[DataRequired(), Length(min=4, max=25)])
@@ -10,26 +9,6 @@ class RegistrationForm(FlaskForm):
     confirm_password = PasswordField('Confirm Password', validators=[DataRequired(), EqualTo('password')])
     submit = SubmitField('Register')
 
-    def validate_username(self, username):
-        db = Database()
-        conn = db._get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT id FROM users WHERE username = %s', (username.data,))
-        if cursor.fetchone():
-            raise ValidationError('Username already taken')
-        cursor.close()
-        conn.close()
-
-    def validate_email(self, email):
-        db = Database()
-        conn = db._get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT id FROM users WHERE email = %s', (email.data,))
-        if cursor.fetchone():
-            raise ValidationError('Email already registered')
-        cursor.close()
-        conn.close()
-
 class LoginForm(FlaskForm):
     username = StringField('Username', validators=[DataRequired()])
     password = PasswordField('Password', validators=[DataRequired()])
@@ -2,6 +2,7 @@ from flask import Blueprint, render_template, redirect, url_for, flash, request,
 from flask_login import login_user, logout_user, current_user
 from .forms import RegistrationForm, LoginForm
 from app.auth_service import AuthService
+from app.database import DuplicateUserError
 
 auth_bp = Blueprint('auth', __name__, template_folder='templates')
 
@@ -10,15 +11,17 @@ def register():
     form = RegistrationForm()
     if form.validate_on_submit():
         try:
-            user = AuthService.register_user(
+            AuthService.register_user(
                 form.username.data,
                 form.email.data,
                 form.password.data
             )
-            if user:
-                flash('Registration successful! Please log in.', 'success')
-                return redirect(url_for('auth.login'))
-            flash('Username or email already exists', 'danger')
+            flash('Registration successful! Please log in.', 'success')
+            return redirect(url_for('auth.login'))
+        except DuplicateUserError as e:
+            message = 'Email already registered' if e.field == 'email' else 'Username already taken'
+            getattr(form, e.field).errors.append(message)
+            flash(message, 'danger')
         except Exception as e:
             current_app.logger.error(f"Registration error: {str(e)}")
             flash('Registration failed. Please try again.', 'danger')
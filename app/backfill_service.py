@@ -0,0 +1,134 @@
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+from .artifact_store import ArtifactStore
+from .cache_service import CacheService
+from .config import Config
+from .database import Database
+from .extractors import EXTRACTORS, current_extractor_versions
+from .file_service import FileService
+from .parser_output import load_output
+from .s3_service import S3Service
+
+class BackfillService:
+    """Re-run newly added extractors over the original saves already stored.
+
+    Originals are streamed from S3, or from the artifact store (or the legacy
+    local copy in processed/) when S3 is disabled. Saves are parsed in parallel, results are written one
+    batch per transaction, and a checkpoint is saved after every batch so an
+    interrupted run resumes where it stopped.
+    """
+
+    def __init__(self, job: str = 'backfill', workers: Optional[int] = None, batch_size: int = 20):
+        self.job = job
+        self.workers = workers or Config.BACKFILL_WORKERS
+        self.batch_size = batch_size
+        self.db = Database()
+        self.s3 = S3Service()
+
+    def _fetch_original(self, file: Dict[str, Any], work_dir: str) -> Optional[str]:
+        """Copy a file's original save into work_dir and return the local path"""
+        # Prefix with the file ID so concurrent parses never share an output stem
+        local_path = os.path.join(work_dir, f"{file['id']}_{file['original_filename']}")
+        if file['s3_key'] and self.s3.download_file(file['s3_key'], local_path):
+            return local_path
+
+        stored = ArtifactStore().original_path(file['checksum'])
+        if stored:
+            ArtifactStore().fetch(stored, local_path)
+            return local_path
+
+        local_copy = os.path.join(FileService.ensure_processed_dir(), file['original_filename'])
+        if os.path.exists(local_copy):
+            shutil.copyfile(local_copy, local_path)
+            return local_path
+        return None
+
+    def _parse(self, file: Dict[str, Any], work_dir: str) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]], Optional[str]]:
+        """Fetch and parse one original; returns (file, output, error)"""
+        local_path = self._fetch_original(file, work_dir)
+        if not local_path:
+            return file, None, 'original save not found'
+
+        json_path = None
+        try:
+            json_path = FileService.run_parser(local_path, file['user_id'])
+            return file, load_output(json_path), None
+        except Exception as e:
+            return file, None, str(e)
+        finally:
+            # Keep only the outputs that belong to the original ingest
+            os.remove(local_path)
+            copied = os.path.join(FileService.ensure_processed_dir(), os.path.basename(local_path))
+            if os.path.exists(copied):
+                os.remove(copied)
+            if json_path and os.path.abspath(json_path) != os.path.abspath(file['json_path']):
+                os.remove(json_path)
+
+    def _write_batch(self, results: List[Tuple[Dict[str, Any], Optional[Dict[str, Any]], Optional[str]]],
+                     versions: Dict[str, int]) -> int:
+        """Apply extractors for a parsed batch in one transaction; returns files written"""
+        conn = self.db._get_connection()
+        written = 0
+        try:
+            for file, output, error in results:
+                if error:
+                    print(f"[backfill] file {file['id']} skipped: {error}")
+                    continue
+                for name in file['missing']:
+                    EXTRACTORS[name]['func'](self.db, conn, file['checksum'], output)
+                self.db.record_extractions(conn, file['id'], {n: versions[n] for n in file['missing']})
+                written += 1
+
+            self.db.save_backfill_checkpoint(conn, self.job, results[-1][0]['id'])
+            conn.commit()
+
+            cache = CacheService()
+            for file, output, error in results:
+                if not error:
+                    cache.invalidate_file(file['checksum'])
+            return written
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def run(self, extractors: Optional[List[str]] = None, restart: bool = False,
+            limit: Optional[int] = None) -> Dict[str, Any]:
+        """Backfill the given extractors (default: all) and return run statistics"""
+        versions = current_extractor_versions()
+        if extractors:
+            unknown = set(extractors) - set(versions)
+            if unknown:
+                raise ValueError(f"Unknown extractors: {', '.join(sorted(unknown))}")
+            versions = {name: versions[name] for name in extractors}
+
+        after_id = 0 if restart else self.db.get_backfill_checkpoint(self.job)
+        stats = {'processed': 0, 'failed': 0, 'started_after': after_id}
+        started = time.perf_counter()
+
+        with tempfile.TemporaryDirectory(prefix='eu4_backfill_') as work_dir, \
+                ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while limit is None or stats['processed'] + stats['failed'] < limit:
+                batch_size = self.batch_size
+                if limit is not None:
+                    batch_size = min(batch_size, limit - stats['processed'] - stats['failed'])
+                files = self.db.get_files_pending_extraction(versions, after_id, batch_size)
+                if not files:
+                    break
+
+                results = list(pool.map(lambda f: self._parse(f, work_dir), files))
+                written = self._write_batch(results, versions)
+                stats['processed'] += written
+                stats['failed'] += len(results) - written
+                after_id = files[-1]['id']
+                print(f"[backfill] through file {after_id}: "
+                      f"{stats['processed']} done, {stats['failed']} failed")
+
+        stats['seconds'] = time.perf_counter() - started
+        stats['files_per_second'] = (stats['processed'] / stats['seconds']) if stats['seconds'] else 0.0
+        return stats
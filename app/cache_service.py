@@ -0,0 +1,160 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional
+from .config import Config
+from .database import Database
+
+class LRUBackend:
+    """In-process LRU cache with optional per-entry TTL
+
+    Entries live in one worker, so generations are kept in the database
+    (see DatabaseGenerations): an invalidation in any worker makes every
+    worker's entries for the scope miss.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generations = DatabaseGenerations()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[int]) -> None:
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def generation(self, scope: str) -> int:
+        return self._generations.generation(scope)
+
+    def bump(self, scope: str) -> None:
+        self._generations.bump(scope)
+
+
+class DatabaseGenerations:
+    """Scope generations in the cache_generations table, shared by every worker"""
+
+    def __init__(self):
+        self.db = Database()
+
+    def generation(self, scope: str) -> int:
+        return self.db.get_cache_generation(scope)
+
+    def bump(self, scope: str) -> None:
+        self.db.bump_cache_generation(scope)
+
+
+class RedisBackend:
+    """Redis-backed cache shared between workers"""
+
+    def __init__(self, url: str):
+        import redis  # Optional dependency, only needed when CACHE_BACKEND=redis
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[Any]:
+        data = self.client.get(key)
+        return pickle.loads(data) if data is not None else None
+
+    def set(self, key: str, value: Any, ttl: Optional[int]) -> None:
+        self.client.set(key, pickle.dumps(value), ex=ttl)
+
+    def generation(self, scope: str) -> int:
+        value = self.client.get(f"gen|{scope}")
+        return int(value) if value is not None else 0
+
+    def bump(self, scope: str) -> None:
+        self.client.incr(f"gen|{scope}")
+
+
+class CacheService:
+    """Fragment cache for page data keyed by user or file checksum.
+
+    Entries are stored under a per-scope generation number (e.g. 'user:5' or
+    'file:<checksum>'); invalidating a scope bumps its generation so every
+    fragment built from it misses on the next read. Generations live in
+    Redis or the database, so an invalidation reaches every worker.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(CacheService, cls).__new__(cls)
+            cls._instance._init_backend()
+        return cls._instance
+
+    def _init_backend(self):
+        self.backend = None
+        if Config.CACHE_BACKEND == 'redis' and Config.CACHE_REDIS_URL:
+            try:
+                self.backend = RedisBackend(Config.CACHE_REDIS_URL)
+                self.backend.client.ping()
+            except Exception as e:
+                print(f"Failed to initialize Redis cache, falling back to in-process LRU: {e}")
+                self.backend = None
+        if self.backend is None:
+            self.backend = LRUBackend(Config.CACHE_MAX_ENTRIES)
+
+        self._stats_lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _record(self, name: str, outcome: str) -> None:
+        with self._stats_lock:
+            counters = self._stats.setdefault(name, {'hits': 0, 'misses': 0})
+            counters[outcome] += 1
+
+    def get_or_set(self, name: str, scope: str, loader: Callable[[], Any],
+                   ttl: Optional[int] = None, variant: str = '') -> Any:
+        """Return the cached fragment for (name, scope), building it with loader on a miss
+
+        `variant` tells apart fragments of one scope that differ by viewer
+        or owner; invalidating the scope drops all of them.
+        """
+        if not Config.CACHE_ENABLED:
+            return loader()
+
+        key = f"{name}|{scope}|{variant}|{self.backend.generation(scope)}"
+        value = self.backend.get(key)
+        if value is not None:
+            self._record(name, 'hits')
+            return value
+
+        self._record(name, 'misses')
+        value = loader()
+        self.backend.set(key, value, ttl or Config.CACHE_TTL)
+        return value
+
+    def invalidate(self, *scopes: str) -> None:
+        """Drop every fragment built from the given scopes"""
+        for scope in scopes:
+            self.backend.bump(scope)
+
+    def invalidate_users(self, user_ids: Iterable[int]) -> None:
+        self.invalidate(*(f"user:{user_id}" for user_id in set(user_ids)))
+
+    def invalidate_file(self, checksum: str) -> None:
+        self.invalidate(f"file:{checksum}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters per fragment name"""
+        with self._stats_lock:
+            fragments = {name: dict(counters) for name, counters in self._stats.items()}
+        for counters in fragments.values():
+            total = counters['hits'] + counters['misses']
+            counters['hit_ratio'] = counters['hits'] / total if total else 0.0
+        return {'backend': type(self.backend).__name__, 'fragments': fragments}
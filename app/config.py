@@ -11,10 +11,45 @@ class Config:
     DB_USER = os.environ.get('DB_USER')
     DB_PASSWORD = os.environ.get('DB_PASSWORD')
     DB_NAME = os.environ.get('DB_NAME')
+    DB_BACKEND = os.getenv('DB_BACKEND', 'mysql')  # 'mysql' or 'sqlite'
+    SQLITE_PATH = os.getenv('SQLITE_PATH', 'eu4stats.sqlite3')
+    SQLITE_BUSY_TIMEOUT = float(os.getenv('SQLITE_BUSY_TIMEOUT', '10'))  # Seconds a writer waits for the lock
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '10'))  # mysql-connector allows at most 32
     S3_ENABLED = os.getenv('S3_ENABLED', 'false').lower() == 'true'
     S3_BUCKET = os.getenv('S3_BUCKET')
     S3_REGION = os.getenv('S3_REGION')
     S3_ACCESS_KEY = os.getenv('S3_ACCESS_KEY')
     S3_SECRET_KEY = os.getenv('S3_SECRET_KEY')
     S3_ENDPOINT_URL = os.getenv('S3_ENDPOINT_URL', None)  # For non-AWS S3 compatible services
+    LEADERBOARD_INCOME_THRESHOLD = float(os.getenv('LEADERBOARD_INCOME_THRESHOLD', '1000'))
+    BACKFILL_WORKERS = int(os.getenv('BACKFILL_WORKERS', '4'))
+    IMPORT_WORKERS = int(os.getenv('IMPORT_WORKERS', '0'))  # 0 = sized to cores and available memory
+    PARSE_MEMORY_BASE_MB = int(os.getenv('PARSE_MEMORY_BASE_MB', '64'))  # Parser footprint before the save
+    PARSE_MEMORY_FACTOR = float(os.getenv('PARSE_MEMORY_FACTOR', '12'))  # Peak parser RSS per byte of save
+    INGEST_WORKERS = int(os.getenv('INGEST_WORKERS', '2'))  # Background threads running full parses of uploads
+    ADMISSION_ENABLED = os.getenv('ADMISSION_ENABLED', 'true').lower() == 'true'
+    ADMISSION_MEMORY_MB = int(os.getenv('ADMISSION_MEMORY_MB', '0'))  # 0 = 75% of memory available at start
+    ADMISSION_HEADROOM_MB = int(os.getenv('ADMISSION_HEADROOM_MB', '256'))  # Always left free for the web tier
+    ADMISSION_MAX_QUEUED = int(os.getenv('ADMISSION_MAX_QUEUED', '8'))
+    ADMISSION_QUEUE_TIMEOUT = float(os.getenv('ADMISSION_QUEUE_TIMEOUT', '30'))
+    CACHE_ENABLED = os.getenv('CACHE_ENABLED', 'true').lower() == 'true'
+    CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'lru')  # 'lru' or 'redis'
+    CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', '1024'))
+    CACHE_TTL = int(os.getenv('CACHE_TTL', '3600'))
+    BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', '12'))
+    BCRYPT_WORKERS = int(os.getenv('BCRYPT_WORKERS', str(os.cpu_count() or 1)))  # 0 = hash inline
+    BCRYPT_MAX_PENDING = int(os.getenv('BCRYPT_MAX_PENDING', '64'))
+    BCRYPT_QUEUE_TIMEOUT = float(os.getenv('BCRYPT_QUEUE_TIMEOUT', '10'))
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')  # If set, /metrics requires "Authorization: Bearer <token>"
+    SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '200'))  # 0 disables the slow-query log
+    INGEST_PROFILE_RATE = float(os.getenv('INGEST_PROFILE_RATE', '0'))  # Fraction of uploads to cProfile
+    ADMIN_USERNAMES = {name.strip() for name in os.getenv('ADMIN_USERNAMES', '').split(',') if name.strip()}
+    WARMUP_ENABLED = os.getenv('WARMUP_ENABLED', 'true').lower() == 'true'
+    ARTIFACT_STORE_ENABLED = os.getenv('ARTIFACT_STORE_ENABLED', 'true').lower() == 'true'  # Needs zstandard
+    ARTIFACT_ZSTD_LEVEL = int(os.getenv('ARTIFACT_ZSTD_LEVEL', '9'))
+    REAPER_BATCH_SIZE = int(os.getenv('REAPER_BATCH_SIZE', '500'))  # Keys, files or rows per delete
+    REAPER_BATCHES_PER_SECOND = float(os.getenv('REAPER_BATCHES_PER_SECOND', '2'))  # 0 = unthrottled
+    REAPER_GRACE_SECONDS = int(os.getenv('REAPER_GRACE_SECONDS', '3600'))  # Never touch anything newer
     SQLALCHEMY_TRACK_MODIFICATIONS = False
\ No newline at end of file
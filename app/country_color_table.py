@@ -0,0 +1,977 @@
+# Generated by generate_country_colors.py - do not edit by hand.
+COUNTRY_COLORS = {
+    'AAC': (157, 51, 167),
+    'ABB': (50, 162, 50),
+    'ABE': (49, 115, 90),
+    'ABI': (18, 139, 228),
+    'ACH': (255, 213, 51),
+    'ACO': (114, 145, 117),
+    'ADA': (145, 70, 130),
+    'ADE': (233, 155, 81),
+    'ADU': (240, 230, 155),
+    'AFA': (125, 100, 220),
+    'AFG': (102, 128, 52),
+    'AGG': (216, 184, 43),
+    'AGQ': (4, 162, 77),
+    'AHM': (74, 87, 138),
+    'AIR': (30, 31, 162),
+    'AJU': (230, 240, 255),
+    'AKK': (31, 49, 138),
+    'AKM': (137, 195, 235),
+    'AKS': (110, 120, 191),
+    'AKT': (200, 85, 84),
+    'ALA': (185, 215, 255),
+    'ALB': (181, 0, 20),
+    'ALE': (162, 116, 225),
+    'ALG': (230, 225, 110),
+    'ALH': (178, 103, 5),
+    'ALO': (135, 144, 180),
+    'ALS': (246, 223, 15),
+    'ALT': (197, 28, 148),
+    'AMA': (205, 94, 60),
+    'AMG': (187, 206, 247),
+    'ANH': (203, 93, 124),
+    'ANL': (83, 30, 157),
+    'ANN': (186, 14, 92),
+    'ANS': (130, 77, 119),
+    'ANT': (51, 183, 51),
+    'ANU': (201, 197, 124),
+    'ANZ': (143, 222, 169),
+    'AOT': (120, 16, 0),
+    'APA': (198, 158, 109),
+    'AQU': (34, 30, 174),
+    'ARA': (166, 68, 72),
+    'ARB': (76, 141, 58),
+    'ARD': (162, 29, 220),
+    'ARK': (212, 211, 151),
+    'ARL': (68, 110, 35),
+    'ARM': (145, 30, 75),
+    'ARN': (78, 139, 60),
+    'ARP': (121, 10, 65),
+    'ARW': (102, 120, 225),
+    'ASA': (56, 180, 139),
+    'ASH': (97, 98, 195),
+    'ASI': (25, 123, 48),
+    'ASK': (162, 32, 65),
+    'ASS': (163, 5, 77),
+    'AST': (26, 27, 154),
+    'ASU': (104, 173, 230),
+    'ATA': (91, 112, 207),
+    'ATH': (113, 112, 96),
+    'ATJ': (88, 137, 172),
+    'ATT': (61, 248, 196),
+    'ATW': (110, 167, 103),
+    'AUG': (20, 188, 118),
+    'AUH': (239, 239, 239),
+    'AUS': (144, 60, 75),
+    'AUV': (218, 155, 75),
+    'AVA': (98, 138, 99),
+    'AVE': (110, 0, 140),
+    'AVI': (205, 178, 107),
+    'AVR': (42, 145, 210),
+    'AWN': (137, 69, 69),
+    'AYD': (255, 151, 40),
+    'AYU': (60, 152, 70),
+    'AZT': (48, 149, 21),
+    'BAD': (117, 161, 67),
+    'BAH': (49, 175, 191),
+    'BAL': (175, 82, 16),
+    'BAM': (200, 219, 195),
+    'BAN': (130, 25, 74),
+    'BAR': (178, 163, 143),
+    'BAV': (17, 116, 193),
+    'BDA': (245, 139, 127),
+    'BEI': (41, 89, 174),
+    'BEJ': (228, 243, 104),
+    'BEN': (110, 173, 129),
+    'BER': (85, 65, 215),
+    'BEU': (122, 116, 124),
+    'BGA': (131, 52, 76),
+    'BGL': (123, 14, 148),
+    'BHA': (80, 165, 10),
+    'BHT': (62, 129, 120),
+    'BHU': (93, 180, 76),
+    'BIJ': (40, 121, 66),
+    'BLA': (102, 153, 255),
+    'BLG': (236, 95, 0),
+    'BLI': (201, 97, 74),
+    'BLM': (168, 62, 31),
+    'BLO': (66, 32, 81),
+    'BND': (23, 114, 143),
+    'BNE': (144, 86, 70),
+    'BNG': (36, 109, 194),
+    'BNJ': (171, 175, 40),
+    'BNY': (174, 24, 66),
+    'BOH': (161, 139, 40),
+    'BON': (163, 40, 25),
+    'BOS': (240, 167, 130),
+    'BOU': (0, 140, 165),
+    'BPI': (229, 153, 34),
+    'BPR': (155, 3, 22),
+    'BRA': (123, 90, 90),
+    'BRB': (118, 193, 153),
+    'BRE': (33, 101, 137),
+    'BRG': (240, 205, 140),
+    'BRI': (118, 99, 151),
+    'BRR': (26, 207, 81),
+    'BRS': (201, 33, 53),
+    'BRT': (70, 130, 180),
+    'BRU': (116, 92, 39),
+    'BRZ': (129, 177, 125),
+    'BSG': (213, 185, 110),
+    'BSH': (131, 202, 12),
+    'BSR': (103, 121, 136),
+    'BST': (21, 50, 212),
+    'BTI': (232, 121, 145),
+    'BTL': (205, 110, 47),
+    'BTN': (209, 203, 31),
+    'BTS': (220, 58, 58),
+    'BTU': (129, 222, 235),
+    'BUG': (21, 21, 227),
+    'BUK': (255, 134, 0),
+    'BUL': (116, 107, 140),
+    'BUR': (148, 30, 70),
+    'BUU': (21, 191, 16),
+    'BYT': (210, 210, 38),
+    'BYZ': (149, 45, 102),
+    'CAB': (52, 120, 25),
+    'CAD': (125, 32, 29),
+    'CAL': (245, 147, 54),
+    'CAM': (204, 186, 201),
+    'CAN': (94, 117, 55),
+    'CAO': (59, 15, 49),
+    'CAQ': (70, 31, 179),
+    'CAS': (193, 171, 8),
+    'CAT': (213, 132, 76),
+    'CAY': (44, 63, 182),
+    'CBA': (32, 55, 68),
+    'CCA': (111, 79, 4),
+    'CCM': (248, 229, 21),
+    'CCQ': (74, 44, 126),
+    'CDL': (245, 245, 220),
+    'CEB': (45, 215, 45),
+    'CEP': (211, 172, 185),
+    'CEY': (60, 123, 65),
+    'CGS': (51, 215, 51),
+    'CHA': (53, 151, 151),
+    'CHC': (251, 168, 196),
+    'CHD': (165, 167, 29),
+    'CHE': (105, 145, 40),
+    'CHG': (87, 92, 104),
+    'CHH': (140, 163, 128),
+    'CHI': (160, 80, 16),
+    'CHK': (139, 131, 162),
+    'CHL': (236, 159, 89),
+    'CHM': (39, 123, 126),
+    'CHO': (0, 46, 59),
+    'CHP': (166, 125, 154),
+    'CHR': (190, 190, 190),
+    'CHT': (94, 96, 11),
+    'CHU': (98, 94, 163),
+    'CHV': (131, 146, 194),
+    'CHY': (150, 50, 10),
+    'CIA': (148, 104, 197),
+    'CIR': (42, 107, 17),
+    'CJA': (162, 123, 64),
+    'CKW': (99, 160, 39),
+    'CLA': (188, 234, 158),
+    'CLB': (239, 162, 53),
+    'CLG': (195, 18, 152),
+    'CLI': (159, 174, 96),
+    'CLM': (198, 149, 21),
+    'CMI': (0, 103, 165),
+    'CMP': (69, 131, 62),
+    'CND': (114, 70, 103),
+    'CNK': (121, 10, 15),
+    'CNN': (193, 237, 85),
+    'CNP': (134, 136, 21),
+    'COB': (71, 201, 101),
+    'COC': (194, 236, 91),
+    'COF': (188, 102, 110),
+    'COI': (58, 18, 220),
+    'COL': (89, 140, 176),
+    'COM': (96, 57, 19),
+    'COO': (42, 246, 88),
+    'COR': (106, 178, 46),
+    'COW': (18, 39, 184),
+    'CRA': (198, 131, 244),
+    'CRB': (233, 83, 70),
+    'CRE': (108, 139, 208),
+    'CRI': (59, 158, 125),
+    'CRN': (155, 56, 0),
+    'CRO': (104, 94, 247),
+    'CRT': (138, 110, 130),
+    'CSC': (8, 90, 5),
+    'CSH': (140, 169, 183),
+    'CSK': (115, 75, 62),
+    'CSU': (229, 64, 64),
+    'CTM': (194, 86, 91),
+    'CUA': (174, 151, 145),
+    'CUB': (140, 65, 166),
+    'CXI': (140, 183, 154),
+    'CYA': (157, 199, 224),
+    'CYI': (205, 104, 18),
+    'CYP': (245, 200, 30),
+    'CZH': (209, 212, 126),
+    'DAH': (11, 84, 179),
+    'DAI': (136, 117, 90),
+    'DAL': (46, 128, 188),
+    'DAM': (243, 106, 0),
+    'DAN': (190, 70, 70),
+    'DAR': (44, 160, 70),
+    'DAU': (93, 194, 122),
+    'DAW': (33, 92, 143),
+    'DEC': (89, 141, 140),
+    'DGB': (171, 160, 31),
+    'DGL': (191, 25, 25),
+    'DHU': (98, 110, 96),
+    'DLH': (157, 200, 42),
+    'DLI': (68, 94, 85),
+    'DMK': (211, 211, 78),
+    'DMS': (179, 89, 89),
+    'DNG': (213, 194, 66),
+    'DNZ': (78, 129, 151),
+    'DTE': (105, 176, 118),
+    'DTI': (231, 152, 79),
+    'DTT': (72, 194, 212),
+    'DUL': (233, 255, 218),
+    'DWT': (80, 201, 64),
+    'EFR': (190, 32, 16),
+    'EGY': (255, 220, 104),
+    'EIC': (212, 87, 78),
+    'EJZ': (244, 148, 77),
+    'ENA': (213, 190, 38),
+    'ENG': (193, 26, 14),
+    'EOR': (243, 155, 75),
+    'EPI': (230, 228, 214),
+    'ERE': (250, 200, 70),
+    'ERI': (44, 220, 23),
+    'ERS': (101, 46, 137),
+    'EST': (248, 125, 125),
+    'ETH': (56, 120, 191),
+    'ETO': (80, 51, 215),
+    'ETR': (114, 154, 143),
+    'FAD': (96, 148, 40),
+    'FEO': (61, 8, 81),
+    'FER': (21, 128, 21),
+    'FEZ': (224, 146, 113),
+    'FIN': (182, 134, 100),
+    'FKN': (89, 128, 68),
+    'FLA': (43, 141, 172),
+    'FLO': (240, 227, 27),
+    'FLY': (237, 138, 22),
+    'FOI': (105, 106, 182),
+    'FOX': (242, 101, 34),
+    'FRA': (20, 50, 210),
+    'FRI': (165, 89, 27),
+    'FRM': (218, 234, 15),
+    'FRN': (243, 201, 33),
+    'FRS': (232, 206, 255),
+    'FUL': (245, 135, 25),
+    'FZA': (113, 176, 151),
+    'GAL': (240, 167, 130),
+    'GAM': (228, 49, 121),
+    'GAZ': (162, 93, 31),
+    'GBR': (153, 0, 0),
+    'GDW': (224, 146, 113),
+    'GEL': (139, 66, 97),
+    'GEN': (218, 215, 56),
+    'GEO': (190, 35, 37),
+    'GER': (75, 130, 135),
+    'GHD': (255, 133, 15),
+    'GHR': (60, 154, 135),
+    'GLE': (38, 160, 67),
+    'GLG': (5, 171, 147),
+    'GLH': (250, 182, 3),
+    'GMA': (215, 17, 32),
+    'GMI': (59, 148, 111),
+    'GNG': (62, 39, 142),
+    'GNV': (255, 250, 138),
+    'GOC': (183, 176, 94),
+    'GOL': (193, 179, 127),
+    'GOS': (88, 45, 148),
+    'GOT': (153, 126, 0),
+    'GRA': (210, 220, 175),
+    'GRE': (9, 9, 103),
+    'GRJ': (110, 136, 66),
+    'GRK': (137, 183, 124),
+    'GRM': (200, 8, 21),
+    'GUA': (193, 90, 66),
+    'GUG': (50, 37, 125),
+    'GUJ': (231, 224, 107),
+    'GUR': (71, 133, 178),
+    'GUY': (32, 144, 204),
+    'GWA': (153, 237, 145),
+    'GZI': (255, 211, 0),
+    'HAB': (220, 220, 220),
+    'HAD': (119, 25, 21),
+    'HAI': (103, 62, 185),
+    'HAM': (227, 95, 7),
+    'HAN': (164, 217, 127),
+    'HAR': (175, 75, 15),
+    'HAT': (139, 179, 207),
+    'HAU': (48, 169, 96),
+    'HAW': (255, 135, 80),
+    'HDA': (20, 191, 20),
+    'HDR': (16, 142, 49),
+    'HDY': (181, 215, 25),
+    'HED': (255, 215, 185),
+    'HES': (114, 171, 184),
+    'HIN': (235, 255, 220),
+    'HJA': (41, 123, 73),
+    'HJO': (39, 74, 120),
+    'HLR': (150, 177, 161),
+    'HMI': (118, 193, 177),
+    'HNI': (171, 192, 31),
+    'HOB': (255, 73, 7),
+    'HOD': (163, 182, 143),
+    'HOL': (156, 96, 100),
+    'HRZ': (72, 113, 160),
+    'HSA': (156, 179, 189),
+    'HSC': (37, 113, 207),
+    'HSE': (220, 61, 104),
+    'HSI': (186, 147, 251),
+    'HSK': (49, 103, 69),
+    'HSN': (234, 179, 30),
+    'HST': (64, 236, 91),
+    'HTK': (105, 130, 27),
+    'HUA': (132, 207, 191),
+    'HUN': (152, 85, 92),
+    'HUR': (178, 139, 60),
+    'HWK': (164, 220, 134),
+    'ICE': (43, 60, 117),
+    'ICH': (233, 52, 243),
+    'ICM': (165, 10, 35),
+    'IDR': (31, 102, 187),
+    'IKE': (178, 140, 110),
+    'ILI': (98, 180, 208),
+    'ILK': (232, 48, 2),
+    'ILL': (129, 214, 238),
+    'IME': (36, 132, 247),
+    'IMG': (220, 203, 24),
+    'INC': (125, 92, 110),
+    'IND': (210, 190, 252),
+    'ING': (67, 163, 215),
+    'INN': (8, 64, 6),
+    'IRE': (112, 150, 105),
+    'IRO': (87, 182, 80),
+    'IRQ': (153, 138, 161),
+    'ISF': (21, 19, 65),
+    'ISK': (47, 155, 224),
+    'ISL': (244, 232, 188),
+    'ISR': (20, 138, 255),
+    'ITA': (125, 171, 84),
+    'ITO': (71, 74, 77),
+    'ITZ': (94, 236, 191),
+    'JAI': (80, 200, 120),
+    'JAJ': (124, 62, 183),
+    'JAN': (59, 51, 29),
+    'JAP': (194, 53, 60),
+    'JAR': (199, 244, 188),
+    'JFN': (237, 139, 0),
+    'JGD': (200, 229, 237),
+    'JIM': (239, 67, 67),
+    'JIN': (229, 222, 20),
+    'JJI': (149, 133, 207),
+    'JLV': (208, 157, 33),
+    'JMB': (223, 228, 192),
+    'JML': (226, 252, 82),
+    'JMN': (65, 55, 188),
+    'JNN': (55, 158, 198),
+    'JNP': (100, 94, 125),
+    'JOA': (1, 148, 8),
+    'JOH': (30, 112, 187),
+    'JOL': (215, 215, 125),
+    'JPR': (237, 174, 221),
+    'JSL': (119, 151, 122),
+    'KAA': (190, 90, 90),
+    'KAC': (63, 20, 177),
+    'KAF': (150, 0, 25),
+    'KAL': (148, 182, 3),
+    'KAM': (33, 168, 103),
+    'KAN': (48, 193, 241),
+    'KAQ': (75, 136, 191),
+    'KAR': (90, 160, 190),
+    'KAS': (255, 245, 220),
+    'KAT': (212, 84, 55),
+    'KAU': (190, 75, 30),
+    'KAZ': (97, 102, 135),
+    'KBA': (60, 140, 70),
+    'KBO': (30, 131, 162),
+    'KBU': (255, 55, 185),
+    'KED': (170, 72, 67),
+    'KEL': (123, 3, 9),
+    'KER': (162, 28, 58),
+    'KGR': (29, 124, 255),
+    'KHA': (108, 153, 65),
+    'KHD': (138, 151, 103),
+    'KHI': (210, 175, 60),
+    'KHM': (127, 180, 60),
+    'KHO': (130, 168, 224),
+    'KIC': (94, 36, 191),
+    'KID': (104, 130, 172),
+    'KIE': (81, 123, 210),
+    'KIK': (99, 60, 39),
+    'KIO': (121, 210, 115),
+    'KIT': (255, 225, 57),
+    'KJH': (237, 204, 3),
+    'KKC': (248, 184, 98),
+    'KLD': (99, 60, 239),
+    'KLE': (173, 176, 113),
+    'KLH': (93, 183, 140),
+    'KLK': (224, 104, 83),
+    'KLM': (58, 65, 73),
+    'KLN': (156, 129, 33),
+    'KLP': (23, 14, 93),
+    'KLT': (188, 21, 64),
+    'KMC': (182, 143, 149),
+    'KMN': (135, 219, 135),
+    'KMT': (163, 66, 74),
+    'KND': (43, 148, 246),
+    'KNG': (137, 98, 195),
+    'KNI': (106, 127, 183),
+    'KNO': (22, 94, 131),
+    'KNZ': (255, 133, 59),
+    'KOC': (255, 188, 225),
+    'KOH': (194, 125, 201),
+    'KOI': (133, 43, 27),
+    'KOJ': (211, 230, 211),
+    'KOK': (40, 75, 175),
+    'KOL': (84, 124, 48),
+    'KON': (199, 160, 139),
+    'KOR': (26, 53, 177),
+    'KRA': (138, 193, 231),
+    'KRC': (221, 93, 170),
+    'KRK': (232, 79, 142),
+    'KRL': (244, 38, 38),
+    'KRM': (104, 189, 104),
+    'KRW': (48, 177, 169),
+    'KRY': (215, 208, 14),
+    'KSD': (255, 101, 38),
+    'KSH': (63, 150, 30),
+    'KSI': (75, 162, 171),
+    'KSJ': (199, 160, 39),
+    'KSK': (246, 129, 104),
+    'KSP': (163, 43, 202),
+    'KTB': (113, 104, 108),
+    'KTS': (148, 249, 196),
+    'KTU': (173, 141, 158),
+    'KUB': (159, 60, 189),
+    'KUL': (32, 35, 117),
+    'KUR': (99, 137, 153),
+    'KUT': (178, 116, 221),
+    'KZB': (199, 160, 239),
+    'KZH': (202, 217, 170),
+    'LAC': (224, 236, 191),
+    'LAE': (255, 212, 42),
+    'LAI': (250, 220, 180),
+    'LAK': (19, 27, 81),
+    'LAN': (236, 47, 47),
+    'LAP': (101, 102, 163),
+    'LAR': (221, 183, 68),
+    'LAU': (79, 139, 99),
+    'LBV': (35, 220, 240),
+    'LDK': (23, 110, 90),
+    'LDU': (114, 30, 229),
+    'LEB': (225, 110, 25),
+    'LEI': (48, 164, 51),
+    'LEN': (76, 110, 150),
+    'LFA': (43, 165, 157),
+    'LIB': (242, 249, 255),
+    'LIE': (149, 186, 37),
+    'LIG': (16, 114, 124),
+    'LIP': (98, 58, 109),
+    'LIT': (154, 69, 116),
+    'LIV': (125, 30, 100),
+    'LNA': (74, 92, 128),
+    'LND': (199, 60, 39),
+    'LNG': (106, 97, 104),
+    'LNO': (44, 104, 150),
+    'LOA': (200, 202, 85),
+    'LOI': (0, 105, 104),
+    'LON': (99, 14, 87),
+    'LOR': (115, 142, 205),
+    'LOT': (95, 106, 207),
+    'LOU': (144, 52, 53),
+    'LPP': (21, 83, 149),
+    'LRI': (207, 213, 47),
+    'LTG': (78, 65, 15),
+    'LUA': (93, 147, 88),
+    'LUB': (97, 209, 251),
+    'LUC': (146, 251, 82),
+    'LUN': (135, 109, 147),
+    'LUW': (132, 133, 197),
+    'LUX': (53, 140, 73),
+    'LVA': (20, 14, 150),
+    'LWA': (181, 114, 3),
+    'LXA': (210, 46, 28),
+    'MAA': (225, 190, 190),
+    'MAB': (61, 155, 32),
+    'MAD': (233, 88, 88),
+    'MAE': (144, 121, 173),
+    'MAG': (189, 115, 99),
+    'MAH': (148, 150, 28),
+    'MAI': (178, 145, 87),
+    'MAJ': (201, 28, 54),
+    'MAK': (184, 80, 52),
+    'MAL': (255, 255, 185),
+    'MAM': (188, 166, 93),
+    'MAN': (191, 83, 101),
+    'MAR': (67, 124, 181),
+    'MAS': (208, 145, 55),
+    'MAT': (78, 149, 191),
+    'MAU': (65, 140, 60),
+    'MAW': (192, 111, 179),
+    'MAY': (94, 136, 191),
+    'MAZ': (195, 149, 155),
+    'MBA': (169, 54, 54),
+    'MBL': (81, 177, 137),
+    'MBZ': (101, 189, 23),
+    'MCA': (162, 182, 64),
+    'MCH': (165, 132, 57),
+    'MCM': (150, 231, 150),
+    'MDA': (191, 68, 86),
+    'MDI': (212, 175, 55),
+    'MED': (23, 114, 60),
+    'MEI': (58, 174, 61),
+    'MEM': (210, 37, 57),
+    'MEN': (108, 48, 130),
+    'MER': (139, 131, 22),
+    'MEW': (107, 21, 196),
+    'MEX': (219, 124, 139),
+    'MFA': (96, 183, 6),
+    'MFL': (116, 68, 143),
+    'MFY': (187, 96, 193),
+    'MGD': (119, 32, 29),
+    'MGE': (130, 180, 240),
+    'MGR': (252, 209, 22),
+    'MHR': (53, 191, 176),
+    'MHX': (152, 167, 237),
+    'MIA': (148, 88, 59),
+    'MIK': (110, 48, 50),
+    'MIN': (206, 235, 209),
+    'MIR': (43, 43, 186),
+    'MIS': (74, 136, 241),
+    'MIX': (158, 18, 120),
+    'MJE': (220, 200, 100),
+    'MJO': (243, 111, 107),
+    'MJZ': (65, 32, 57),
+    'MKA': (44, 51, 65),
+    'MKL': (55, 140, 143),
+    'MKP': (18, 59, 115),
+    'MKS': (117, 179, 128),
+    'MKU': (147, 146, 62),
+    'MLB': (149, 191, 117),
+    'MLC': (100, 96, 197),
+    'MLG': (191, 185, 93),
+    'MLH': (155, 170, 136),
+    'MLI': (153, 210, 135),
+    'MLK': (117, 167, 117),
+    'MLO': (166, 108, 146),
+    'MLS': (151, 95, 19),
+    'MLW': (192, 5, 24),
+    'MMA': (27, 109, 107),
+    'MMI': (110, 124, 156),
+    'MNA': (56, 32, 120),
+    'MNG': (179, 128, 104),
+    'MNI': (172, 164, 6),
+    'MNS': (104, 137, 140),
+    'MOD': (241, 252, 151),
+    'MOE': (168, 121, 129),
+    'MOH': (244, 151, 42),
+    'MOL': (136, 157, 23),
+    'MON': (39, 108, 140),
+    'MOR': (191, 110, 62),
+    'MOS': (206, 181, 97),
+    'MPA': (78, 35, 16),
+    'MPC': (225, 71, 35),
+    'MPH': (170, 76, 48),
+    'MRA': (169, 34, 34),
+    'MRE': (6, 42, 120),
+    'MRI': (230, 180, 34),
+    'MRK': (84, 242, 223),
+    'MSA': (80, 10, 165),
+    'MSC': (218, 158, 79),
+    'MSG': (238, 173, 101),
+    'MSI': (27, 128, 45),
+    'MSY': (140, 102, 152),
+    'MTH': (15, 128, 253),
+    'MTR': (227, 162, 94),
+    'MUG': (33, 96, 48),
+    'MUL': (95, 139, 214),
+    'MUN': (205, 103, 80),
+    'MVA': (232, 149, 18),
+    'MYA': (41, 82, 175),
+    'MYR': (16, 156, 27),
+    'MYS': (236, 242, 243),
+    'MZB': (185, 172, 208),
+    'NAG': (215, 86, 0),
+    'NAH': (126, 180, 154),
+    'NAJ': (50, 105, 70),
+    'NAK': (229, 93, 20),
+    'NAP': (100, 50, 150),
+    'NAT': (203, 164, 103),
+    'NAV': (252, 233, 58),
+    'NAX': (24, 50, 123),
+    'NBI': (81, 58, 223),
+    'NDO': (99, 60, 139),
+    'NED': (220, 138, 57),
+    'NEH': (105, 30, 41),
+    'NEV': (195, 104, 228),
+    'NGA': (249, 160, 55),
+    'NGP': (129, 161, 87),
+    'NHX': (135, 225, 194),
+    'NJR': (110, 159, 225),
+    'NKO': (124, 212, 121),
+    'NNG': (113, 221, 248),
+    'NOG': (0, 120, 145),
+    'NOL': (83, 149, 105),
+    'NOO': (173, 177, 51),
+    'NOR': (117, 165, 188),
+    'NOV': (97, 126, 37),
+    'NPL': (215, 12, 64),
+    'NRM': (131, 138, 116),
+    'NSA': (91, 83, 203),
+    'NSS': (66, 51, 70),
+    'NTC': (49, 182, 135),
+    'NTZ': (156, 43, 172),
+    'NUB': (84, 80, 152),
+    'NUM': (243, 112, 15),
+    'NUP': (211, 84, 79),
+    'NVK': (105, 226, 233),
+    'NVR': (145, 84, 183),
+    'NZH': (176, 72, 77),
+    'NZL': (152, 130, 191),
+    'OAH': (150, 130, 65),
+    'ODA': (224, 4, 27),
+    'ODH': (122, 179, 97),
+    'OEO': (129, 31, 64),
+    'OGD': (169, 168, 101),
+    'OGS': (201, 126, 145),
+    'OHK': (187, 127, 34),
+    'OIR': (204, 184, 177),
+    'OJI': (235, 229, 233),
+    'OKA': (43, 136, 207),
+    'OLD': (147, 130, 118),
+    'OMA': (98, 134, 153),
+    'ONE': (79, 44, 187),
+    'ONO': (107, 77, 63),
+    'OPL': (117, 140, 36),
+    'ORD': (220, 227, 43),
+    'ORI': (210, 106, 47),
+    'ORL': (216, 121, 139),
+    'ORM': (234, 233, 124),
+    'OSA': (251, 245, 104),
+    'OSH': (134, 175, 31),
+    'OSN': (135, 138, 192),
+    'OTM': (123, 71, 65),
+    'OTO': (68, 127, 241),
+    'OTT': (1, 48, 21),
+    'OUC': (216, 145, 145),
+    'OYO': (211, 184, 179),
+    'PAD': (214, 90, 79),
+    'PAH': (98, 186, 171),
+    'PAL': (57, 151, 142),
+    'PAN': (254, 254, 0),
+    'PAP': (211, 220, 178),
+    'PAR': (128, 202, 129),
+    'PAT': (140, 134, 164),
+    'PAW': (46, 49, 146),
+    'PCH': (151, 71, 197),
+    'PCJ': (126, 147, 196),
+    'PDV': (186, 106, 58),
+    'PEG': (140, 210, 160),
+    'PEN': (1, 90, 168),
+    'PEO': (67, 18, 187),
+    'PEQ': (28, 70, 150),
+    'PER': (62, 129, 20),
+    'PEU': (124, 140, 162),
+    'PGA': (157, 174, 219),
+    'PGR': (255, 186, 0),
+    'PGS': (69, 22, 59),
+    'PHA': (93, 102, 151),
+    'PIC': (184, 184, 122),
+    'PIM': (163, 98, 9),
+    'PIR': (10, 10, 10),
+    'PIS': (177, 150, 109),
+    'PLB': (163, 68, 149),
+    'PLC': (176, 81, 111),
+    'PLT': (16, 113, 155),
+    'PLW': (102, 75, 50),
+    'POL': (197, 92, 106),
+    'POM': (61, 136, 66),
+    'POR': (40, 110, 140),
+    'POT': (60, 184, 120),
+    'POW': (255, 247, 153),
+    'PRB': (181, 36, 203),
+    'PRD': (31, 145, 217),
+    'PRG': (75, 188, 60),
+    'PRK': (76, 122, 117),
+    'PRM': (236, 159, 90),
+    'PRO': (93, 160, 163),
+    'PRU': (0, 49, 83),
+    'PRY': (151, 47, 32),
+    'PSA': (226, 81, 93),
+    'PSK': (82, 123, 95),
+    'PSS': (239, 99, 135),
+    'PTA': (229, 231, 26),
+    'PTE': (104, 111, 208),
+    'PTG': (31, 164, 122),
+    'PTL': (237, 204, 20),
+    'PTT': (114, 25, 100),
+    'PUE': (162, 128, 8),
+    'PUN': (187, 79, 86),
+    'QAR': (54, 117, 136),
+    'QAS': (82, 135, 124),
+    'QIC': (58, 168, 113),
+    'QIN': (39, 125, 143),
+    'QNG': (237, 152, 18),
+    'QOM': (107, 107, 225),
+    'QTO': (196, 126, 126),
+    'QUE': (194, 140, 86),
+    'QUI': (31, 239, 121),
+    'RAG': (160, 82, 128),
+    'RAM': (130, 0, 0),
+    'RAS': (205, 10, 10),
+    'REB': (30, 30, 30),
+    'REG': (221, 41, 111),
+    'RFR': (39, 100, 157),
+    'RHA': (218, 113, 11),
+    'RIG': (183, 176, 194),
+    'RJK': (20, 237, 86),
+    'RJP': (49, 13, 22),
+    'RMN': (21, 96, 178),
+    'RMP': (89, 84, 255),
+    'ROM': (167, 10, 100),
+    'ROT': (210, 15, 15),
+    'RSO': (227, 221, 77),
+    'RTT': (66, 126, 118),
+    'RUG': (51, 59, 76),
+    'RUM': (30, 160, 203),
+    'RUP': (136, 48, 66),
+    'RUS': (96, 131, 80),
+    'RVA': (108, 139, 228),
+    'RWA': (213, 160, 18),
+    'RYA': (146, 134, 77),
+    'RYU': (90, 138, 133),
+    'RZI': (204, 121, 68),
+    'RZW': (181, 45, 45),
+    'SAK': (21, 196, 68),
+    'SAL': (0, 74, 128),
+    'SAM': (100, 55, 55),
+    'SAR': (117, 146, 167),
+    'SAT': (172, 105, 47),
+    'SAV': (235, 196, 231),
+    'SAX': (155, 147, 180),
+    'SBA': (0, 163, 175),
+    'SBP': (116, 207, 75),
+    'SCA': (62, 122, 189),
+    'SCO': (199, 175, 12),
+    'SDY': (63, 115, 37),
+    'SEN': (189, 153, 176),
+    'SER': (166, 72, 57),
+    'SFA': (249, 140, 15),
+    'SHA': (212, 105, 118),
+    'SHL': (220, 150, 158),
+    'SHM': (255, 204, 45),
+    'SHN': (89, 185, 198),
+    'SHO': (124, 69, 49),
+    'SHR': (64, 120, 172),
+    'SHU': (167, 33, 62),
+    'SHY': (89, 134, 166),
+    'SIA': (89, 194, 221),
+    'SIB': (139, 138, 160),
+    'SIC': (73, 152, 76),
+    'SIE': (165, 171, 115),
+    'SIL': (84, 166, 93),
+    'SIO': (68, 14, 98),
+    'SIS': (224, 74, 54),
+    'SKA': (43, 121, 188),
+    'SKK': (93, 180, 76),
+    'SLE': (246, 103, 94),
+    'SLN': (191, 155, 203),
+    'SLO': (34, 131, 193),
+    'SLZ': (129, 109, 9),
+    'SMB': (255, 89, 4),
+    'SME': (22, 157, 57),
+    'SMI': (252, 209, 22),
+    'SMO': (106, 160, 43),
+    'SMZ': (101, 49, 142),
+    'SNA': (235, 135, 15),
+    'SND': (135, 104, 85),
+    'SOA': (1, 200, 200),
+    'SOF': (55, 108, 158),
+    'SOK': (201, 19, 70),
+    'SOL': (32, 119, 115),
+    'SOM': (54, 145, 171),
+    'SON': (62, 175, 151),
+    'SOO': (231, 96, 158),
+    'SOR': (67, 80, 128),
+    'SOS': (255, 255, 240),
+    'SPA': (231, 181, 12),
+    'SPI': (97, 209, 251),
+    'SPL': (169, 26, 5),
+    'SRG': (60, 222, 75),
+    'SRH': (249, 120, 3),
+    'SRM': (229, 69, 12),
+    'SRU': (0, 123, 12),
+    'SRV': (98, 206, 253),
+    'SST': (250, 240, 215),
+    'STA': (92, 235, 29),
+    'STE': (33, 119, 58),
+    'STK': (2, 135, 96),
+    'STY': (59, 126, 59),
+    'SUK': (159, 127, 255),
+    'SUL': (89, 164, 144),
+    'SUN': (32, 131, 135),
+    'SUS': (126, 24, 62),
+    'SWA': (225, 98, 87),
+    'SWE': (8, 82, 165),
+    'SWI': (153, 122, 108),
+    'SYG': (219, 206, 94),
+    'SYN': (64, 64, 64),
+    'SYO': (199, 60, 139),
+    'SYR': (125, 110, 225),
+    'SZO': (137, 185, 203),
+    'TAB': (217, 144, 88),
+    'TAH': (59, 57, 118),
+    'TAI': (114, 36, 222),
+    'TAK': (145, 218, 120),
+    'TAN': (110, 50, 50),
+    'TAR': (158, 18, 20),
+    'TAU': (232, 214, 9),
+    'TBK': (161, 224, 201),
+    'TBR': (212, 80, 154),
+    'TDO': (123, 122, 20),
+    'TEA': (200, 215, 130),
+    'TEN': (234, 121, 123),
+    'TEO': (213, 128, 46),
+    'TER': (176, 232, 64),
+    'TET': (63, 82, 1),
+    'TEU': (102, 105, 104),
+    'TEX': (173, 22, 27),
+    'TFL': (140, 45, 100),
+    'TGT': (90, 140, 190),
+    'THU': (66, 126, 157),
+    'TIB': (177, 207, 205),
+    'TID': (135, 186, 186),
+    'TIM': (213, 0, 39),
+    'TIO': (94, 181, 212),
+    'TIR': (170, 43, 21),
+    'TIW': (55, 135, 17),
+    'TKD': (234, 85, 6),
+    'TKG': (47, 93, 80),
+    'TKI': (86, 84, 162),
+    'TLA': (58, 118, 120),
+    'TLC': (57, 160, 101),
+    'TLG': (158, 164, 225),
+    'TLX': (148, 149, 21),
+    'TMB': (230, 231, 62),
+    'TNG': (208, 119, 102),
+    'TNJ': (203, 32, 82),
+    'TNK': (235, 190, 110),
+    'TNT': (148, 122, 151),
+    'TOG': (225, 200, 95),
+    'TOK': (81, 144, 126),
+    'TON': (98, 149, 121),
+    'TOR': (67, 81, 55),
+    'TOT': (48, 49, 121),
+    'TOU': (127, 170, 146),
+    'TPA': (157, 209, 192),
+    'TPQ': (212, 111, 84),
+    'TPR': (211, 95, 73),
+    'TRA': (211, 207, 173),
+    'TRE': (40, 164, 157),
+    'TRI': (208, 104, 44),
+    'TRP': (25, 105, 90),
+    'TRS': (49, 185, 191),
+    'TRT': (50, 166, 72),
+    'TRY': (43, 190, 227),
+    'TSC': (61, 126, 252),
+    'TTI': (88, 56, 34),
+    'TTL': (153, 240, 182),
+    'TTS': (154, 153, 157),
+    'TTT': (162, 0, 130),
+    'TUA': (193, 180, 66),
+    'TUN': (146, 134, 57),
+    'TUR': (126, 203, 120),
+    'TUS': (84, 96, 136),
+    'TVE': (136, 158, 183),
+    'TYO': (99, 160, 139),
+    'TYR': (131, 101, 85),
+    'UBH': (22, 92, 22),
+    'UBV': (19, 102, 152),
+    'UES': (200, 200, 200),
+    'UHW': (180, 215, 145),
+    'UKR': (124, 183, 151),
+    'ULM': (202, 202, 202),
+    'ULS': (234, 214, 165),
+    'URB': (61, 152, 180),
+    'USA': (69, 157, 208),
+    'UTN': (222, 183, 97),
+    'UTR': (223, 198, 64),
+    'UTS': (38, 101, 255),
+    'VAL': (132, 97, 138),
+    'VEN': (54, 167, 156),
+    'VER': (227, 211, 34),
+    'VIE': (151, 174, 28),
+    'VIJ': (246, 196, 24),
+    'VIL': (240, 160, 100),
+    'VIT': (130, 180, 215),
+    'VND': (134, 166, 117),
+    'VNL': (195, 90, 135),
+    'VNZ': (213, 82, 109),
+    'VOC': (205, 125, 46),
+    'VOL': (205, 38, 38),
+    'VRM': (50, 120, 10),
+    'VRN': (121, 163, 114),
+    'WAD': (166, 161, 139),
+    'WAI': (200, 200, 200),
+    'WAL': (161, 126, 128),
+    'WAM': (95, 5, 210),
+    'WAR': (18, 97, 128),
+    'WBG': (147, 146, 106),
+    'WCR': (28, 187, 180),
+    'WCY': (91, 72, 141),
+    'WEN': (220, 130, 127),
+    'WES': (231, 230, 138),
+    'WGD': (40, 152, 60),
+    'WIC': (121, 10, 215),
+    'WKA': (224, 214, 157),
+    'WLS': (117, 127, 174),
+    'WLY': (202, 200, 175),
+    'WOL': (235, 178, 18),
+    'WRU': (101, 138, 42),
+    'WSI': (86, 195, 80),
+    'WUR': (111, 162, 128),
+    'WUU': (126, 87, 198),
+    'XAL': (98, 49, 221),
+    'XIU': (94, 236, 91),
+    'YAK': (99, 160, 239),
+    'YAN': (219, 44, 21),
+    'YAO': (130, 31, 72),
+    'YAQ': (127, 32, 49),
+    'YAR': (131, 141, 142),
+    'YAS': (239, 125, 125),
+    'YAT': (77, 231, 25),
+    'YEM': (106, 38, 44),
+    'YKT': (172, 232, 149),
+    'YMN': (140, 72, 128),
+    'YNU': (230, 145, 62),
+    'YOK': (64, 106, 191),
+    'YOL': (120, 85, 160),
+    'YOR': (47, 132, 124),
+    'YUA': (188, 18, 18),
+    'YUE': (89, 113, 223),
+    'YZD': (239, 164, 19),
+    'ZAF': (155, 88, 127),
+    'ZAN': (81, 141, 85),
+    'ZAP': (158, 118, 120),
+    'ZAZ': (117, 112, 131),
+    'ZIM': (186, 164, 78),
+    'ZND': (184, 151, 191),
+    'ZNI': (62, 128, 108),
+    'ZUL': (177, 12, 12),
+    'ZUN': (129, 97, 62),
+    'ZZZ': (138, 22, 59),
+}
@@ -0,0 +1,27 @@
+import colorsys
+import hashlib
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Mapping, Optional, Tuple
+from .country_color_table import COUNTRY_COLORS as _GENERATED_COLORS
+
+Color = Tuple[int, int, int]
+
+# Read-only view of the table generated by generate_country_colors.py
+COUNTRY_COLORS: Mapping[str, Color] = MappingProxyType(_GENERATED_COLORS)
+
+@lru_cache(maxsize=4096)
+def fallback_color(country_tag: str) -> Color:
+    """Deterministic color for tags missing from the table (e.g. colonial nations)"""
+    digest = hashlib.blake2s(country_tag.encode('utf-8'), digest_size=4).digest()
+    hue = int.from_bytes(digest[:2], 'big') / 0xFFFF
+    saturation = 0.45 + (digest[2] / 255) * 0.35
+    value = 0.55 + (digest[3] / 255) * 0.35
+    r, g, b = colorsys.hsv_to_rgb(hue, saturation, value)
+    return (round(r * 255), round(g * 255), round(b * 255))
+
+def get_country_color(country_tag: str, overrides: Optional[Mapping[str, Color]] = None) -> Color:
+    """Color for a tag: the save's own map color if known, then the table, then a hash"""
+    if overrides and country_tag in overrides:
+        return overrides[country_tag]
+    return COUNTRY_COLORS.get(country_tag) or fallback_color(country_tag)
@@ -1,43 +1,48 @@
+import hashlib
+import threading
 import mysql.connector
 from mysql.connector import errorcode
 from .config import Config
-from typing import Dict, Any, List, Optional
+from .db_backends import DatabaseError, duplicate_key, get_backend, is_duplicate_entry
+from typing import Dict, Any, List, Optional, Set, Tuple
 import json
+import math
+from collections import Counter
 from app.s3_service import S3Service
+from .metrics import InstrumentedConnection
+
+class DuplicateUserError(ValueError):
+    """Raised when a username or email is already registered"""
+    def __init__(self, field: str):
+        super().__init__(f"{field} already exists")
+        self.field = field
 
 class Database:
+    _schema_lock = threading.Lock()
+    _schema_ready = False
+
     def __init__(self):
-        self.config = {
-            'host': Config.DB_HOST,
-            'user': Config.DB_USER,
-            'password': Config.DB_PASSWORD,
-            'database': Config.DB_NAME
-        }
-        self._ensure_database_exists()
-        self._create_tables()
+        self.backend = get_backend()
+        self.ensure_schema()
+
+    def ensure_schema(self) -> None:
+        """Create the database and tables once per process
+
+        Runs on first use rather than at import or app creation, so a worker
+        can boot while MySQL is briefly unavailable and retry later.
+        """
+        if Database._schema_ready:
+            return
+        with Database._schema_lock:
+            if not Database._schema_ready:
+                self.backend.ensure_database()
+                self._create_tables()
+                Database._schema_ready = True
 
     def _get_connection(self):
-        """Get a new database connection"""
-        return mysql.connector.connect(**self.config)
-
-    def _ensure_database_exists(self):
-        """Create database if it doesn't exist"""
-        try:
-            # Connect without specifying a database
-            conn = mysql.connector.connect(
-                host=self.config['host'],
-                user=self.config['user'],
-                password=self.config['password']
-            )
-            cursor = conn.cursor()
-
-            # Create database if not exists
-            cursor.execute(f"CREATE DATABASE IF NOT EXISTS {self.config['database']}")
-            cursor.close()
-            conn.close()
-        except mysql.connector.Error as err:
-            print(f"Failed creating database: {err}")
-            raise
+        """Get a pooled database connection; close() returns it to the pool"""
+        conn = self.backend.connect()
+        return InstrumentedConnection(conn) if Config.METRICS_ENABLED else conn
 
     def _create_tables(self):
         """Create all required tables if they don't exist"""
@@ -82,18 +87,152 @@ class Database:
                     country_tag TEXT NOT NULL,
                     date TEXT NOT NULL,
                     event_type TEXT NOT NULL,
-                    details TEXT NOT NULL
+                    details TEXT NOT NULL,
+                    campaign_id INT
                 )
             """, "historical_events table created"),
+            'event_payloads': ("""
+                CREATE TABLE IF NOT EXISTS event_payloads (
+                    id INT AUTO_INCREMENT PRIMARY KEY,
+                    file_checksum VARCHAR(64) NOT NULL,
+                    country_tag VARCHAR(8) NOT NULL,
+                    date VARCHAR(16) NOT NULL,
+                    event_type VARCHAR(64) NOT NULL,
+                    name VARCHAR(255),
+                    adm SMALLINT,
+                    dip SMALLINT,
+                    mil SMALLINT,
+                    payload JSON,
+                    campaign_id INT,
+                    INDEX idx_event_payloads_file (file_checksum, country_tag),
+                    INDEX idx_event_payloads_type (event_type, file_checksum)
+                )
+            """, "event_payloads table created"),
+            'country_map_colors': ("""
+                CREATE TABLE IF NOT EXISTS country_map_colors (
+                    file_checksum VARCHAR(64) NOT NULL,
+                    country_tag VARCHAR(8) NOT NULL,
+                    r TINYINT UNSIGNED NOT NULL,
+                    g TINYINT UNSIGNED NOT NULL,
+                    b TINYINT UNSIGNED NOT NULL,
+                    PRIMARY KEY (file_checksum, country_tag)
+                )
+            """, "country_map_colors table created"),
             'annual_income': ("""
                 CREATE TABLE IF NOT EXISTS annual_income (
                     id INT AUTO_INCREMENT PRIMARY KEY,
                     file_checksum TEXT NOT NULL,
                     country_tag TEXT NOT NULL,
                     year TEXT NOT NULL,
-                    income FLOAT NOT NULL
+                    income FLOAT NOT NULL,
+                    campaign_id INT
                 )
             """, "annual_income table created"),
+            'campaigns': ("""
+                CREATE TABLE IF NOT EXISTS campaigns (
+                    id INT AUTO_INCREMENT PRIMARY KEY,
+                    user_id INT NOT NULL,
+                    campaign_key VARCHAR(64) NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (user_id) REFERENCES users(id),
+                    UNIQUE KEY unique_campaign (user_id, campaign_key)
+                )
+            """, "campaigns table created"),
+            'campaign_files': ("""
+                CREATE TABLE IF NOT EXISTS campaign_files (
+                    campaign_id INT NOT NULL,
+                    file_checksum VARCHAR(64) NOT NULL,
+                    seq INT NOT NULL,
+                    game_date VARCHAR(16) NOT NULL,
+                    PRIMARY KEY (campaign_id, seq),
+                    UNIQUE KEY unique_campaign_file (campaign_id, file_checksum),
+                    INDEX idx_campaign_files_checksum (file_checksum),
+                    FOREIGN KEY (campaign_id) REFERENCES campaigns(id) ON DELETE CASCADE
+                )
+            """, "campaign_files table created"),
+            'leaderboard_stats': ("""
+                CREATE TABLE IF NOT EXISTS leaderboard_stats (
+                    user_id INT NOT NULL,
+                    country_tag VARCHAR(8) NOT NULL,
+                    plays INT NOT NULL DEFAULT 0,
+                    peak_income FLOAT NOT NULL DEFAULT 0,
+                    first_year_over_threshold INT,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                    PRIMARY KEY (user_id, country_tag),
+                    INDEX idx_leaderboard_first_year (first_year_over_threshold),
+                    INDEX idx_leaderboard_peak (peak_income)
+                )
+            """, "leaderboard_stats table created"),
+            'file_extractions': ("""
+                CREATE TABLE IF NOT EXISTS file_extractions (
+                    file_id INT NOT NULL,
+                    extractor VARCHAR(64) NOT NULL,
+                    version INT NOT NULL,
+                    extracted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                    PRIMARY KEY (file_id, extractor),
+                    FOREIGN KEY (file_id) REFERENCES uploaded_files(id) ON DELETE CASCADE
+                )
+            """, "file_extractions table created"),
+            'ingest_profiles': ("""
+                CREATE TABLE IF NOT EXISTS ingest_profiles (
+                    file_id INT PRIMARY KEY,
+                    total_ms FLOAT NOT NULL,
+                    stages JSON NOT NULL,
+                    parser_stages JSON NOT NULL,
+                    profile_path VARCHAR(512) NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    INDEX idx_ingest_profiles_recent (created_at, total_ms),
+                    FOREIGN KEY (file_id) REFERENCES uploaded_files(id) ON DELETE CASCADE
+                )
+            """, "ingest_profiles table created"),
+            'app_settings': ("""
+                CREATE TABLE IF NOT EXISTS app_settings (
+                    name VARCHAR(64) PRIMARY KEY,
+                    value VARCHAR(255),
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+                )
+            """, "app_settings table created"),
+            'cache_generations': ("""
+                CREATE TABLE IF NOT EXISTS cache_generations (
+                    scope VARCHAR(128) PRIMARY KEY,
+                    generation INT NOT NULL
+                )
+            """, "cache_generations table created"),
+            'backfill_checkpoints': ("""
+                CREATE TABLE IF NOT EXISTS backfill_checkpoints (
+                    job VARCHAR(64) PRIMARY KEY,
+                    last_file_id INT NOT NULL,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+                )
+            """, "backfill_checkpoints table created"),
+            'import_checkpoints': ("""
+                CREATE TABLE IF NOT EXISTS import_checkpoints (
+                    user_id INT NOT NULL,
+                    source_hash CHAR(64) NOT NULL,
+                    source VARCHAR(1024) NOT NULL,
+                    sources_done INT NOT NULL,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                    PRIMARY KEY (user_id, source_hash),
+                    FOREIGN KEY (user_id) REFERENCES users(id)
+                )
+            """, "import_checkpoints table created"),
+            'ingest_jobs': ("""
+                CREATE TABLE IF NOT EXISTS ingest_jobs (
+                    id CHAR(32) PRIMARY KEY,
+                    user_id INT NOT NULL,
+                    filename VARCHAR(255) NOT NULL,
+                    meta JSON NOT NULL,
+                    state ENUM('queued', 'processing', 'done', 'failed') NOT NULL,
+                    checksum VARCHAR(64),
+                    error TEXT,
+                    worker VARCHAR(255) NOT NULL,
+                    submitted_at DOUBLE NOT NULL,
+                    finished_at DOUBLE,
+                    FOREIGN KEY (user_id) REFERENCES users(id),
+                    INDEX idx_ingest_jobs_user (user_id, submitted_at),
+                    INDEX idx_ingest_jobs_finished (finished_at)
+                )
+            """, "ingest_jobs table created"),
             'user_friends': ("""
                 CREATE TABLE IF NOT EXISTS user_friends (
                     id INT AUTO_INCREMENT PRIMARY KEY,
@@ -106,6 +245,16 @@ class Database:
                     UNIQUE KEY unique_friendship (user_id, friend_id)
                 )
             """, "user_friends table created"),
+            'friendships': ("""
+                CREATE TABLE IF NOT EXISTS friendships (
+                    user_id INT NOT NULL,
+                    friend_id INT NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (user_id, friend_id),
+                    FOREIGN KEY (user_id) REFERENCES users(id),
+                    FOREIGN KEY (friend_id) REFERENCES users(id)
+                )
+            """, "friendships table created"),
             'user_file_permissions': ("""
                 CREATE TABLE IF NOT EXISTS user_file_permissions (
                     id INT AUTO_INCREMENT PRIMARY KEY,
@@ -117,6 +266,16 @@ class Database:
                     UNIQUE KEY unique_permission (file_id, user_id)
                 )
             """, "user_file_permissions table created"),
+            'file_friend_shares': ("""
+                CREATE TABLE IF NOT EXISTS file_friend_shares (
+                    file_id INT PRIMARY KEY,
+                    owner_id INT NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    FOREIGN KEY (file_id) REFERENCES uploaded_files(id) ON DELETE CASCADE,
+                    FOREIGN KEY (owner_id) REFERENCES users(id),
+                    INDEX idx_file_friend_shares_owner (owner_id)
+                )
+            """, "file_friend_shares table created"),
             'topics': ("""
                 CREATE TABLE IF NOT EXISTS topics (
                     id INT AUTO_INCREMENT PRIMARY KEY,
@@ -140,11 +299,21 @@ class Database:
             """, "posts table created")
         }
 
-        conn = self._get_connection()
+        # Direct connection so the pool is never created before a fork
+        conn = self.backend.connect_direct()
+        if self.backend.name == 'sqlite':
+            try:
+                self.backend.create_schema(conn)
+            finally:
+                conn.close()
+            return
+
         cursor = conn.cursor()
         
         # Enable foreign key constraints
         cursor.execute("SET FOREIGN_KEY_CHECKS=1")
+
+        had_friendships = self.backend.table_exists(cursor, 'friendships')
         
         for table_name, (ddl, msg) in tables.items():
             try:
@@ -157,151 +326,1131 @@ class Database:
                     print(f"Error creating table '{table_name}': {err}")
                     raise
         
+        # Mirror friendships accepted before the friendships table existed
+        if not had_friendships:
+            cursor.execute("""
+                INSERT IGNORE INTO friendships (user_id, friend_id)
+                SELECT user_id, friend_id FROM user_friends WHERE status = 'accepted'
+                UNION
+                SELECT friend_id, user_id FROM user_friends WHERE status = 'accepted'
+            """)
+            conn.commit()
+
+        # Delta rows belong to the campaign that stored them; rows stored
+        # before the column existed are assigned to their save's campaign
+        for table in ('historical_events', 'event_payloads', 'annual_income'):
+            try:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN campaign_id INT")
+            except mysql.connector.Error as err:
+                if err.errno != errorcode.ER_DUP_FIELDNAME:
+                    print(f"Error adding campaign_id to '{table}': {err}")
+                    raise
+            else:
+                cursor.execute(f"""
+                    UPDATE {table} t
+                    JOIN campaign_files cf ON cf.file_checksum = t.file_checksum
+                    SET t.campaign_id = cf.campaign_id
+                """)
+                conn.commit()
+
+        # Indexes added after the original tables shipped; CREATE TABLE IF NOT
+        # EXISTS won't add them to existing databases
+        indexes = [
+            "CREATE INDEX idx_uploaded_files_checksum ON uploaded_files (checksum, user_id)",
+            "CREATE INDEX idx_uploaded_files_user ON uploaded_files (user_id, processed_at)",
+            "CREATE INDEX idx_permissions_user_file ON user_file_permissions (user_id, file_id)",
+            "CREATE INDEX idx_user_friends_recipient ON user_friends (friend_id, status)",
+            "CREATE INDEX idx_current_state_file ON current_state (file_checksum(64), country_tag(8))",
+            "CREATE INDEX idx_historical_events_file ON historical_events (file_checksum(64), country_tag(8))",
+            "CREATE INDEX idx_annual_income_file ON annual_income (file_checksum(64), country_tag(8))",
+            "CREATE INDEX idx_historical_events_campaign ON historical_events (campaign_id, file_checksum(64))",
+            "CREATE INDEX idx_event_payloads_campaign ON event_payloads (campaign_id, file_checksum)",
+            "CREATE INDEX idx_annual_income_campaign ON annual_income (campaign_id, file_checksum(64))",
+        ]
+        for ddl in indexes:
+            try:
+                cursor.execute(ddl)
+            except mysql.connector.Error as err:
+                if err.errno != errorcode.ER_DUP_KEYNAME:
+                    print(f"Error creating index: {err}")
+                    raise
+        
         cursor.close()
         conn.close()
 
-    # User methods
-    def create_user(self, username: str, email: str, password_hash: str) -> int:
-        """Create a new user and return user ID"""
+    # Access check for queries already narrowed to a few files (by ID or
+    # checksum): the owner, an explicit grant, or a friends-wide share from
+    # a friend. Takes the user ID three times, see _access_params.
+    _FILE_ACCESS_SQL = """(
+        uf.user_id = %s
+        OR EXISTS (
+            SELECT 1 FROM user_file_permissions ufp
+            WHERE ufp.file_id = uf.id AND ufp.user_id = %s
+        )
+        OR EXISTS (
+            SELECT 1 FROM file_friend_shares ffs
+            JOIN friendships f ON f.user_id = ffs.owner_id AND f.friend_id = %s
+            WHERE ffs.file_id = uf.id
+        )
+    )"""
+
+    @staticmethod
+    def _access_params(user_id: int) -> tuple:
+        return (user_id,) * 3
+
+    # IDs of the files shared with a user, each branch driven by the user's
+    # own index entries so the cost grows with their grants, not the table.
+    # Friendships are mirrored, so the user's rows list every friend.
+    _SHARED_FILE_IDS_SQL = """(
+        SELECT ufp.file_id FROM user_file_permissions ufp
+        WHERE ufp.user_id = %s
+        UNION
+        SELECT ffs.file_id FROM friendships f
+        JOIN file_friend_shares ffs ON ffs.owner_id = f.friend_id
+        WHERE f.user_id = %s
+    )"""
+
+    # User methods
+    def create_user(self, username: str, email: str, password_hash: str) -> int:
+        """Create a new user and return user ID
+
+        Uniqueness is left to the UNIQUE indexes on username and email, so
+        concurrent registrations can't both pass a SELECT check; a conflict
+        raises DuplicateUserError naming the field.
+        """
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute(
+                "INSERT INTO users (username, email, password_hash) VALUES (%s, %s, %s)",
+                (username, email, password_hash)
+            )
+            user_id = cursor.lastrowid
+            conn.commit()
+            return user_id
+        except DatabaseError as err:
+            conn.rollback()
+            if is_duplicate_entry(err):
+                key = duplicate_key(err)
+                raise DuplicateUserError('email' if key == 'email' else 'username') from err
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+
+    def get_user_by_id(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """Get user by ID"""
+        conn = self._get_connection()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            cursor.execute("SELECT * FROM users WHERE id = %s", (user_id,))
+            return cursor.fetchone()
+        finally:
+            cursor.close()
+            conn.close()
+
+    def get_user_by_username(self, username: str) -> Optional[Dict[str, Any]]:
+        """Get user by username"""
+        conn = self._get_connection()
+        cursor = conn.cursor(dictionary=True)
+        
+        try:
+            cursor.execute(
+                "SELECT * FROM users WHERE username = %s",
+                (username,)
+            )
+            return cursor.fetchone()
+        finally:
+            cursor.close()
+            conn.close()
+
+    def update_password_hash(self, user_id: int, password_hash: str) -> None:
+        """Replace a user's stored password hash"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("UPDATE users SET password_hash = %s WHERE id = %s", (password_hash, user_id))
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
+
+    # File processing methods
+    def register_file_processing(self, conn, original_filename: str, checksum: str, json_path: str, user_id: int, s3_key: str = None) -> int:
+        """Register a file processing in the database and return its ID (no commit)"""
+        cursor = conn.cursor()
+        try:
+            cursor.execute('''
+                INSERT INTO uploaded_files 
+                (original_filename, checksum, json_path, user_id, s3_key, processed_at)
+                VALUES (%s, %s, %s, %s, %s, NOW())
+            ''', (original_filename, checksum, json_path, user_id, s3_key))
+            return cursor.lastrowid
+        except Exception as e:
+            raise
+        finally:
+            cursor.close()
+
+    def save_current_state(self, conn, checksum: str, country_data: Dict[str, Any]) -> None:
+        """Save current state data for a country (no commit)"""
+        cursor = conn.cursor()
+        try:
+            cursor.execute(
+                """INSERT INTO current_state 
+                (file_checksum, country_tag, date, income, manpower, max_manpower, trade_income) 
+                VALUES (%s, %s, %s, %s, %s, %s, %s)""",
+                (
+                    checksum,
+                    country_data['country_tag'],
+                    country_data['current_state']['date'],
+                    json.dumps(country_data['current_state']['income']),
+                    country_data['current_state']['manpower'],
+                    country_data['current_state']['max_manpower'],
+                    country_data['current_state']['trade_income']
+                )
+            )
+        except Exception as e:
+            raise
+        finally:
+            cursor.close()
+
+    def save_historical_events(self, conn, checksum: str, country_data: Dict[str, Any],
+                               known: Optional[Dict[str, Any]] = None,
+                               campaign_id: Optional[int] = None) -> None:
+        """Save historical events and their typed payloads for a country (no commit)
+
+        When `known` campaign rows are given, events already stored for an
+        earlier save of the same campaign are skipped.
+        """
+        cursor = conn.cursor()
+        try:
+            tag = country_data['country_tag']
+            events = country_data['historical_events']
+            if known is not None:
+                seen = known['events']
+                new_events = []
+                for e in events:
+                    key = (tag, e['date'], e['event_type'], e['details'])
+                    if key not in seen:
+                        seen.add(key)
+                        new_events.append(e)
+                events = new_events
+
+            cursor.executemany(
+                """INSERT INTO historical_events 
+                (file_checksum, country_tag, date, event_type, details, campaign_id) 
+                VALUES (%s, %s, %s, %s, %s, %s)""",
+                [(checksum, tag, e['date'], e['event_type'], e['details'], campaign_id) for e in events]
+            )
+
+            self._insert_event_payloads(cursor, checksum, tag, events, campaign_id)
+        except Exception as e:
+            raise
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def _insert_event_payloads(cursor, checksum: str, tag: str, events: List[Dict[str, Any]],
+                               campaign_id: Optional[int] = None) -> None:
+        """Bulk insert the typed payloads of a country's events"""
+        payload_rows = []
+        for event in events:
+            payload = event.get('payload')
+            if not payload:
+                continue
+            payload_rows.append((
+                checksum,
+                tag,
+                event['date'],
+                event['event_type'],
+                payload.get('name'),
+                payload.get('adm'),
+                payload.get('dip'),
+                payload.get('mil'),
+                json.dumps(payload, separators=(',', ':')),
+                campaign_id
+            ))
+        if payload_rows:
+            cursor.executemany(
+                """INSERT INTO event_payloads
+                (file_checksum, country_tag, date, event_type, name, adm, dip, mil, payload, campaign_id)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)""",
+                payload_rows
+            )
+
+    def replace_event_payloads(self, conn, checksum: str, countries: List[Dict[str, Any]]) -> None:
+        """Rewrite a file's event payloads from parser output (no commit)
+
+        Only events the file stores itself get a payload: events an earlier
+        save of the campaign already holds keep theirs on that save. Every
+        campaign holding the file gets payloads for its own events.
+        """
+        cursor = conn.cursor()
+        try:
+            cursor.execute("DELETE FROM event_payloads WHERE file_checksum = %s", (checksum,))
+            cursor.execute("""
+                SELECT campaign_id, country_tag, date, event_type, details FROM historical_events
+                WHERE file_checksum = %s
+            """, (checksum,))
+            stored_by_campaign = {}
+            for campaign_id, *key in cursor.fetchall():
+                stored_by_campaign.setdefault(campaign_id, Counter())[tuple(key)] += 1
+            for campaign_id, stored in stored_by_campaign.items():
+                for country_data in countries:
+                    tag = country_data['country_tag']
+                    events = []
+                    for event in country_data.get('historical_events', []):
+                        key = (tag, event['date'], event['event_type'], event['details'])
+                        if stored[key]:
+                            stored[key] -= 1
+                            events.append(event)
+                    self._insert_event_payloads(cursor, checksum, tag, events, campaign_id)
+        finally:
+            cursor.close()
+
+    def replace_map_colors(self, conn, checksum: str, countries: List[Dict[str, Any]]) -> None:
+        """Rewrite the in-game map colors of a file's countries (no commit)"""
+        cursor = conn.cursor()
+        try:
+            cursor.execute("DELETE FROM country_map_colors WHERE file_checksum = %s", (checksum,))
+            rows = []
+            for country_data in countries:
+                color = country_data.get('current_state', {}).get('map_color') or []
+                if len(color) >= 3:
+                    rows.append((checksum, country_data['country_tag'], *color[:3]))
+            if rows:
+                cursor.executemany(
+                    """INSERT INTO country_map_colors (file_checksum, country_tag, r, g, b)
+                    VALUES (%s, %s, %s, %s, %s)""",
+                    rows
+                )
+        finally:
+            cursor.close()
+
+    def save_annual_income(self, conn, checksum: str, country_data: Dict[str, Any],
+                           known: Optional[Dict[str, Any]] = None,
+                           campaign_id: Optional[int] = None) -> None:
+        """Save annual income data for a country (no commit)
+
+        When `known` campaign rows are given, years whose income is unchanged
+        since an earlier save of the same campaign are skipped.
+        """
+        cursor = conn.cursor()
+        try:
+            tag = country_data['country_tag']
+            annual_income = country_data.get('annual_income', [])
+            
+            # Handle both list and dict formats
+            if isinstance(annual_income, list):
+                entries = [(e['year'], e['income']) for e in annual_income]
+            else:  # Assume it's a dict
+                entries = list(annual_income.items())
+
+            if known is not None:
+                latest = known['income']
+                new_entries = []
+                for year, income in entries:
+                    previous = latest.get((tag, str(year)))
+                    if previous is None or not math.isclose(previous, income, rel_tol=1e-5, abs_tol=1e-3):
+                        latest[(tag, str(year))] = income
+                        new_entries.append((year, income))
+                entries = new_entries
+
+            cursor.executemany(
+                """INSERT INTO annual_income 
+                (file_checksum, country_tag, year, income, campaign_id) 
+                VALUES (%s, %s, %s, %s, %s)""",
+                [(checksum, tag, year, income, campaign_id) for year, income in entries]
+            )
+        except Exception as e:
+            raise
+        finally:
+            cursor.close()
+
+    def save_all_country_data(self, conn, checksum: str, country_data: Dict[str, Any],
+                              known: Optional[Dict[str, Any]] = None,
+                              campaign_id: Optional[int] = None) -> None:
+        """Save all data for a country in a single transaction (no commit)
+
+        Income and event rows are owned by `campaign_id`: another user's
+        copy of the same save stores its own deltas under its own campaign.
+        """
+        try:
+            if 'current_state' in country_data:
+                self.save_current_state(conn, checksum, country_data)
+            if 'historical_events' in country_data:
+                self.save_historical_events(conn, checksum, country_data, known, campaign_id)
+            if 'annual_income' in country_data:
+                # Handle empty annual_income case
+                if country_data['annual_income']:  # Only save if not empty
+                    self.save_annual_income(conn, checksum, country_data, known, campaign_id)
+        except Exception as e:
+            raise
+
+    # Campaign methods
+    def get_or_create_campaign(self, conn, user_id: int, campaign_key: str) -> int:
+        """Get the user's campaign for a save's campaign identity, creating it if needed (no commit)"""
+        cursor = conn.cursor()
+        try:
+            if self.backend.name == 'sqlite':
+                # The write lock is held from here on, so the row can't vanish in between
+                cursor.execute("""
+                    INSERT IGNORE INTO campaigns (user_id, campaign_key) VALUES (%s, %s)
+                """, (user_id, campaign_key))
+                cursor.execute("""
+                    SELECT id FROM campaigns WHERE user_id = %s AND campaign_key = %s
+                """, (user_id, campaign_key))
+                return cursor.fetchone()[0]
+            cursor.execute("""
+                INSERT INTO campaigns (user_id, campaign_key) VALUES (%s, %s)
+                ON DUPLICATE KEY UPDATE id = LAST_INSERT_ID(id)
+            """, (user_id, campaign_key))
+            return cursor.lastrowid
+        finally:
+            cursor.close()
+
+    def add_file_to_campaign(self, conn, campaign_id: int, checksum: str, game_date: str) -> Optional[Dict[str, Any]]:
+        """Add a file to a campaign and return its position, or None if already there (no commit)
+
+        The position holds the new sequence number and game date, whether
+        any save precedes it in game-date order, and the checksum of the
+        save directly after it when an earlier save arrives late.
+        """
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT COALESCE(MAX(seq), 0) + 1 FROM campaign_files
+                WHERE campaign_id = %s FOR UPDATE
+            """, (campaign_id,))
+            seq = cursor.fetchone()[0]
+            cursor.execute("""
+                SELECT 1 FROM campaign_files WHERE campaign_id = %s AND file_checksum = %s
+            """, (campaign_id, checksum))
+            if cursor.fetchone():
+                return None
+            cursor.execute("""
+                INSERT INTO campaign_files (campaign_id, file_checksum, seq, game_date)
+                VALUES (%s, %s, %s, %s)
+            """, (campaign_id, checksum, seq, game_date))
+
+            cursor.execute("""
+                SELECT 1 FROM campaign_files
+                WHERE campaign_id = %s AND (game_date, seq) < (%s, %s)
+                LIMIT 1
+            """, (campaign_id, game_date, seq))
+            has_earlier = cursor.fetchone() is not None
+            cursor.execute("""
+                SELECT file_checksum FROM campaign_files
+                WHERE campaign_id = %s AND (game_date, seq) > (%s, %s)
+                ORDER BY game_date, seq
+                LIMIT 1
+            """, (campaign_id, game_date, seq))
+            successor = cursor.fetchone()
+            return {
+                'campaign_id': campaign_id,
+                'seq': seq,
+                'game_date': game_date,
+                'has_earlier': has_earlier,
+                'successor': successor[0] if successor else None,
+            }
+        finally:
+            cursor.close()
+
+    def get_campaign_known_rows(self, conn, position: Dict[str, Any], country_tag: str) -> Dict[str, Any]:
+        """Load a country's rows stored by saves before a campaign position, used to store only deltas
+
+        Only rows from saves earlier in game-date order count, since those
+        are the saves a read of the new one resolves against.
+        """
+        if not position['has_earlier']:
+            return {'income': {}, 'events': set()}
+        cursor = conn.cursor()
+        try:
+            params = (position['campaign_id'], position['game_date'], position['seq'], country_tag)
+            cursor.execute("""
+                SELECT ai.country_tag, ai.year, ai.income
+                FROM campaign_files cf
+                JOIN annual_income ai
+                    ON ai.file_checksum = cf.file_checksum AND ai.campaign_id = cf.campaign_id
+                WHERE cf.campaign_id = %s AND (cf.game_date, cf.seq) < (%s, %s)
+                AND ai.country_tag = %s
+                ORDER BY cf.game_date, cf.seq
+            """, params)
+            income = {(tag, str(year)): value for tag, year, value in cursor.fetchall()}
+
+            cursor.execute("""
+                SELECT he.country_tag, he.date, he.event_type, he.details
+                FROM campaign_files cf
+                JOIN historical_events he
+                    ON he.file_checksum = cf.file_checksum AND he.campaign_id = cf.campaign_id
+                WHERE cf.campaign_id = %s AND (cf.game_date, cf.seq) < (%s, %s)
+                AND he.country_tag = %s
+            """, params)
+            events = set(cursor.fetchall())
+
+            return {'income': income, 'events': events}
+        finally:
+            cursor.close()
+
+    def rebase_campaign_successor(self, conn, position: Dict[str, Any], country_data: Dict[str, Any],
+                                  known: Dict[str, Any]) -> None:
+        """Keep a later save's rows correct when an earlier save is inserted before it (no commit)
+
+        The later save (the position's successor) only stored rows that
+        differed from the saves before it. Rows it shares with the inserted
+        save now come from that save and are deleted here, and income years
+        the inserted save changes are pinned to the value the later save
+        resolved to. `known` must be the rows known before the inserted
+        save's own rows are saved.
+        """
+        successor, campaign_id = position['successor'], position['campaign_id']
+        tag = country_data['country_tag']
+        annual_income = country_data.get('annual_income') or []
+        if isinstance(annual_income, list):
+            income = {str(e['year']): e['income'] for e in annual_income}
+        else:
+            income = {str(year): value for year, value in annual_income.items()}
+        events = {(e['date'], e['event_type'], e['details']): e for e in country_data.get('historical_events', [])}
+
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT id, year, income FROM annual_income
+                WHERE campaign_id = %s AND file_checksum = %s AND country_tag = %s
+            """, (campaign_id, successor, tag))
+            own_income = {str(year): (row_id, value) for row_id, year, value in cursor.fetchall()}
+            shared = [row_id for year, (row_id, value) in own_income.items()
+                      if year in income and math.isclose(value, income[year], rel_tol=1e-5, abs_tol=1e-3)]
+            pinned = []
+            for year, value in income.items():
+                previous = known['income'].get((tag, year))
+                if (year not in own_income and previous is not None
+                        and not math.isclose(previous, value, rel_tol=1e-5, abs_tol=1e-3)):
+                    pinned.append((successor, tag, year, previous, campaign_id))
+
+            cursor.execute("""
+                SELECT id, date, event_type, details FROM historical_events
+                WHERE campaign_id = %s AND file_checksum = %s AND country_tag = %s
+            """, (campaign_id, successor, tag))
+            shared_events = [(row_id, events[(date, event_type, details)])
+                             for row_id, date, event_type, details in cursor.fetchall()
+                             if (date, event_type, details) in events]
+
+            # Payloads of the shared events, matched on what the payload table keeps
+            moved_payloads = {}
+            for _, event in shared_events:
+                if event.get('payload'):
+                    key = (event['date'], event['event_type'], event['payload'].get('name'))
+                    moved_payloads[key] = moved_payloads.get(key, 0) + 1
+            shared_payloads = []
+            if moved_payloads:
+                cursor.execute("""
+                    SELECT id, date, event_type, name FROM event_payloads
+                    WHERE campaign_id = %s AND file_checksum = %s AND country_tag = %s
+                """, (campaign_id, successor, tag))
+                for row_id, date, event_type, name in cursor.fetchall():
+                    if moved_payloads.get((date, event_type, name)):
+                        moved_payloads[(date, event_type, name)] -= 1
+                        shared_payloads.append(row_id)
+
+            for table, ids in (('annual_income', shared),
+                               ('historical_events', [row_id for row_id, _ in shared_events]),
+                               ('event_payloads', shared_payloads)):
+                if ids:
+                    cursor.execute(
+                        f"DELETE FROM {table} WHERE id IN ({', '.join(['%s'] * len(ids))})", tuple(ids)
+                    )
+            if pinned:
+                cursor.executemany("""
+                    INSERT INTO annual_income (file_checksum, country_tag, year, income, campaign_id)
+                    VALUES (%s, %s, %s, %s, %s)
+                """, pinned)
+        finally:
+            cursor.close()
+
+    def _campaign_scope(self, conn, checksum: str, owner_id: int) -> Tuple[Optional[int], List[str]]:
+        """The owner's campaign holding a file and the checksums whose rows make up its data
+
+        Checksums are ordered oldest game date first. Files ingested before
+        campaigns existed have no campaign and only their own rows.
+        """
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT cf.campaign_id, cf.file_checksum
+                FROM campaign_files target
+                JOIN campaigns c ON c.id = target.campaign_id
+                JOIN campaign_files cf ON cf.campaign_id = target.campaign_id
+                WHERE target.file_checksum = %s AND c.user_id = %s
+                AND (cf.game_date, cf.seq) <= (target.game_date, target.seq)
+                ORDER BY cf.game_date, cf.seq
+            """, (checksum, owner_id))
+            rows = cursor.fetchall()
+            if not rows:
+                return None, [checksum]
+            return rows[0][0], [row[1] for row in rows]
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def _scope_filter(campaign_id: Optional[int], scope: List[str]) -> Tuple[str, tuple]:
+        """WHERE condition and parameters selecting the delta rows of a campaign scope"""
+        placeholders = ', '.join(['%s'] * len(scope))
+        if campaign_id is None:
+            return f"file_checksum IN ({placeholders}) AND campaign_id IS NULL", tuple(scope)
+        return f"campaign_id = %s AND file_checksum IN ({placeholders})", (campaign_id, *scope)
+
+    @staticmethod
+    def _latest_income(rows: List[Dict[str, Any]], scope: List[str]) -> List[Dict[str, Any]]:
+        """Keep the row from the newest save in scope for every (country, year)"""
+        order = {checksum: i for i, checksum in enumerate(scope)}
+        latest = {}
+        for row in sorted(rows, key=lambda r: order[r['file_checksum']]):
+            latest[(row['country_tag'], row['year'])] = row
+        return list(latest.values())
+
+    def get_campaign_for_file(self, checksum: str, owner_id: int) -> Optional[Dict[str, Any]]:
+        """Get the owner's campaign a file belongs to, with its number of saves"""
+        conn = self._get_connection()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            cursor.execute("""
+                SELECT c.*, COUNT(all_files.seq) AS file_count
+                FROM campaign_files cf
+                JOIN campaigns c ON c.id = cf.campaign_id
+                JOIN campaign_files all_files ON all_files.campaign_id = c.id
+                WHERE cf.file_checksum = %s AND c.user_id = %s
+                GROUP BY c.id
+            """, (checksum, owner_id))
+            return cursor.fetchone()
+        finally:
+            cursor.close()
+            conn.close()
+
+    def get_campaign(self, campaign_id: int, user_id: int) -> Optional[Dict[str, Any]]:
+        """Get a campaign and its saves if the user owns it or can see one of its saves"""
+        conn = self._get_connection()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            cursor.execute("""
+                SELECT uf.*, cf.seq, cf.game_date
+                FROM campaign_files cf
+                JOIN campaigns c ON c.id = cf.campaign_id
+                JOIN uploaded_files uf ON uf.checksum = cf.file_checksum AND uf.user_id = c.user_id
+                WHERE cf.campaign_id = %s
+                ORDER BY cf.game_date, cf.seq
+            """, (campaign_id,))
+            files = cursor.fetchall()
+            if not files:
+                return None
+
+            cursor.execute("""
+                SELECT 1 FROM uploaded_files uf
+                WHERE uf.id IN ({})
+                AND {}
+                LIMIT 1
+            """.format(', '.join(['%s'] * len(files)), self._FILE_ACCESS_SQL),
+                (*[f['id'] for f in files], *self._access_params(user_id)))
+            if not cursor.fetchone():
+                return None
+
+            return {'id': campaign_id, 'user_id': files[0]['user_id'], 'files': files}
+        finally:
+            cursor.close()
+            conn.close()
+
+    def get_campaign_income_rows(self, campaign_id: int) -> List[tuple]:
+        """Get the unified (country_tag, year, income) timeline across a campaign"""
+        conn = self._get_connection()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            cursor.execute("""
+                SELECT cf.file_checksum FROM campaign_files cf
+                WHERE cf.campaign_id = %s
+                ORDER BY cf.game_date, cf.seq
+            """, (campaign_id,))
+            scope = [row['file_checksum'] for row in cursor.fetchall()]
+            if not scope:
+                return []
+
+            where, params = self._scope_filter(campaign_id, scope)
+            cursor.execute(f"""
+                SELECT file_checksum, country_tag, year, income FROM annual_income
+                WHERE {where}
+            """, params)
+            rows = self._latest_income(cursor.fetchall(), scope)
+            return [(r['country_tag'], int(r['year']), r['income']) for r in rows]
+        finally:
+            cursor.close()
+            conn.close()
+
+    def _map_colors_for_scope(self, conn, scope: List[str]) -> Dict[str, tuple]:
+        """Map colors of the given saves, the newest save winning per country"""
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT file_checksum, country_tag, r, g, b FROM country_map_colors
+                WHERE file_checksum IN ({})
+            """.format(', '.join(['%s'] * len(scope))), tuple(scope))
+            order = {checksum: i for i, checksum in enumerate(scope)}
+            colors = {}
+            for checksum, tag, r, g, b in sorted(cursor.fetchall(), key=lambda row: order[row[0]]):
+                colors[tag] = (r, g, b)
+            return colors
+        finally:
+            cursor.close()
+
+    def get_map_colors(self, checksum: str, owner_id: int) -> Dict[str, tuple]:
+        """Get each country's in-game map color as of the owner's copy of a file"""
+        conn = self._get_connection()
+        try:
+            return self._map_colors_for_scope(conn, self._campaign_scope(conn, checksum, owner_id)[1])
+        finally:
+            conn.close()
+
+    def get_campaign_map_colors(self, campaign_id: int) -> Dict[str, tuple]:
+        """Get each country's in-game map color as of a campaign's latest save"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT file_checksum FROM campaign_files
+                WHERE campaign_id = %s
+                ORDER BY game_date, seq
+            """, (campaign_id,))
+            scope = [row[0] for row in cursor.fetchall()]
+            return self._map_colors_for_scope(conn, scope) if scope else {}
+        finally:
+            cursor.close()
+            conn.close()
+
+    # Per-file, per-country aggregates that feed leaderboard_stats, counting
+    # only income rows the given user's campaigns (or pre-campaign ingests) stored
+    _FILE_AGGREGATES_SQL = """
+        SELECT cs.file_checksum, cs.country_tag,
+               COALESCE(MAX(ai.income), 0) AS peak_income,
+               MIN(CASE WHEN ai.income >= %s THEN CAST(ai.year AS UNSIGNED) END) AS first_year
+        FROM current_state cs
+        LEFT JOIN annual_income ai
+            ON ai.file_checksum = cs.file_checksum AND ai.country_tag = cs.country_tag
+            AND (ai.campaign_id IS NULL
+                 OR ai.campaign_id IN (SELECT id FROM campaigns WHERE user_id = %s))
+        WHERE cs.file_checksum {checksum_filter}
+        GROUP BY cs.file_checksum, cs.country_tag
+    """
+
+    def update_leaderboard(self, conn, user_id: int, checksum: str, campaign_id: int) -> None:
+        """Fold a newly ingested file into the user's leaderboard rows (no commit)
+
+        A nation counts as played once per campaign, so later autosaves only
+        add a play for tags that did not appear in earlier saves.
+        """
+        aggregates = self._FILE_AGGREGATES_SQL.format(checksum_filter='= %s')
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"""
+                INSERT INTO leaderboard_stats
+                (user_id, country_tag, plays, peak_income, first_year_over_threshold)
+                SELECT %s, agg.country_tag,
+                       CASE WHEN EXISTS (
+                           SELECT 1 FROM campaign_files cf
+                           JOIN current_state prev ON prev.file_checksum = cf.file_checksum
+                           WHERE cf.campaign_id = %s
+                           AND cf.file_checksum != agg.file_checksum
+                           AND prev.country_tag = agg.country_tag
+                       ) THEN 0 ELSE 1 END,
+                       agg.peak_income, agg.first_year
+                FROM ({aggregates}) agg
+                WHERE TRUE  -- Lets SQLite parse the upsert after a SELECT
+                ON DUPLICATE KEY UPDATE  -- Qualified: agg also has a peak_income column
+                    plays = leaderboard_stats.plays + VALUES(plays),
+                    peak_income = GREATEST(leaderboard_stats.peak_income, VALUES(peak_income)),
+                    first_year_over_threshold = COALESCE(
+                        LEAST(leaderboard_stats.first_year_over_threshold, VALUES(first_year_over_threshold)),
+                        leaderboard_stats.first_year_over_threshold,
+                        VALUES(first_year_over_threshold)
+                    )
+            """, (user_id, campaign_id, Config.LEADERBOARD_INCOME_THRESHOLD, user_id, checksum))
+        finally:
+            cursor.close()
+
+    def rebuild_leaderboard(self, conn, user_id: int) -> None:
+        """Recompute all leaderboard rows for a user from their files (no commit)"""
+        aggregates = self._FILE_AGGREGATES_SQL.format(
+            checksum_filter='IN (SELECT checksum FROM uploaded_files WHERE user_id = %s)'
+        )
+        cursor = conn.cursor()
+        try:
+            cursor.execute("DELETE FROM leaderboard_stats WHERE user_id = %s", (user_id,))
+            cursor.execute(f"""
+                INSERT INTO leaderboard_stats
+                (user_id, country_tag, plays, peak_income, first_year_over_threshold)
+                SELECT %s, agg.country_tag,
+                       COUNT(DISTINCT COALESCE(CAST(cf.campaign_id AS CHAR), agg.file_checksum)),
+                       MAX(agg.peak_income), MIN(agg.first_year)
+                FROM ({aggregates}) agg
+                LEFT JOIN campaign_files cf
+                    ON cf.file_checksum = agg.file_checksum
+                    AND cf.campaign_id IN (SELECT id FROM campaigns WHERE user_id = %s)
+                GROUP BY agg.country_tag
+            """, (user_id, Config.LEADERBOARD_INCOME_THRESHOLD, user_id, user_id, user_id))
+        finally:
+            cursor.close()
+
+    def get_leaderboard(self, user_ids: List[int], limit: int = 20) -> Dict[str, List[Dict[str, Any]]]:
+        """Read materialized leaderboard rows for a set of users"""
+        if not user_ids:
+            return {'fastest': [], 'peak': [], 'most_played': [], 'least_played': []}
+
+        placeholders = ', '.join(['%s'] * len(user_ids))
+        conn = self._get_connection()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            cursor.execute(f"""
+                SELECT ls.country_tag, ls.first_year_over_threshold, u.username
+                FROM leaderboard_stats ls
+                JOIN users u ON ls.user_id = u.id
+                WHERE ls.user_id IN ({placeholders})
+                AND ls.first_year_over_threshold IS NOT NULL
+                ORDER BY ls.first_year_over_threshold ASC
+                LIMIT %s
+            """, (*user_ids, limit))
+            fastest = cursor.fetchall()
+
+            cursor.execute(f"""
+                SELECT ls.country_tag, ls.peak_income, u.username
+                FROM leaderboard_stats ls
+                JOIN users u ON ls.user_id = u.id
+                WHERE ls.user_id IN ({placeholders})
+                ORDER BY ls.peak_income DESC
+                LIMIT %s
+            """, (*user_ids, limit))
+            peak = cursor.fetchall()
+
+            cursor.execute(f"""
+                SELECT country_tag, SUM(plays) AS plays
+                FROM leaderboard_stats
+                WHERE user_id IN ({placeholders})
+                GROUP BY country_tag
+                ORDER BY plays DESC, country_tag
+            """, tuple(user_ids))
+            plays = cursor.fetchall()
+
+            return {
+                'fastest': fastest,
+                'peak': peak,
+                'most_played': plays[:limit],
+                'least_played': list(reversed(plays[-limit:]))
+            }
+        finally:
+            cursor.close()
+            conn.close()
+
+    # Backfill methods
+    def record_extractions(self, conn, file_id: int, versions: Dict[str, int]) -> None:
+        """Mark extractor versions as applied to a file (no commit)"""
+        cursor = conn.cursor()
+        try:
+            cursor.executemany("""
+                INSERT INTO file_extractions (file_id, extractor, version)
+                VALUES (%s, %s, %s)
+                ON DUPLICATE KEY UPDATE version = VALUES(version)
+            """, [(file_id, name, version) for name, version in versions.items()])
+        finally:
+            cursor.close()
+
+    def get_files_pending_extraction(self, versions: Dict[str, int], after_id: int = 0,
+                                     limit: int = 100) -> List[Dict[str, Any]]:
+        """Get files missing any of the given extractor versions, with what they lack"""
+        if not versions:
+            return []
+
+        conn = self._get_connection()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            cursor.execute("""
+                SELECT uf.id, uf.checksum, uf.original_filename, uf.json_path, uf.user_id, uf.s3_key
+                FROM uploaded_files uf
+                WHERE uf.id > %s
+                AND (
+                    SELECT COUNT(*) FROM file_extractions fe
+                    WHERE fe.file_id = uf.id AND fe.version >= CASE fe.extractor {}
+                    ELSE NULL END
+                ) < %s
+                ORDER BY uf.id
+                LIMIT %s
+            """.format(' '.join(['WHEN %s THEN %s'] * len(versions))),
+                (after_id, *[v for item in versions.items() for v in item], len(versions), limit))
+            files = cursor.fetchall()
+            if not files:
+                return []
+
+            cursor.execute("""
+                SELECT file_id, extractor, version FROM file_extractions
+                WHERE file_id IN ({})
+            """.format(', '.join(['%s'] * len(files))), tuple(f['id'] for f in files))
+            applied = {}
+            for row in cursor.fetchall():
+                applied.setdefault(row['file_id'], {})[row['extractor']] = row['version']
+
+            for file in files:
+                done = applied.get(file['id'], {})
+                file['missing'] = [name for name, version in versions.items()
+                                   if done.get(name, 0) < version]
+            return files
+        finally:
+            cursor.close()
+            conn.close()
+
+    def get_backfill_checkpoint(self, job: str) -> int:
+        """Get the last file ID a backfill job finished, or 0"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT last_file_id FROM backfill_checkpoints WHERE job = %s", (job,))
+            row = cursor.fetchone()
+            return row[0] if row else 0
+        finally:
+            cursor.close()
+            conn.close()
+
+    def save_backfill_checkpoint(self, conn, job: str, last_file_id: int) -> None:
+        """Record how far a backfill job has progressed (no commit)"""
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                INSERT INTO backfill_checkpoints (job, last_file_id) VALUES (%s, %s)
+                ON DUPLICATE KEY UPDATE last_file_id = VALUES(last_file_id)
+            """, (job, last_file_id))
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def _source_hash(source: str) -> str:
+        return hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+    def get_import_checkpoint(self, user_id: int, source: str) -> int:
+        """Get how many sources a user's import of a directory or prefix has finished, or 0"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT sources_done FROM import_checkpoints WHERE user_id = %s AND source_hash = %s
+            """, (user_id, self._source_hash(source)))
+            row = cursor.fetchone()
+            return row[0] if row else 0
+        finally:
+            cursor.close()
+            conn.close()
+
+    def save_import_checkpoint(self, conn, user_id: int, source: str, sources_done: int) -> None:
+        """Record how far a user's import of a directory or prefix has progressed (no commit)"""
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                INSERT INTO import_checkpoints (user_id, source_hash, source, sources_done)
+                VALUES (%s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE sources_done = VALUES(sources_done)
+            """, (user_id, self._source_hash(source), source, sources_done))
+        finally:
+            cursor.close()
+
+    def clear_import_checkpoint(self, user_id: int, source: str) -> None:
+        """Forget a finished import so the next run starts from the beginning"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                DELETE FROM import_checkpoints WHERE user_id = %s AND source_hash = %s
+            """, (user_id, self._source_hash(source)))
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
+
+    # Background ingest job methods
+    def create_ingest_job(self, job: Dict[str, Any]) -> None:
+        """Record a queued background ingest"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                INSERT INTO ingest_jobs (id, user_id, filename, meta, state, worker, submitted_at)
+                VALUES (%s, %s, %s, %s, %s, %s, %s)
+            """, (job['id'], job['user_id'], job['filename'], json.dumps(job['meta']),
+                  job['state'], job['worker'], job['submitted_at']))
+            conn.commit()
+        finally:
+            cursor.close()
+            conn.close()
+
+    def update_ingest_job(self, job_id: str, state: str, checksum: Optional[str] = None,
+                          error: Optional[str] = None, finished_at: Optional[float] = None) -> bool:
+        """Move an unfinished ingest job to a new state; False if it had already finished"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                UPDATE ingest_jobs SET state = %s, checksum = %s, error = %s, finished_at = %s
+                WHERE id = %s AND state IN ('queued', 'processing')
+            """, (state, checksum, error, finished_at, job_id))
+            conn.commit()
+            return cursor.rowcount > 0
+        finally:
+            cursor.close()
+            conn.close()
+
+    @staticmethod
+    def _ingest_job_row(row: Dict[str, Any]) -> Dict[str, Any]:
+        if isinstance(row['meta'], (str, bytes)):
+            row['meta'] = json.loads(row['meta'])
+        return row
+
+    def get_ingest_job(self, job_id: str, user_id: int) -> Optional[Dict[str, Any]]:
+        """An ingest job, if it belongs to the user"""
+        conn = self._get_connection()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            cursor.execute("""
+                SELECT * FROM ingest_jobs WHERE id = %s AND user_id = %s
+            """, (job_id, user_id))
+            row = cursor.fetchone()
+            return self._ingest_job_row(row) if row else None
+        finally:
+            cursor.close()
+            conn.close()
+
+    def get_user_ingest_jobs(self, user_id: int, finished_after: float) -> List[Dict[str, Any]]:
+        """A user's unfinished ingest jobs and those finished after a time, oldest first"""
+        conn = self._get_connection()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            cursor.execute("""
+                SELECT * FROM ingest_jobs
+                WHERE user_id = %s AND (finished_at IS NULL OR finished_at > %s)
+                ORDER BY submitted_at
+            """, (user_id, finished_after))
+            return [self._ingest_job_row(row) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+            conn.close()
+
+    def delete_ingest_jobs(self, finished_before: float) -> int:
+        """Forget ingest jobs that finished before a time and return how many went"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("DELETE FROM ingest_jobs WHERE finished_at < %s", (finished_before,))
+            deleted = cursor.rowcount
+            conn.commit()
+            return deleted
+        finally:
+            cursor.close()
+            conn.close()
+
+    # Settings and ingest profiling methods
+    def get_setting(self, name: str) -> Optional[str]:
+        """Get a runtime setting changed from the admin pages, or None if unset"""
         conn = self._get_connection()
         cursor = conn.cursor()
-        
         try:
-            cursor.execute(
-                "INSERT INTO users (username, email, password_hash) VALUES (%s, %s, %s)",
-                (username, email, password_hash)
-            )
-            user_id = cursor.lastrowid
-            conn.commit()
-            return user_id
-        except mysql.connector.Error as err:
-            conn.rollback()
-            raise
+            cursor.execute("SELECT value FROM app_settings WHERE name = %s", (name,))
+            row = cursor.fetchone()
+            return row[0] if row else None
         finally:
             cursor.close()
             conn.close()
 
-    def get_user_by_username(self, username: str) -> Optional[Dict[str, Any]]:
-        """Get user by username"""
+    def set_setting(self, name: str, value: Optional[str]) -> None:
+        """Set a runtime setting; None removes it so the Config default applies"""
         conn = self._get_connection()
-        cursor = conn.cursor(dictionary=True)
-        
+        cursor = conn.cursor()
         try:
-            cursor.execute(
-                "SELECT * FROM users WHERE username = %s",
-                (username,)
-            )
-            return cursor.fetchone()
+            if value is None:
+                cursor.execute("DELETE FROM app_settings WHERE name = %s", (name,))
+            else:
+                cursor.execute("""
+                    INSERT INTO app_settings (name, value) VALUES (%s, %s)
+                    ON DUPLICATE KEY UPDATE value = VALUES(value)
+                """, (name, value))
+            conn.commit()
         finally:
             cursor.close()
             conn.close()
 
-    # File processing methods
-    def register_file_processing(self, conn, original_filename: str, checksum: str, json_path: str, user_id: int, s3_key: str = None) -> None:
-        """Register a file processing in the database (no commit)"""
+    def get_cache_generation(self, scope: str) -> int:
+        """Current generation of a cache scope, shared by every worker"""
+        conn = self._get_connection()
         cursor = conn.cursor()
         try:
-            cursor.execute('''
-                INSERT INTO uploaded_files 
-                (original_filename, checksum, json_path, user_id, s3_key, processed_at)
-                VALUES (%s, %s, %s, %s, %s, NOW())
-            ''', (original_filename, checksum, json_path, user_id, s3_key))
-        except Exception as e:
-            raise
+            cursor.execute("SELECT generation FROM cache_generations WHERE scope = %s", (scope,))
+            row = cursor.fetchone()
+            return row[0] if row else 0
         finally:
             cursor.close()
+            conn.close()
 
-    def save_current_state(self, conn, checksum: str, country_data: Dict[str, Any]) -> None:
-        """Save current state data for a country (no commit)"""
+    def bump_cache_generation(self, scope: str) -> None:
+        """Advance a cache scope's generation so every worker's fragments for it miss"""
+        conn = self._get_connection()
         cursor = conn.cursor()
         try:
-            cursor.execute(
-                """INSERT INTO current_state 
-                (file_checksum, country_tag, date, income, manpower, max_manpower, trade_income) 
-                VALUES (%s, %s, %s, %s, %s, %s, %s)""",
-                (
-                    checksum,
-                    country_data['country_tag'],
-                    country_data['current_state']['date'],
-                    json.dumps(country_data['current_state']['income']),
-                    country_data['current_state']['manpower'],
-                    country_data['current_state']['max_manpower'],
-                    country_data['current_state']['trade_income']
-                )
-            )
-        except Exception as e:
-            raise
+            cursor.execute("""
+                INSERT INTO cache_generations (scope, generation) VALUES (%s, 1)
+                ON DUPLICATE KEY UPDATE generation = generation + 1
+            """, (scope,))
+            conn.commit()
         finally:
             cursor.close()
+            conn.close()
 
-    def save_historical_events(self, conn, checksum: str, country_data: Dict[str, Any]) -> None:
-        """Save historical events for a country (no commit)"""
+    def save_ingest_profile(self, conn, file_id: int, total_ms: float, stages: Dict[str, float],
+                            parser_stages: Dict[str, float], profile_path: str) -> None:
+        """Store the timings and capture path of a profiled ingest (no commit)"""
         cursor = conn.cursor()
         try:
-            for event in country_data['historical_events']:
-                cursor.execute(
-                    """INSERT INTO historical_events 
-                    (file_checksum, country_tag, date, event_type, details) 
-                    VALUES (%s, %s, %s, %s, %s)""",
-                    (
-                        checksum,
-                        country_data['country_tag'],
-                        event['date'],
-                        event['event_type'],
-                        event['details']
-                    )
-                )
-        except Exception as e:
-            raise
+            cursor.execute("""
+                INSERT INTO ingest_profiles (file_id, total_ms, stages, parser_stages, profile_path)
+                VALUES (%s, %s, %s, %s, %s)
+            """, (file_id, total_ms, json.dumps(stages), json.dumps(parser_stages), profile_path))
         finally:
             cursor.close()
 
-    def save_annual_income(self, conn, checksum: str, country_data: Dict[str, Any]) -> None:
-        """Save annual income data for a country (no commit)"""
-        cursor = conn.cursor()
+    def get_slowest_ingests(self, days: int = 7, limit: int = 20) -> List[Dict[str, Any]]:
+        """Get the slowest profiled ingests of the last `days` days"""
+        conn = self._get_connection()
+        cursor = conn.cursor(dictionary=True)
         try:
-            annual_income = country_data.get('annual_income', [])
-            
-            # Handle both list and dict formats
-            if isinstance(annual_income, list):
-                for income_entry in annual_income:
-                    cursor.execute(
-                        """INSERT INTO annual_income 
-                        (file_checksum, country_tag, year, income) 
-                        VALUES (%s, %s, %s, %s)""",
-                        (
-                            checksum, 
-                            country_data['country_tag'],
-                            income_entry['year'],
-                            income_entry['income']
-                        )
-                    )
-            else:  # Assume it's a dict
-                for year, income in annual_income.items():
-                    cursor.execute(
-                        """INSERT INTO annual_income 
-                        (file_checksum, country_tag, year, income) 
-                        VALUES (%s, %s, %s, %s)""",
-                        (checksum, country_data['country_tag'], year, income)
-                    )
-        except Exception as e:
-            raise
+            cursor.execute("""
+                SELECT ip.*, uf.original_filename, uf.checksum, u.username
+                FROM ingest_profiles ip
+                JOIN uploaded_files uf ON uf.id = ip.file_id
+                JOIN users u ON u.id = uf.user_id
+                WHERE ip.created_at >= NOW() - INTERVAL %s DAY
+                ORDER BY ip.total_ms DESC
+                LIMIT %s
+            """, (days, limit))
+            profiles = cursor.fetchall()
+            for profile in profiles:
+                profile['stages'] = json.loads(profile['stages'])
+                profile['parser_stages'] = json.loads(profile['parser_stages'])
+            return profiles
         finally:
             cursor.close()
+            conn.close()
 
-    def save_all_country_data(self, conn, checksum: str, country_data: Dict[str, Any]) -> None:
-        """Save all data for a country in a single transaction (no commit)"""
+    def get_ingest_profile_path(self, file_id: int) -> Optional[str]:
+        """Get the path of a profiled ingest's .prof capture"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
         try:
-            if 'current_state' in country_data:
-                self.save_current_state(conn, checksum, country_data)
-            if 'historical_events' in country_data:
-                self.save_historical_events(conn, checksum, country_data)
-            if 'annual_income' in country_data:
-                # Handle empty annual_income case
-                if country_data['annual_income']:  # Only save if not empty
-                    self.save_annual_income(conn, checksum, country_data)
-        except Exception as e:
-            raise
+            cursor.execute("SELECT profile_path FROM ingest_profiles WHERE file_id = %s", (file_id,))
+            row = cursor.fetchone()
+            return row[0] if row else None
+        finally:
+            cursor.close()
+            conn.close()
 
     def check_existing_file(self, checksum: str) -> bool:
         """Check if a file with this checksum already exists"""
@@ -335,61 +1484,47 @@ class Database:
             cursor.close()
             conn.close()
 
-    def add_friend_request(self, user_id: int, friend_id: int) -> None:
-        """Add a friend request"""
-        conn = self._get_connection()
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute(
-                """INSERT INTO user_friends 
-                   (user_id, friend_id, status) 
-                   VALUES (%s, %s, 'pending')""",
-                (user_id, friend_id)
-            )
-            conn.commit()
-        except mysql.connector.Error as err:
-            conn.rollback()
-            raise
-        finally:
-            cursor.close()
-            conn.close()
+    def get_friend_ids(self, user_id: int) -> List[int]:
+        """Get the IDs of a user's accepted friends"""
+        return self.get_friends_of_users([user_id])[user_id]
+
+    def get_friends_of_users(self, user_ids: List[int]) -> Dict[int, List[int]]:
+        """Get accepted friend IDs for several users in one primary-key range scan"""
+        result = {user_id: [] for user_id in user_ids}
+        if not user_ids:
+            return result
 
-    def accept_friend_request(self, user_id: int, friend_id: int) -> None:
-        """Accept a friend request"""
         conn = self._get_connection()
         cursor = conn.cursor()
-        
         try:
-            cursor.execute(
-                """UPDATE user_friends SET status = 'accepted' 
-                   WHERE user_id = %s AND friend_id = %s""",
-                (friend_id, user_id)
-            )
-            conn.commit()
-        except mysql.connector.Error as err:
-            conn.rollback()
-            raise
+            cursor.execute("""
+                SELECT user_id, friend_id FROM friendships
+                WHERE user_id IN ({})
+            """.format(', '.join(['%s'] * len(user_ids))), tuple(user_ids))
+            for user_id, friend_id in cursor.fetchall():
+                result[user_id].append(friend_id)
+            return result
         finally:
             cursor.close()
             conn.close()
 
-    def get_friends(self, user_id: int) -> List[Dict[str, Any]]:
-        """Get list of friends for a user"""
+    def are_friends(self, pairs: List[tuple]) -> Dict[tuple, bool]:
+        """Check several (user_id, other_id) pairs for friendship with one index lookup"""
+        result = {pair: False for pair in pairs}
+        if not pairs:
+            return result
+
         conn = self._get_connection()
-        cursor = conn.cursor(dictionary=True)
-        
+        cursor = conn.cursor()
         try:
-            cursor.execute(
-                """SELECT u.id, u.username, u.email 
-                   FROM user_friends uf
-                   JOIN users u ON (
-                       (uf.user_id = u.id AND uf.friend_id = %s) OR 
-                       (uf.friend_id = u.id AND uf.user_id = %s)
-                   WHERE uf.status = 'accepted'""",
-                (user_id, user_id)
-            )
-            return cursor.fetchall()
+            cursor.execute("""
+                SELECT user_id, friend_id FROM friendships
+                WHERE (user_id, friend_id) IN ({})
+            """.format(', '.join(['(%s, %s)'] * len(pairs))),
+                tuple(v for pair in pairs for v in pair))
+            for row in cursor.fetchall():
+                result[tuple(row)] = True
+            return result
         finally:
             cursor.close()
             conn.close()
@@ -407,7 +1542,7 @@ class Database:
                 (file_id, user_id)
             )
             conn.commit()
-        except mysql.connector.Error as err:
+        except DatabaseError as err:
             conn.rollback()
             raise
         finally:
@@ -415,21 +1550,19 @@ class Database:
             conn.close()
 
     def get_shared_files(self, user_id: int) -> List[Dict[str, Any]]:
-        """Get files shared with a user"""
+        """Get files shared with a user, directly or through a friends-wide share"""
         conn = self._get_connection()
         cursor = conn.cursor(dictionary=True)
         
         try:
-            cursor.execute("""
+            cursor.execute(f"""
                 SELECT uf.*, u.username as owner_name
-                FROM uploaded_files uf
-                JOIN user_file_permissions ufp ON uf.id = ufp.file_id
+                FROM {self._SHARED_FILE_IDS_SQL} shared
+                JOIN uploaded_files uf ON uf.id = shared.file_id
                 JOIN users u ON uf.user_id = u.id
-                WHERE ufp.user_id = %s 
-                AND ufp.permission_type = 'shared'
-                AND uf.user_id != %s
+                WHERE uf.user_id != %s
                 ORDER BY uf.processed_at DESC
-            """, (user_id, user_id))
+            """, (user_id, user_id, user_id))
             return cursor.fetchall()
         finally:
             cursor.close()
@@ -450,17 +1583,42 @@ class Database:
             cursor.close()
             conn.close()
 
+    def get_user_checksums(self, user_id: int) -> Set[str]:
+        """Checksums of every file a user owns"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT DISTINCT checksum FROM uploaded_files WHERE user_id = %s", (user_id,))
+            return {row[0] for row in cursor.fetchall()}
+        finally:
+            cursor.close()
+            conn.close()
+
+    def user_has_file(self, user_id: int, checksum: str) -> bool:
+        """Whether a user already owns a file with this checksum"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT 1 FROM uploaded_files WHERE checksum = %s AND user_id = %s LIMIT 1
+            """, (checksum, user_id))
+            return cursor.fetchone() is not None
+        finally:
+            cursor.close()
+            conn.close()
+
     def get_file_by_checksum(self, checksum: str, user_id: int) -> Optional[dict]:
         """Get file details by checksum and user ID (either owner or shared)"""
         conn = self._get_connection()
         cursor = conn.cursor(dictionary=True)
         try:
-            cursor.execute('''
+            cursor.execute(f'''
                 SELECT uf.* FROM uploaded_files uf
-                LEFT JOIN user_file_permissions ufp ON uf.id = ufp.file_id
                 WHERE uf.checksum = %s
-                AND (uf.user_id = %s OR ufp.user_id = %s)
-            ''', (checksum, user_id, user_id))
+                AND {self._FILE_ACCESS_SQL}
+                ORDER BY uf.user_id = %s DESC
+                LIMIT 1
+            ''', (checksum, *self._access_params(user_id), user_id))
             return cursor.fetchone()
         finally:
             cursor.close()
@@ -481,52 +1639,109 @@ class Database:
             cursor.close()
             conn.close()
 
-    def get_annual_income(self, checksum: str, country_tag: str) -> List[Dict[str, Any]]:
-        """Get annual income data for a country"""
+    def get_annual_income(self, checksum: str, country_tag: str, owner_id: int) -> List[Dict[str, Any]]:
+        """Get annual income data for a country, resolved across the owner's campaign"""
+        conn = self._get_connection()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            campaign_id, scope = self._campaign_scope(conn, checksum, owner_id)
+            where, params = self._scope_filter(campaign_id, scope)
+            cursor.execute(f'''
+                SELECT file_checksum, country_tag, year, income FROM annual_income 
+                WHERE {where} AND country_tag = %s
+            ''', (*params, country_tag))
+            rows = self._latest_income(cursor.fetchall(), scope)
+            return sorted(({'year': r['year'], 'income': r['income']} for r in rows),
+                          key=lambda r: r['year'])
+        finally:
+            cursor.close()
+            conn.close()
+
+    def get_income_rows(self, checksum: str, owner_id: int) -> List[tuple]:
+        """Get (country_tag, year, income) rows for every country in the owner's copy of a file"""
         conn = self._get_connection()
         cursor = conn.cursor(dictionary=True)
+        try:
+            campaign_id, scope = self._campaign_scope(conn, checksum, owner_id)
+            where, params = self._scope_filter(campaign_id, scope)
+            cursor.execute(f'''
+                SELECT file_checksum, country_tag, year, income FROM annual_income
+                WHERE {where}
+            ''', params)
+            rows = self._latest_income(cursor.fetchall(), scope)
+            return [(r['country_tag'], int(r['year']), r['income']) for r in rows]
+        finally:
+            cursor.close()
+            conn.close()
+
+    def get_user_income_rows(self, user_id: int) -> List[tuple]:
+        """Get (country_tag, year, max income) rows across all of a user's files"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
         try:
             cursor.execute('''
-                SELECT year, income FROM annual_income 
-                WHERE file_checksum = %s AND country_tag = %s
-                ORDER BY year
-            ''', (checksum, country_tag))
+                SELECT ai.country_tag, CAST(ai.year AS UNSIGNED) AS year_num, MAX(ai.income)
+                FROM annual_income ai
+                JOIN uploaded_files uf ON uf.checksum = ai.file_checksum
+                LEFT JOIN campaigns c ON c.id = ai.campaign_id
+                WHERE uf.user_id = %s
+                AND (ai.campaign_id IS NULL OR c.user_id = uf.user_id)
+                GROUP BY ai.country_tag, year_num
+            ''', (user_id,))
             return cursor.fetchall()
         finally:
             cursor.close()
             conn.close()
 
-    def get_historical_events(self, checksum: str, country_tag: str) -> List[Dict[str, Any]]:
-        """Get historical events for a country"""
+    def get_historical_events(self, checksum: str, country_tag: str, owner_id: int) -> List[Dict[str, Any]]:
+        """Get historical events for a country, including earlier saves of the owner's campaign"""
         conn = self._get_connection()
         cursor = conn.cursor(dictionary=True)
         try:
-            cursor.execute('''
+            campaign_id, scope = self._campaign_scope(conn, checksum, owner_id)
+            where, params = self._scope_filter(campaign_id, scope)
+            cursor.execute(f'''
                 SELECT date, event_type, details FROM historical_events 
-                WHERE file_checksum = %s AND country_tag = %s
+                WHERE {where} AND country_tag = %s
                 ORDER BY date
-            ''', (checksum, country_tag))
+            ''', (*params, country_tag))
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+            conn.close()
+
+    def get_ruler_stats(self, checksum: str, owner_id: int) -> List[Dict[str, Any]]:
+        """Aggregate ruler stats per country and event type (Monarch, Heir, Queen)"""
+        conn = self._get_connection()
+        cursor = conn.cursor(dictionary=True)
+        try:
+            campaign_id, scope = self._campaign_scope(conn, checksum, owner_id)
+            where, params = self._scope_filter(campaign_id, scope)
+            cursor.execute(f'''
+                SELECT country_tag, event_type, COUNT(*) AS rulers,
+                       AVG(adm) AS avg_adm, AVG(dip) AS avg_dip, AVG(mil) AS avg_mil,
+                       MAX(adm + dip + mil) AS best_total
+                FROM event_payloads
+                WHERE {where} AND adm IS NOT NULL
+                GROUP BY country_tag, event_type
+                ORDER BY country_tag, event_type
+            ''', params)
             return cursor.fetchall()
         finally:
             cursor.close()
             conn.close()
 
     def get_friends_list(self, user_id: int) -> List[Dict[str, Any]]:
-        """Get accepted friends list (both directions)"""
+        """Get accepted friends list"""
         conn = self._get_connection()
         cursor = conn.cursor(dictionary=True)
         try:
             cursor.execute("""
-                (SELECT u.id, u.username 
-                FROM user_friends uf
-                JOIN users u ON uf.friend_id = u.id
-                WHERE uf.user_id = %s AND uf.status = 'accepted')
-                UNION
-                (SELECT u.id, u.username 
-                FROM user_friends uf
-                JOIN users u ON uf.user_id = u.id
-                WHERE uf.friend_id = %s AND uf.status = 'accepted')
-            """, (user_id, user_id))
+                SELECT u.id, u.username
+                FROM friendships f
+                JOIN users u ON f.friend_id = u.id
+                WHERE f.user_id = %s
+            """, (user_id,))
             return cursor.fetchall()
         finally:
             cursor.close()
@@ -553,11 +1768,10 @@ class Database:
         conn = self._get_connection()
         cursor = conn.cursor()
         try:
-            # Check if relationship already exists
+            # Check if relationship already exists (two unique-key lookups)
             cursor.execute("""
                 SELECT 1 FROM user_friends 
-                WHERE (user_id = %s AND friend_id = %s)
-                OR (user_id = %s AND friend_id = %s)
+                WHERE (user_id, friend_id) IN ((%s, %s), (%s, %s))
             """, (user_id, friend_id, friend_id, user_id))
             
             if cursor.fetchone():
@@ -571,7 +1785,7 @@ class Database:
             
             conn.commit()
             return True
-        except mysql.connector.Error as err:
+        except DatabaseError as err:
             conn.rollback()
             raise
         finally:
@@ -590,45 +1804,36 @@ class Database:
             """, (friend_id, user_id))
             
             affected = cursor.rowcount
+            if affected > 0:
+                # Store the friendship in both directions for single-seek lookups
+                cursor.execute("""
+                    INSERT IGNORE INTO friendships (user_id, friend_id)
+                    VALUES (%s, %s), (%s, %s)
+                """, (user_id, friend_id, friend_id, user_id))
             conn.commit()
             return affected > 0
-        except mysql.connector.Error as err:
+        except DatabaseError as err:
             conn.rollback()
             raise
         finally:
             cursor.close()
             conn.close()
 
-    def share_file_with_all_friends(self, file_id: int, owner_id: int) -> None:
-        """Share a file with all of the owner's friends"""
+    def share_file_with_friends(self, file_id: int, owner_id: int) -> None:
+        """Share a file with the owner's friends as a single row, resolved at read time
+
+        Friends added later see the file too, with no per-friend rows to keep in sync.
+        """
         conn = self._get_connection()
         cursor = conn.cursor()
         
         try:
-            # Get all friend IDs
             cursor.execute("""
-                SELECT friend_id FROM user_friends 
-                WHERE user_id = %s AND status = 'accepted'
-                UNION
-                SELECT user_id FROM user_friends 
-                WHERE friend_id = %s AND status = 'accepted'
-            """, (owner_id, owner_id))
-            
-            friend_ids = [row[0] for row in cursor.fetchall()]
-            
-            # Share with each friend
-            for friend_id in friend_ids:
-                try:
-                    cursor.execute("""
-                        INSERT INTO user_file_permissions 
-                        (file_id, user_id, permission_type) 
-                        VALUES (%s, %s, 'shared')
-                        ON DUPLICATE KEY UPDATE permission_type = 'shared'
-                    """, (file_id, friend_id))
-                except mysql.connector.Error as err:
-                    # Log but continue with other friends
-                    print(f"Error sharing with friend {friend_id}: {err}")
-                    
+                INSERT INTO file_friend_shares (file_id, owner_id)
+                SELECT id, user_id FROM uploaded_files
+                WHERE id = %s AND user_id = %s
+                ON DUPLICATE KEY UPDATE owner_id = VALUES(owner_id)
+            """, (file_id, owner_id))
             conn.commit()
         except Exception as e:
             conn.rollback()
@@ -637,6 +1842,98 @@ class Database:
             cursor.close()
             conn.close()
 
+    def _detach_from_campaign(self, conn, checksum: str, user_id: int) -> None:
+        """Remove a file from the user's campaign, moving rows later saves depend on (no commit)
+
+        Later saves only store rows that changed, so the deleted file's rows
+        are reassigned to the next save unless that save already overrides
+        them. Only rows the user's campaign stored are touched; other users'
+        copies of the same save keep theirs.
+        """
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT cf.campaign_id, cf.seq, cf.game_date
+                FROM campaign_files cf
+                JOIN campaigns c ON c.id = cf.campaign_id
+                WHERE cf.file_checksum = %s AND c.user_id = %s
+            """, (checksum, user_id))
+            row = cursor.fetchone()
+            if not row:
+                return
+            campaign_id, seq, game_date = row
+
+            cursor.execute("""
+                SELECT file_checksum FROM campaign_files
+                WHERE campaign_id = %s AND (game_date, seq) > (%s, %s)
+                ORDER BY game_date, seq
+                LIMIT 1
+            """, (campaign_id, game_date, seq))
+            successor = cursor.fetchone()
+
+            if successor:
+                successor = successor[0]
+                if self.backend.name == 'sqlite':
+                    # No multi-table DELETE; MySQL in turn rejects this form
+                    cursor.execute("""
+                        DELETE FROM annual_income
+                        WHERE campaign_id = %s AND file_checksum = %s AND EXISTS (
+                            SELECT 1 FROM annual_income b
+                            WHERE b.campaign_id = %s AND b.file_checksum = %s
+                            AND b.country_tag = annual_income.country_tag
+                            AND b.year = annual_income.year
+                        )
+                    """, (campaign_id, checksum, campaign_id, successor))
+                else:
+                    cursor.execute("""
+                        DELETE a FROM annual_income a
+                        JOIN annual_income b
+                            ON b.country_tag = a.country_tag AND b.year = a.year
+                            AND b.campaign_id = %s AND b.file_checksum = %s
+                        WHERE a.campaign_id = %s AND a.file_checksum = %s
+                    """, (campaign_id, successor, campaign_id, checksum))
+                for table in ('annual_income', 'historical_events', 'event_payloads'):
+                    cursor.execute(f"""
+                        UPDATE {table} SET file_checksum = %s
+                        WHERE campaign_id = %s AND file_checksum = %s
+                    """, (successor, campaign_id, checksum))
+            else:
+                for table in ('annual_income', 'historical_events', 'event_payloads'):
+                    cursor.execute(f"""
+                        DELETE FROM {table} WHERE campaign_id = %s AND file_checksum = %s
+                    """, (campaign_id, checksum))
+
+            cursor.execute("""
+                DELETE FROM campaign_files WHERE campaign_id = %s AND seq = %s
+            """, (campaign_id, seq))
+            cursor.execute("""
+                DELETE FROM campaigns
+                WHERE id = %s AND NOT EXISTS (
+                    SELECT 1 FROM campaign_files WHERE campaign_id = %s
+                )
+            """, (campaign_id, campaign_id))
+        finally:
+            cursor.close()
+
+    def get_file_audience(self, file_id: int) -> List[int]:
+        """Get IDs of every user who can currently see a file"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("""
+                SELECT user_id FROM uploaded_files WHERE id = %s
+                UNION
+                SELECT user_id FROM user_file_permissions WHERE file_id = %s
+                UNION
+                SELECT f.friend_id FROM file_friend_shares ffs
+                JOIN friendships f ON f.user_id = ffs.owner_id
+                WHERE ffs.file_id = %s
+            """, (file_id, file_id, file_id))
+            return [row[0] for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+            conn.close()
+
     def delete_file(self, file_id: int, user_id: int) -> bool:
         """Delete a file and all its associated data if user is owner"""
         conn = self._get_connection()
@@ -662,29 +1959,26 @@ class Database:
             if not conn.in_transaction:
                 conn.start_transaction()
 
+            # Hand this file's delta rows to the next save of its campaign
+            self._detach_from_campaign(conn, checksum, user_id)
+
             # Delete from shared permissions first
             cursor.execute("""
                 DELETE FROM user_file_permissions
                 WHERE file_id = %s
             """, (file_id,))
 
-            # Delete from current_state
-            cursor.execute("""
-                DELETE FROM current_state
-                WHERE file_checksum = %s
-            """, (checksum,))
-
-            # Delete from historical_events
+            # Delete the friends-wide share
             cursor.execute("""
-                DELETE FROM historical_events
-                WHERE file_checksum = %s
-            """, (checksum,))
+                DELETE FROM file_friend_shares
+                WHERE file_id = %s
+            """, (file_id,))
 
-            # Delete from annual_income
+            # Delete extraction bookkeeping
             cursor.execute("""
-                DELETE FROM annual_income
-                WHERE file_checksum = %s
-            """, (checksum,))
+                DELETE FROM file_extractions
+                WHERE file_id = %s
+            """, (file_id,))
 
             # Finally delete the file record
             cursor.execute("""
@@ -692,6 +1986,25 @@ class Database:
                 WHERE id = %s
             """, (file_id,))
 
+            # Rows shared by every copy of the save go once nobody else has it;
+            # delta rows of the file's campaign were handled by the detach above
+            cursor.execute("""
+                SELECT 1 FROM uploaded_files WHERE checksum = %s LIMIT 1
+            """, (checksum,))
+            if not cursor.fetchone():
+                for table in ('current_state', 'country_map_colors'):
+                    cursor.execute(f"""
+                        DELETE FROM {table} WHERE file_checksum = %s
+                    """, (checksum,))
+                # Rows stored before campaigns existed
+                for table in ('historical_events', 'event_payloads', 'annual_income'):
+                    cursor.execute(f"""
+                        DELETE FROM {table} WHERE file_checksum = %s AND campaign_id IS NULL
+                    """, (checksum,))
+
+            # Drop the file's contribution to the owner's leaderboard
+            self.rebuild_leaderboard(conn, user_id)
+
             conn.commit()
             return True
 
@@ -702,6 +2015,100 @@ class Database:
             cursor.close()
             conn.close()
 
+    # Garbage collection methods
+    # Tables whose rows belong to a file through its checksum rather than a foreign key
+    CHECKSUM_TABLES = ('current_state', 'historical_events', 'event_payloads',
+                       'annual_income', 'country_map_colors')
+
+    def get_referenced_s3_keys(self) -> set:
+        """S3 keys of every uploaded file"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT s3_key FROM uploaded_files WHERE s3_key IS NOT NULL")
+            return {row[0] for row in cursor.fetchall()}
+        finally:
+            cursor.close()
+            conn.close()
+
+    def get_artifact_references(self) -> Dict[str, set]:
+        """Parser outputs, original filenames, checksums and profile paths still in use"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT json_path, original_filename, checksum FROM uploaded_files")
+            rows = cursor.fetchall()
+            cursor.execute("SELECT profile_path FROM ingest_profiles")
+            return {
+                'json_paths': {row[0] for row in rows},
+                'originals': {row[1] for row in rows},
+                'checksums': {row[2] for row in rows},
+                'profiles': {row[0] for row in cursor.fetchall()},
+            }
+        finally:
+            cursor.close()
+            conn.close()
+
+    def get_orphaned_checksums(self, table: str, limit: int = 100) -> List[str]:
+        """Checksums with rows in a data table but no uploaded_files row"""
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"""
+                SELECT DISTINCT t.file_checksum FROM {table} t
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM uploaded_files uf WHERE uf.checksum = t.file_checksum
+                )
+                LIMIT %s
+            """, (limit,))
+            return [row[0] for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+            conn.close()
+
+    def delete_orphaned_rows(self, table: str, checksums: List[str], limit: int = 1000) -> int:
+        """Delete up to `limit` rows of orphaned checksums and return how many went
+
+        Orphan status is re-checked in the DELETE itself, so a save uploaded
+        again since the scan keeps its rows.
+        """
+        if not checksums:
+            return 0
+        placeholders = ', '.join(['%s'] * len(checksums))
+        conn = self._get_connection()
+        cursor = conn.cursor()
+        try:
+            if table == 'country_map_colors':
+                # A handful of rows per checksum and no surrogate key to page by
+                cursor.execute(f"""
+                    DELETE FROM {table}
+                    WHERE file_checksum IN ({placeholders})
+                    AND file_checksum NOT IN (SELECT checksum FROM uploaded_files)
+                """, tuple(checksums))
+            else:
+                # The derived table lets MySQL take LIMIT and read the table it deletes from
+                cursor.execute(f"""
+                    DELETE FROM {table} WHERE id IN (
+                        SELECT id FROM (
+                            SELECT t.id FROM {table} t
+                            WHERE t.file_checksum IN ({placeholders})
+                            AND NOT EXISTS (
+                                SELECT 1 FROM uploaded_files uf WHERE uf.checksum = t.file_checksum
+                            )
+                            LIMIT %s
+                        ) batch
+                    )
+                """, (*checksums, limit))
+            deleted = cursor.rowcount
+            conn.commit()
+            return deleted
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            cursor.close()
+            conn.close()
+
     def create_topic(self, title: str, content: str, user_id: int) -> int:
         """Create a new forum topic and return topic ID"""
         conn = self._get_connection()
@@ -715,7 +2122,7 @@ class Database:
             topic_id = cursor.lastrowid
             conn.commit()
             return topic_id
-        except mysql.connector.Error as err:
+        except DatabaseError as err:
             conn.rollback()
             raise
         finally:
@@ -735,7 +2142,7 @@ class Database:
             post_id = cursor.lastrowid
             conn.commit()
             return post_id
-        except mysql.connector.Error as err:
+        except DatabaseError as err:
             conn.rollback()
             raise
         finally:
@@ -817,7 +2224,7 @@ class Database:
 
             conn.commit()
             return True
-        except mysql.connector.Error as err:
+        except DatabaseError as err:
             conn.rollback()
             raise
         finally:
@@ -847,7 +2254,7 @@ class Database:
 
             conn.commit()
             return True
-        except mysql.connector.Error as err:
+        except DatabaseError as err:
             conn.rollback()
             raise
         finally:
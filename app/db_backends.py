@@ -0,0 +1,293 @@
+import os
+import queue
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from functools import lru_cache
+import mysql.connector
+from mysql.connector import errorcode, pooling
+from .config import Config
+
+# Catch this instead of mysql.connector.Error so callers work on either backend
+DatabaseError = (mysql.connector.Error, sqlite3.Error)
+
+def is_duplicate_entry(err: Exception) -> bool:
+    """Whether a database error is a UNIQUE/PRIMARY KEY violation"""
+    if isinstance(err, sqlite3.IntegrityError):
+        return getattr(err, 'sqlite_errorname', '') in (
+            'SQLITE_CONSTRAINT_UNIQUE', 'SQLITE_CONSTRAINT_PRIMARYKEY'
+        ) or 'UNIQUE constraint failed' in str(err)
+    return getattr(err, 'errno', None) == errorcode.ER_DUP_ENTRY
+
+def duplicate_key(err: Exception) -> str:
+    """Column or key name a duplicate-entry error was raised for"""
+    if isinstance(err, sqlite3.IntegrityError):
+        # "UNIQUE constraint failed: users.email"
+        return str(err).rsplit(':', 1)[-1].split(',')[0].strip().split('.')[-1]
+    # "Duplicate entry 'x' for key 'users.email'" (MySQL 8) or "... key 'email'"
+    return err.msg.rsplit('key', 1)[-1].strip(" '").split('.')[-1]
+
+
+class MySQLBackend:
+    """MySQL server through a per-process mysql-connector pool"""
+    name = 'mysql'
+
+    def __init__(self):
+        self.config = {
+            'host': Config.DB_HOST,
+            'user': Config.DB_USER,
+            'password': Config.DB_PASSWORD,
+            'database': Config.DB_NAME
+        }
+        # Rebuilt after fork
+        self._pool = None
+        self._pool_pid = None
+        self._pool_lock = threading.Lock()
+
+    def connect(self):
+        """Get a pooled connection; close() returns it to the pool"""
+        if self._pool is None or self._pool_pid != os.getpid():
+            with self._pool_lock:
+                if self._pool is None or self._pool_pid != os.getpid():
+                    self._pool = pooling.MySQLConnectionPool(
+                        pool_size=Config.DB_POOL_SIZE, **self.config
+                    )
+                    self._pool_pid = os.getpid()
+        try:
+            return self._pool.get_connection()
+        except mysql.connector.errors.PoolError:
+            # Pool exhausted: serve the request on a dedicated connection
+            return self.connect_direct()
+
+    def connect_direct(self):
+        """Unpooled connection, so the pool is never created before a fork"""
+        return mysql.connector.connect(**self.config)
+
+    def ensure_database(self) -> None:
+        """Create the database if it doesn't exist"""
+        try:
+            # Connect without specifying a database
+            conn = mysql.connector.connect(
+                host=self.config['host'],
+                user=self.config['user'],
+                password=self.config['password']
+            )
+            cursor = conn.cursor()
+
+            # Create database if not exists
+            cursor.execute(f"CREATE DATABASE IF NOT EXISTS {self.config['database']}")
+            cursor.close()
+            conn.close()
+        except mysql.connector.Error as err:
+            print(f"Failed creating database: {err}")
+            raise
+
+    def table_exists(self, cursor, table: str) -> bool:
+        cursor.execute("SHOW TABLES LIKE %s", (table,))
+        return cursor.fetchone() is not None
+
+
+# MySQL dialect used by Database, rewritten for SQLite (3.35+ for upserts)
+_SQLITE_REWRITES = [
+    (re.compile(r'%s'), '?'),
+    (re.compile(r'\bINSERT\s+IGNORE\b', re.I), 'INSERT OR IGNORE'),
+    (re.compile(r'\bON\s+DUPLICATE\s+KEY\s+UPDATE\b', re.I), 'ON CONFLICT DO UPDATE SET'),
+    (re.compile(r'\bVALUES\((\w+)\)', re.I), r'excluded.\1'),
+    (re.compile(r'\bGREATEST\(', re.I), 'MAX('),
+    (re.compile(r'\bLEAST\(', re.I), 'MIN('),
+    (re.compile(r'\bAS\s+UNSIGNED\b', re.I), 'AS INTEGER'),
+    (re.compile(r'\bNOW\(\)\s*-\s*INTERVAL\s+\?\s+DAY\b', re.I), "datetime('now', '-' || ? || ' days')"),
+    (re.compile(r'\bNOW\(\)', re.I), 'CURRENT_TIMESTAMP'),
+]
+_FOR_UPDATE = re.compile(r'\s+FOR\s+UPDATE\b', re.I)
+_WRITE_STATEMENTS = {'INSERT', 'UPDATE', 'DELETE', 'REPLACE', 'CREATE', 'DROP', 'ALTER'}
+
+@lru_cache(maxsize=1024)
+def translate_sql(operation: str):
+    """Rewrite a statement for SQLite; returns (sql, takes_write_lock)"""
+    locking = _FOR_UPDATE.search(operation) is not None
+    sql = _FOR_UPDATE.sub('', operation)
+    for pattern, replacement in _SQLITE_REWRITES:
+        sql = pattern.sub(replacement, sql)
+    keyword = sql.lstrip().split(None, 1)[0].upper() if sql.strip() else ''
+    return sql, locking or keyword in _WRITE_STATEMENTS
+
+
+class SQLiteCursor:
+    """mysql-connector style cursor over sqlite3, optionally returning dict rows"""
+
+    def __init__(self, conn, dictionary: bool = False):
+        self._conn = conn
+        self._cursor = conn.raw.cursor()
+        self._dictionary = dictionary
+
+    def _prepare(self, operation: str) -> str:
+        sql, write = translate_sql(operation)
+        if write and not self._conn.raw.in_transaction:
+            # Take the write lock up front, like InnoDB row locks, instead of
+            # failing with SQLITE_BUSY when a read transaction upgrades
+            self._conn.raw.execute('BEGIN IMMEDIATE')
+        return sql
+
+    def execute(self, operation, params=()):
+        self._cursor.execute(self._prepare(operation), tuple(params or ()))
+
+    def executemany(self, operation, seq_params):
+        self._cursor.executemany(self._prepare(operation), [tuple(p) for p in seq_params])
+
+    def _row(self, row):
+        if row is None or not self._dictionary:
+            return row
+        return dict(zip((d[0] for d in self._cursor.description), row))
+
+    def fetchone(self):
+        return self._row(self._cursor.fetchone())
+
+    def fetchall(self):
+        return [self._row(row) for row in self._cursor.fetchall()]
+
+    def __iter__(self):
+        return (self._row(row) for row in self._cursor)
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """Pooled sqlite3 connection with the parts of the mysql-connector API Database uses"""
+
+    def __init__(self, raw, backend):
+        self.raw = raw
+        self._backend = backend
+
+    def cursor(self, dictionary: bool = False, **kwargs):
+        return SQLiteCursor(self, dictionary)
+
+    @property
+    def in_transaction(self) -> bool:
+        return self.raw.in_transaction
+
+    def start_transaction(self) -> None:
+        self.raw.execute('BEGIN IMMEDIATE')
+
+    def commit(self) -> None:
+        if self.raw.in_transaction:
+            self.raw.execute('COMMIT')
+
+    def rollback(self) -> None:
+        if self.raw.in_transaction:
+            self.raw.execute('ROLLBACK')
+
+    def close(self) -> None:
+        """Roll back anything uncommitted and return the connection to the pool"""
+        if self.raw is None:
+            return
+        self.rollback()
+        self._backend._release(self.raw)
+        self.raw = None
+
+
+class SQLiteBackend:
+    """Embedded SQLite file in WAL mode, for single-host installs without a MySQL server"""
+    name = 'sqlite'
+
+    def __init__(self, path: str = None):
+        self.path = path or Config.SQLITE_PATH
+        self._idle = None
+        self._idle_pid = None
+        self._idle_lock = threading.Lock()
+        sqlite3.register_adapter(datetime, lambda value: value.isoformat(' '))
+        sqlite3.register_converter('TIMESTAMP', lambda value: datetime.fromisoformat(value.decode()))
+
+    def _open(self):
+        raw = sqlite3.connect(
+            self.path,
+            timeout=Config.SQLITE_BUSY_TIMEOUT,
+            isolation_level=None,  # Transactions are begun explicitly, see SQLiteCursor
+            check_same_thread=False,  # The pool hands a connection to one thread at a time
+            detect_types=sqlite3.PARSE_DECLTYPES,
+        )
+        raw.execute('PRAGMA journal_mode=WAL')  # Readers don't block the writer
+        raw.execute('PRAGMA synchronous=NORMAL')  # Durable at checkpoints; safe with WAL
+        raw.execute('PRAGMA foreign_keys=ON')
+        raw.execute(f'PRAGMA busy_timeout={int(Config.SQLITE_BUSY_TIMEOUT * 1000)}')
+        return raw
+
+    def _idle_connections(self) -> queue.LifoQueue:
+        if self._idle is None or self._idle_pid != os.getpid():
+            with self._idle_lock:
+                if self._idle is None or self._idle_pid != os.getpid():
+                    self._idle = queue.LifoQueue()
+                    self._idle_pid = os.getpid()
+        return self._idle
+
+    def _release(self, raw) -> None:
+        idle = self._idle_connections()
+        if idle.qsize() < Config.DB_POOL_SIZE:
+            idle.put(raw)
+        else:
+            raw.close()
+
+    def connect(self) -> SQLiteConnection:
+        """Get a pooled connection; close() returns it to the pool"""
+        try:
+            raw = self._idle_connections().get_nowait()
+        except queue.Empty:
+            raw = self._open()
+        return SQLiteConnection(raw, self)
+
+    def connect_direct(self) -> SQLiteConnection:
+        return SQLiteConnection(self._open(), self)
+
+    def ensure_database(self) -> None:
+        """Create the directory holding the database file"""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+    def table_exists(self, cursor, table: str) -> bool:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", (table,))
+        return cursor.fetchone() is not None
+
+    def create_schema(self, conn) -> None:
+        """Create all tables and indexes (see sqlite_schema.py)"""
+        from .sqlite_schema import ADDED_COLUMNS, SCHEMA
+        # Columns added after a table shipped; CREATE TABLE IF NOT EXISTS
+        # won't add them and the schema's indexes may need them
+        for table, column, ddl, backfill in ADDED_COLUMNS:
+            columns = [row[1] for row in conn.raw.execute(f"PRAGMA table_info({table})")]
+            if columns and column not in columns:
+                conn.raw.execute(f"ALTER TABLE {table} ADD COLUMN {ddl}")
+                if backfill:
+                    conn.raw.execute(backfill)
+        conn.raw.executescript(SCHEMA)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+def get_backend():
+    """The process-wide backend selected by DB_BACKEND"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if Config.DB_BACKEND == 'sqlite':
+                    _backend = SQLiteBackend()
+                elif Config.DB_BACKEND == 'mysql':
+                    _backend = MySQLBackend()
+                else:
+                    raise ValueError(f"Unknown DB_BACKEND {Config.DB_BACKEND!r}")
+    return _backend
@@ -0,0 +1,28 @@
+from typing import Callable, Dict, Any
+
+# Registry of extractors that derive stored rows from a save's parser output.
+# Bump an extractor's version (or add a new one) and run backfill.py to apply
+# it to saves that were ingested before it existed.
+EXTRACTORS: Dict[str, Dict[str, Any]] = {}
+
+def extractor(name: str, version: int) -> Callable:
+    """Register a function(db, conn, checksum, output) as a versioned extractor"""
+    def register(func: Callable) -> Callable:
+        EXTRACTORS[name] = {'version': version, 'func': func}
+        return func
+    return register
+
+def current_extractor_versions() -> Dict[str, int]:
+    """Map of extractor name to its current version"""
+    return {name: entry['version'] for name, entry in EXTRACTORS.items()}
+
+@extractor('event_payloads', 1)
+def extract_event_payloads(db, conn, checksum: str, output: Dict[str, Any]) -> None:
+    """Typed ruler/leader/province payloads for the historical events a file stores"""
+    db.replace_event_payloads(conn, checksum, output.get('processed_data', []))
+
+
+@extractor('map_colors', 1)
+def extract_map_colors(db, conn, checksum: str, output: Dict[str, Any]) -> None:
+    """In-game map color of every country, used to color income plots"""
+    db.replace_map_colors(conn, checksum, output.get('processed_data', []))
\ No newline at end of file
@@ -1,12 +1,23 @@
 import os
-import json
 import hashlib
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from .database import Database
 from datetime import datetime
 import subprocess
 from .s3_service import S3Service
+from .admission import AdmissionController
+from .artifact_store import ArtifactStore
+from .parser_output import ParserOutput
+from .config import Config
+from .extractors import current_extractor_versions
+from .metrics import Metrics
+from .profiling import IngestProfile, profile_sample_rate
+
+class DuplicateFileError(ValueError):
+    """Raised when a user uploads a save they already have"""
+    def __init__(self):
+        super().__init__("You have already uploaded this save.")
 
 class FileService:
     PROCESSED_DIR = "processed"
@@ -27,82 +38,126 @@ class FileService:
         return sha256_hash.hexdigest()
 
     @staticmethod
-    def process_file(file_path: str, user_id: int) -> Dict[str, Any]:
-        """Process a file and save all data to database atomically"""
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"File not found: {file_path}")
+    def run_parser(file_path: str, user_id: int, checksum: Optional[str] = None) -> str:
+        """Run the Rust parser on a save and return the path of its output (NDJSON, or JSON from older builds)
 
-        # Initialize S3 service
-        s3 = S3Service()
-        s3_key = None
-
-        # Get paths
+        A known `checksum` pins down the output when saves with the same
+        name are parsed concurrently.
+        """
         project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         rust_binary = os.path.join(project_root, "eu4_parser.exe")
         input_file = os.path.join(project_root, file_path)
         processed_dir = os.path.join(project_root, "processed")
         os.makedirs(processed_dir, exist_ok=True)
 
-        json_path = None
-        db = Database()
-        conn = db._get_connection()  # Get a single connection for the entire process
-        
         try:
-            # 1. Upload original file to S3
-            s3_key = s3.upload_file(file_path, user_id)
+            subprocess.run(
+                [rust_binary, input_file, str(user_id)],
+                cwd=project_root,
+                check=True,
+                capture_output=True,
+                text=True
+            )
+        except subprocess.CalledProcessError as e:
+            # Extract and clean up the error message
+            error_msg = (e.stderr.strip() if e.stderr else "No error message from parser")
+            
+            # Create a clean error message
+            clean_error = (
+                "⚠️ File Processing Failed ⚠️\n"
+                f"Error: {error_msg}\n\n"
+                "Possible solutions:\n"
+                "- Ensure the file is uncompressed\n"
+                "- Use a non-Ironman save file\n"
+                "- Verify the file is a valid EU4 save\n\n"
+                "Technical details available in server logs"
+            )
+            
+            user_error = RuntimeError(clean_error)
+            # Attach the full error as an attribute
+            user_error.full_error = str(e)
+            raise user_error from None
 
-            # 2. Process file with Rust binary
-            try:
-                result = subprocess.run(
-                    [rust_binary, input_file, str(user_id)],
-                    cwd=project_root,
-                    check=True,
-                    capture_output=True,
-                    text=True
-                )
-            except subprocess.CalledProcessError as e:
-                # Extract and clean up the error message
-                error_msg = (e.stderr.strip() if e.stderr else "No error message from parser")
-                
-                # Create a clean error message
-                clean_error = (
-                    "⚠️ File Processing Failed ⚠️\n"
-                    f"Error: {error_msg}\n\n"
-                    "Possible solutions:\n"
-                    "- Ensure the file is uncompressed\n"
-                    "- Use a non-Ironman save file\n"
-                    "- Verify the file is a valid EU4 save\n\n"
-                    "Technical details available in server logs"
-                )
-                
-                user_error = RuntimeError(clean_error)
-                # Attach the full error as an attribute
-                user_error.full_error = str(e)
-                raise user_error from None
-
-            # 3. Find the generated JSON file
-            json_files = [
-                f for f in os.listdir(processed_dir)
-                if f.endswith('.json') and f.startswith(Path(file_path).stem)
-            ]
-            if not json_files:
-                raise RuntimeError("No output JSON file was generated. The parser may have failed silently.")
-
-            json_files.sort(key=lambda f: os.path.getmtime(os.path.join(processed_dir, f)))
-            json_file = json_files[-1]
-            json_path = os.path.join(processed_dir, json_file)
-
-            # 4. Load the processed data
-            with open(json_path, 'r', encoding='utf-8') as f:
-                output = json.load(f)
-            checksum = output['file_checksum']
-
-            # 5. Save all country data in a transaction
-            for country_data in output.get('processed_data', []):
-                db.save_all_country_data(conn, checksum, country_data)
-
-            # 6. Register file processing with S3 key
-            db.register_file_processing(
+        # Find the generated output file, named <stem>_<first 8 of checksum>
+        prefix = f"{Path(file_path).stem}_{checksum[:8]}" if checksum else Path(file_path).stem
+        json_files = [
+            f for f in os.listdir(processed_dir)
+            if f.endswith(('.ndjson', '.json')) and f.startswith(prefix)
+        ]
+        if not json_files:
+            raise RuntimeError("No output JSON file was generated. The parser may have failed silently.")
+
+        json_files.sort(key=lambda f: os.path.getmtime(os.path.join(processed_dir, f)))
+        return os.path.join(processed_dir, json_files[-1])
+
+    @staticmethod
+    def store_artifacts(file_path: str, json_path: str, checksum: str) -> str:
+        """Compress a save and its parser output into the artifact store
+
+        Returns the output's artifact path. The parser's uncompressed output
+        and its copy of the original in processed/ are removed.
+        """
+        store = ArtifactStore()
+        store.put(file_path, 'original', digest=checksum)
+        artifact_path = store.put(json_path, 'output')
+        os.remove(json_path)
+        copy_path = os.path.join(FileService.PROCESSED_DIR, os.path.basename(file_path))
+        if os.path.exists(copy_path) and os.path.abspath(copy_path) != os.path.abspath(file_path):
+            os.remove(copy_path)
+        return artifact_path
+
+    @staticmethod
+    def ingest_output(db: Database, conn, profile: IngestProfile, file_path: str, json_path: str,
+                      user_id: int, s3_key: str = None) -> Dict[str, Any]:
+        """Load a parser output into the database and register the file (no commit)
+
+        Returns the new file ID, checksum, country count, parser stage
+        timings and where the output ended up.
+        """
+        metrics = Metrics()
+
+        # 4. Read the output header; countries are streamed below
+        with profile.stage('json_load'):
+            output = ParserOutput(json_path)
+        header = output.header
+        checksum = header['file_checksum']
+
+        # 5. Attach the save to its campaign so only new rows are stored
+        with profile.stage('campaign'):
+            campaign_id = db.get_or_create_campaign(
+                conn, user_id, header.get('campaign_id') or checksum
+            )
+            position = db.add_file_to_campaign(conn, campaign_id, checksum, header.get('game_date', ''))
+            if position is None:
+                output.close()
+                raise DuplicateFileError()
+
+        # 6. Save all country data in a transaction, one country in memory at a time
+        with profile.stage('save_rows'):
+            map_colors = []
+            with output:
+                for country_data in output.countries():
+                    # Only this country's rows from earlier saves are loaded, keeping memory bounded
+                    known_rows = db.get_campaign_known_rows(conn, position, country_data['country_tag'])
+                    if position['successor']:
+                        db.rebase_campaign_successor(conn, position, country_data, known_rows)
+                    db.save_all_country_data(conn, checksum, country_data, known_rows, campaign_id)
+                    map_colors.append({
+                        'country_tag': country_data['country_tag'],
+                        'current_state': {'map_color': country_data.get('current_state', {}).get('map_color')},
+                    })
+            db.replace_map_colors(conn, checksum, map_colors)
+        stage_timings = output.footer.get('stage_timings_ms', {})
+        for stage, ms in stage_timings.items():
+            metrics.observe('parser_stage_seconds', ms / 1000, stage=stage)
+
+        if Config.ARTIFACT_STORE_ENABLED:
+            with profile.stage('artifacts'):
+                json_path = FileService.store_artifacts(file_path, json_path, checksum)
+
+        with profile.stage('register'):
+            # 7. Register file processing with S3 key
+            file_id = db.register_file_processing(
                 conn,
                 original_filename=os.path.basename(file_path),
                 checksum=checksum,
@@ -111,15 +166,70 @@ class FileService:
                 s3_key=s3_key
             )
 
-            # Commit the entire transaction
-            conn.commit()
+            # 8. Fold the file into the user's precomputed leaderboard rows
+            db.update_leaderboard(conn, user_id, checksum, campaign_id)
+
+            # 9. Everything a backfill could add has been extracted at ingest
+            db.record_extractions(conn, file_id, current_extractor_versions())
+
+        return {
+            'file_id': file_id,
+            'checksum': checksum,
+            'countries': len(map_colors),
+            'stage_timings': stage_timings,
+            'json_path': json_path,
+        }
+
+    @staticmethod
+    def process_file(file_path: str, user_id: int) -> Dict[str, Any]:
+        """Process a file and save all data to database atomically"""
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        db = Database()
+        checksum = FileService.calculate_checksum(file_path)
+        if db.user_has_file(user_id, checksum):
+            raise DuplicateFileError()
+
+        # Initialize S3 service
+        s3 = S3Service()
+        s3_key = None
+
+        json_path = None
+        conn = None
+
+        # Wait for memory to parse in before holding a connection; raises IngestBusy when saturated.
+        # Nothing may run between acquiring and the try, whose finally releases the slot
+        slot = AdmissionController().acquire(os.path.getsize(file_path))
+        try:
+            conn = db._get_connection()  # Get a single connection for the entire process
+            profile = IngestProfile(profile_sample_rate(db))
+            with profile:
+                with slot:
+                    # 1. Upload original file to S3
+                    with profile.stage('s3_upload'):
+                        s3_key = s3.upload_file(file_path, user_id)
+
+                    # 2-3. Process file with Rust binary and find the generated JSON file
+                    with profile.stage('parse'):
+                        json_path = FileService.run_parser(file_path, user_id, checksum)
+
+                # 4-9. Load the output into the database
+                ingested = FileService.ingest_output(db, conn, profile, file_path, json_path, user_id, s3_key)
+                json_path = ingested['json_path']
+
+                # Commit the entire transaction
+                with profile.stage('commit'):
+                    conn.commit()
+
+            profile.save(db, conn, ingested['file_id'], ingested['checksum'], ingested['stage_timings'])
 
             return {
                 'original_file': file_path,
                 'json_output': json_path,
-                'checksum': checksum,
+                'checksum': ingested['checksum'],
                 'user_id': user_id,
-                'data': output,
+                'countries': ingested['countries'],
                 's3_key': s3_key
             }
 
@@ -130,12 +240,16 @@ class FileService:
             # Clean up S3 file if it was uploaded
             if s3_key:
                 s3.delete_file(s3_key)
-            # Clean up JSON file if it was created
-            if json_path and os.path.exists(json_path):
+            # Clean up JSON file if it was created; stored artifacts may be
+            # shared and are left to the reaper
+            if json_path and not ArtifactStore.is_artifact(json_path) and os.path.exists(json_path):
                 os.remove(json_path)
+            if isinstance(e, DuplicateFileError):
+                raise  # Uploaded concurrently; already a message for the user
             raise RuntimeError(f"Processing failed: {str(e)}") from e
 
         finally:
+            slot.release()
             if conn:
                 conn.close()
 
@@ -149,14 +263,13 @@ class FileService:
         result = []
         for file in files:
             try:
-                with open(file['json_path'], 'r') as f:
-                    file_data = json.load(f)
+                with ParserOutput(file['json_path']) as output:
                     file.update({
-                        'original_filename': file_data.get('original_filename'),
-                        'processed_at': file_data.get('timestamp'),
-                        'countries': [c['country_tag'] for c in file_data.get('processed_data', [])]
+                        'original_filename': output.header.get('original_filename'),
+                        'processed_at': output.header.get('timestamp'),
+                        'countries': [c['country_tag'] for c in output.countries()]
                     })
-                    result.append(file)
+                result.append(file)
             except Exception as e:
                 print(f"Error loading file {file['id']}: {e}")
         
@@ -1,13 +1,14 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_required, current_user
 from app.database import Database
+from app.cache_service import CacheService
 
 friends_bp = Blueprint('friends_bp', __name__, template_folder='templates')
-db = Database()
 
 @friends_bp.route('/friends')
 @login_required  # Use Flask-Login's decorator
 def friends():
+    db = Database()
     return render_template('friends/friends.html',
                          pending_requests=db.get_pending_requests(current_user.id),
                          friends=db.get_friends_list(current_user.id))
@@ -15,6 +16,7 @@ def friends():
 @friends_bp.route('/add_friend', methods=['POST'])
 @login_required  # Use Flask-Login's decorator
 def add_friend():
+    db = Database()
     friend_username = request.form.get('friend_username')
     
     # Get friend user ID
@@ -41,8 +43,11 @@ def add_friend():
 @friends_bp.route('/accept_friend/<int:friend_id>')
 @login_required  # Use Flask-Login's decorator
 def accept_friend(friend_id):
+    db = Database()
     try:
         if db.accept_friend_request(current_user.id, friend_id):
+            # Friends-wide shares from either side are now visible
+            CacheService().invalidate_users([current_user.id, friend_id])
             flash('Friend request accepted!')
         else:
             flash('No pending friend request found')
@@ -0,0 +1,106 @@
+import gzip
+import hashlib
+import os
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Optional
+from flask import Response, request, session, current_app
+
+try:
+    import brotli  # Optional, enables Content-Encoding: br
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {'text/html', 'application/json', 'text/css', 'application/javascript'}
+MIN_COMPRESS_SIZE = 500
+STATIC_MAX_AGE = 365 * 24 * 3600
+
+def init_app(app):
+    """Register compression, static asset caching and cache-busting static URLs"""
+    app.url_defaults(_static_cache_buster)
+    app.after_request(_cache_static)
+    app.after_request(_compress)
+
+def make_etag(*parts) -> str:
+    """Stable validator built from the values a response depends on"""
+    return hashlib.sha1('|'.join(str(p) for p in parts).encode('utf-8')).hexdigest()
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.replace(microsecond=0)
+
+def set_validators(response: Response, etag: str, last_modified: Optional[datetime] = None) -> Response:
+    """Attach ETag/Last-Modified and require revalidation on every use"""
+    # Weak, because the same page can be sent gzip, brotli or identity encoded
+    response.set_etag(etag, weak=True)
+    if last_modified:
+        response.last_modified = _as_utc(last_modified)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+def not_modified(etag: str, last_modified: Optional[datetime] = None) -> Optional[Response]:
+    """Return a 304 response if the client's copy is current, else None"""
+    # Pending flash messages are rendered into the page, so it must be sent
+    if session.get('_flashes'):
+        return None
+
+    if request.if_none_match:
+        fresh = request.if_none_match.contains_weak(etag)
+    else:
+        since = request.if_modified_since
+        last_modified = _as_utc(last_modified)
+        fresh = bool(since and last_modified and last_modified <= since)
+
+    if not fresh:
+        return None
+    return set_validators(Response(status=304), etag, last_modified)
+
+@lru_cache(maxsize=256)
+def _static_version(path: str, mtime: float) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()[:12]
+
+def _static_cache_buster(endpoint, values):
+    """Add a content hash to static URLs so they can be cached forever"""
+    if endpoint != 'static' or 'filename' not in values or 'v' in values:
+        return
+    path = os.path.join(current_app.static_folder, values['filename'])
+    if os.path.isfile(path):
+        values['v'] = _static_version(path, os.path.getmtime(path))
+
+def _cache_static(response: Response) -> Response:
+    if request.endpoint == 'static' and 'v' in request.args and response.status_code == 200:
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = STATIC_MAX_AGE
+        response.cache_control.immutable = True
+    return response
+
+def _compress(response: Response) -> Response:
+    """gzip or brotli encode text responses the client accepts"""
+    if (response.direct_passthrough
+            or response.status_code < 200 or response.status_code >= 300
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or 'Content-Encoding' in response.headers):
+        return response
+
+    data = response.get_data()
+    if len(data) < MIN_COMPRESS_SIZE:
+        return response
+
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        response.set_data(brotli.compress(data, quality=5))
+        response.headers['Content-Encoding'] = 'br'
+    elif accepted['gzip']:
+        response.set_data(gzip.compress(data, compresslevel=6))
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        return response
+
+    response.vary.add('Accept-Encoding')
+    return response
@@ -0,0 +1,201 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Set
+from .admission import available_memory, estimate_parse_memory
+from .cache_service import CacheService
+from .config import Config
+from .database import Database
+from .file_service import FileService
+from .profiling import IngestProfile
+from .s3_service import S3Service
+
+SAVE_EXTENSION = '.eu4'
+
+# Worker processes: fetch, hash and parse one save each
+
+_worker_user_id = None
+_worker_known: Set[str] = set()
+
+def _init_worker(user_id: int, known: Set[str]) -> None:
+    global _worker_user_id, _worker_known
+    _worker_user_id, _worker_known = user_id, known
+
+def _prepare(source: Dict[str, Any], work_dir: str) -> Dict[str, Any]:
+    """Fetch, dedup and parse one save; returns the source with its outcome"""
+    # One directory per source, since archives often hold many saves with the same name
+    local_path = os.path.join(work_dir, str(source['position']), source['name'])
+    result = dict(source, local_path=local_path, checksum=None, json_path=None, s3_key=None, error=None)
+    try:
+        os.makedirs(os.path.dirname(local_path))
+        if 'key' in source:
+            if not S3Service().download_file(source['key'], local_path):
+                result['error'] = 'download failed'
+                return result
+        else:
+            try:
+                os.symlink(os.path.abspath(source['path']), local_path)
+            except OSError:
+                shutil.copyfile(source['path'], local_path)
+
+        result['checksum'] = FileService.calculate_checksum(local_path)
+        if result['checksum'] in _worker_known:
+            result['error'] = 'duplicate'
+            return result
+
+        result['s3_key'] = S3Service().upload_file(local_path, _worker_user_id)
+        result['json_path'] = FileService.run_parser(local_path, _worker_user_id, result['checksum'])
+    except Exception as e:
+        result['error'] = str(e)
+    return result
+
+
+class ImportService:
+    """Bulk-import a directory or S3 prefix of saves for one user.
+
+    Saves are fetched, checksummed and parsed in a process pool sized to the
+    cores and the memory the parser needs; the outputs are then loaded one
+    batch per transaction through the same steps as a web upload. Saves the
+    user already owns, and repeats within the archive, are skipped by
+    checksum. The sources are imported in sorted order and a checkpoint
+    (the count of sources finished) is saved with every batch under the
+    user and `source`, so an interrupted import of the same directory or
+    prefix resumes where it stopped. The checkpoint is cleared once the
+    import finishes.
+    """
+
+    def __init__(self, user_id: int, source: str, workers: Optional[int] = None, batch_size: int = 20):
+        self.user_id = user_id
+        self.source = source
+        self.workers = workers or Config.IMPORT_WORKERS
+        self.batch_size = batch_size
+        self.db = Database()
+        self.s3 = S3Service()
+
+    @staticmethod
+    def source_key(directory: Optional[str] = None, s3_prefix: Optional[str] = None) -> str:
+        """Identify a directory or S3 prefix for checkpointing, like dir:/saves or s3://bucket/saves/"""
+        if directory:
+            return f"dir:{os.path.realpath(directory)}"
+        return f"s3://{Config.S3_BUCKET}/{s3_prefix}"
+
+    @staticmethod
+    def list_sources(directory: Optional[str] = None, s3_prefix: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Saves under a directory (recursively) or an S3 prefix, in a stable order"""
+        sources = []
+        if directory:
+            for root, _, files in os.walk(directory):
+                for name in files:
+                    if name.endswith(SAVE_EXTENSION):
+                        path = os.path.join(root, name)
+                        sources.append({'path': path, 'name': name, 'size': os.path.getsize(path)})
+            sources.sort(key=lambda s: s['path'])
+        if s3_prefix:
+            s3 = S3Service()
+            if not s3.client:
+                raise RuntimeError('S3 is not configured')
+            keys = sorted(key for key, _ in s3.list_objects(s3_prefix) if key.endswith(SAVE_EXTENSION))
+            sources += [{'key': key, 'name': os.path.basename(key), 'size': None} for key in keys]
+        for position, source in enumerate(sources):
+            source['position'] = position
+        return sources
+
+    def _default_workers(self, sources: List[Dict[str, Any]]) -> int:
+        """One worker per core, fewer if the largest saves would not fit in memory"""
+        workers = os.cpu_count() or 1
+        available = available_memory()
+        sizes = [s['size'] for s in sources if s['size']]
+        if available and sizes:
+            per_parse = estimate_parse_memory(max(sizes))
+            workers = min(workers, max(1, available // per_parse))
+        return workers
+
+    def _discard(self, result: Dict[str, Any]) -> None:
+        """Remove what a skipped or failed source left behind"""
+        if result['s3_key']:
+            self.s3.delete_file(result['s3_key'])
+        if result['json_path'] and os.path.exists(result['json_path']):
+            os.remove(result['json_path'])
+
+    def _write_batch(self, results: List[Dict[str, Any]], seen: Set[str], stats: Dict[str, Any]) -> None:
+        """Load a parsed batch in one transaction and advance the checkpoint"""
+        written = []
+        conn = self.db._get_connection()
+        try:
+            for result in results:
+                if result['error'] or result['checksum'] in seen:
+                    if result['error'] == 'duplicate' or result['checksum'] in seen:
+                        stats['duplicates'] += 1
+                    else:
+                        stats['failed'] += 1
+                        print(f"[import] {result['name']} skipped: {result['error']}")
+                    self._discard(result)
+                    continue
+                FileService.ingest_output(self.db, conn, IngestProfile(), result['local_path'],
+                                          result['json_path'], self.user_id, result['s3_key'])
+                seen.add(result['checksum'])
+                written.append(result)
+
+            self.db.save_import_checkpoint(conn, self.user_id, self.source, results[-1]['position'] + 1)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            for result in written:
+                if result['s3_key']:
+                    self.s3.delete_file(result['s3_key'])
+            raise
+        finally:
+            conn.close()
+
+        for result in written:
+            stats['imported'] += 1
+            stats['bytes'] += result['size'] or 0
+        if written:
+            CacheService().invalidate_users([self.user_id])
+
+    def run(self, sources: List[Dict[str, Any]], restart: bool = False,
+            limit: Optional[int] = None) -> Dict[str, Any]:
+        """Import the given sources and return run statistics"""
+        if not self.db.get_user_by_id(self.user_id):
+            raise ValueError(f"No user with ID {self.user_id}")
+
+        done = 0 if restart else self.db.get_import_checkpoint(self.user_id, self.source)
+        pending = sources[done:]
+        if limit is not None:
+            pending = pending[:limit]
+        workers = self.workers or self._default_workers(pending)
+        stats = {'imported': 0, 'duplicates': 0, 'failed': 0, 'bytes': 0,
+                 'started_at': done, 'workers': workers}
+        seen = self.db.get_user_checksums(self.user_id)
+        FileService.ensure_processed_dir()
+        started = time.perf_counter()
+
+        # Spawned, not forked: workers must not share the parent's DB and S3 connections
+        with tempfile.TemporaryDirectory(prefix='eu4_import_') as work_dir, \
+                ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                    initializer=_init_worker, initargs=(self.user_id, seen)) as pool:
+            for start in range(0, len(pending), self.batch_size):
+                batch = pending[start:start + self.batch_size]
+                results = list(pool.map(_prepare, batch, [work_dir] * len(batch)))
+                for result in results:
+                    if result['size'] is None and os.path.exists(result['local_path']):
+                        result['size'] = os.path.getsize(result['local_path'])
+                self._write_batch(results, seen, stats)
+                for result in results:
+                    shutil.rmtree(os.path.dirname(result['local_path']), ignore_errors=True)
+
+                elapsed = time.perf_counter() - started
+                print(f"[import] {done + start + len(batch)}/{len(sources)}: {stats['imported']} imported, "
+                      f"{stats['duplicates']} duplicates, {stats['failed']} failed "
+                      f"({stats['imported'] / elapsed:.2f} files/s)")
+
+        if done + len(pending) >= len(sources):
+            self.db.clear_import_checkpoint(self.user_id, self.source)
+
+        stats['seconds'] = time.perf_counter() - started
+        stats['files_per_second'] = (stats['imported'] / stats['seconds']) if stats['seconds'] else 0.0
+        stats['mb_per_second'] = (stats['bytes'] / 1e6 / stats['seconds']) if stats['seconds'] else 0.0
+        return stats
@@ -0,0 +1,154 @@
+import logging
+import os
+import shutil
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+from .admission import AdmissionController
+from .cache_service import CacheService
+from .config import Config
+from .database import Database
+from .file_service import FileService
+from .metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+JOB_TTL = 3600  # Seconds a finished job's status stays visible, and an unfinished one is trusted
+
+LOST_ERROR = "Processing was interrupted by a server restart. Please upload the save again."
+
+def _worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+class IngestJobs:
+    """Runs the full ingest of validated uploads on background threads
+
+    The upload request only stores the save and reads its meta block; the
+    parse and database load happen here while the user already sees a
+    preview. Job status lives in the ingest_jobs table, so any worker can
+    answer a status poll or list a failure on the index page. The queue
+    itself is the submitting worker's thread pool: a job whose worker died
+    is reported as failed rather than left spinning.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(IngestJobs, cls).__new__(cls)
+            cls._instance._lock = threading.Lock()
+            cls._instance._queued = 0
+            cls._instance._pool = None
+        return cls._instance
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        # Created on first use so importing the app never starts threads
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=Config.INGEST_WORKERS,
+                                                thread_name_prefix='ingest')
+            return self._pool
+
+    def submit(self, file_path: str, user_id: int, meta: Dict[str, Any],
+               share_with_friends: bool = False) -> str:
+        """Queue a validated upload for ingest and return its job ID
+
+        The job owns `file_path` and removes its directory when done. Raises
+        IngestBusy when ADMISSION_MAX_QUEUED uploads are already waiting.
+        """
+        job = {
+            'id': uuid.uuid4().hex,
+            'user_id': user_id,
+            'filename': os.path.basename(file_path),
+            'meta': meta,
+            'state': 'queued',
+            'worker': _worker_id(),
+            'submitted_at': time.time(),
+        }
+        # Only this worker's pool runs the job, so only its backlog counts
+        with self._lock:
+            if self._queued >= Config.ADMISSION_MAX_QUEUED:
+                raise AdmissionController().busy('jobs_queued', waiting=self._queued)
+            self._queued += 1
+        try:
+            db = Database()
+            db.delete_ingest_jobs(finished_before=time.time() - JOB_TTL)
+            db.create_ingest_job(job)
+            self._get_pool().submit(self._run, job, file_path, share_with_friends)
+        except Exception:
+            with self._lock:
+                self._queued -= 1
+            raise
+        return job['id']
+
+    def _run(self, job: Dict[str, Any], file_path: str, share_with_friends: bool) -> None:
+        with self._lock:
+            self._queued -= 1
+        job.update(state='processing', checksum=None, error=None)
+        self._record(job)
+        try:
+            result = FileService.process_file(file_path, job['user_id'])
+            audience = [job['user_id']]
+            if share_with_friends:
+                db = Database()
+                file_data = db.get_file_by_checksum(result['checksum'], job['user_id'])
+                if file_data:
+                    db.share_file_with_friends(file_data['id'], job['user_id'])
+                    audience += db.get_friend_ids(job['user_id'])
+            CacheService().invalidate_users(audience)
+            job['checksum'] = result['checksum']
+            job['state'] = 'done'
+        except Exception as e:
+            logger.warning("Background ingest of %s failed: %s", job['filename'], e)
+            job['error'] = str(e)
+            job['state'] = 'failed'
+        finally:
+            job['finished_at'] = time.time()
+            self._record(job)
+            Metrics().inc('ingest_jobs_total', outcome=job['state'])
+            shutil.rmtree(os.path.dirname(file_path), ignore_errors=True)
+
+    @staticmethod
+    def _record(job: Dict[str, Any]) -> None:
+        """Store a job's state; a failed write only costs the status, never the ingest"""
+        try:
+            Database().update_ingest_job(job['id'], job['state'], job['checksum'],
+                                         job['error'], job.get('finished_at'))
+        except Exception as e:
+            logger.warning("Failed to record state of ingest job %s: %s", job['id'], e)
+
+    @staticmethod
+    def _is_lost(job: Dict[str, Any]) -> bool:
+        """Whether an unfinished job can no longer finish: its worker is gone or it is too old"""
+        if job['state'] not in ('queued', 'processing'):
+            return False
+        if job['submitted_at'] < time.time() - JOB_TTL:
+            return True
+        host, _, pid = job['worker'].rpartition(':')
+        if host != socket.gethostname():
+            return False  # Can't see another host's processes; the age limit covers it
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return True
+        except (PermissionError, ValueError):
+            pass
+        return False
+
+    def _settle(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        if self._is_lost(job):
+            job.update(state='failed', error=LOST_ERROR, finished_at=time.time())
+            Database().update_ingest_job(job['id'], 'failed', None, LOST_ERROR, job['finished_at'])
+        return job
+
+    def get(self, job_id: str, user_id: int) -> Optional[Dict[str, Any]]:
+        """A job's status, if it belongs to the user"""
+        job = Database().get_ingest_job(job_id, user_id)
+        return self._settle(job) if job else None
+
+    def for_user(self, user_id: int) -> List[Dict[str, Any]]:
+        """The user's recent jobs, oldest first"""
+        jobs = Database().get_user_ingest_jobs(user_id, finished_after=time.time() - JOB_TTL)
+        return [self._settle(job) for job in jobs]
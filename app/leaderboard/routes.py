@@ -0,0 +1,25 @@
+from flask import Blueprint, render_template, request
+from flask_login import login_required, current_user
+from app.config import Config
+from app.database import Database
+
+leaderboard_bp = Blueprint('leaderboard', __name__)
+
+@leaderboard_bp.route('/leaderboard')
+@login_required
+def leaderboard():
+    """Show precomputed leaderboards for the user or the user and their friends"""
+    db = Database()
+    scope = request.args.get('scope', 'friends')
+
+    user_ids = [current_user.id]
+    if scope == 'friends':
+        user_ids += db.get_friend_ids(current_user.id)
+    else:
+        scope = 'mine'
+
+    boards = db.get_leaderboard(user_ids)
+    return render_template('leaderboard/leaderboard.html',
+                         boards=boards,
+                         scope=scope,
+                         threshold=Config.LEADERBOARD_INCOME_THRESHOLD)
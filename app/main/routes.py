@@ -1,23 +1,69 @@
-from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app
+from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app, jsonify, make_response, abort
 from flask_login import login_required, current_user
 from werkzeug.utils import secure_filename
 import os
-from app.file_service import FileService
+import shutil
+import tempfile
+from app.admission import IngestBusy
+from app.ingest_jobs import IngestJobs
+from app.save_meta import InvalidSave, read_save_meta
+from app.artifact_store import ArtifactStore
+from app.analytics_service import AnalyticsService
+from app.config import Config
+from app.cache_service import CacheService
+from app.http_caching import make_etag, not_modified, set_validators
 import traceback
 from app.database import Database
+from app.db_backends import DatabaseError, is_duplicate_entry
 import json
-import mysql.connector
-from mysql.connector import errorcode
 import io
 import base64
-import matplotlib.pyplot as plt
-from matplotlib.colors import to_rgb
-import random
+import numpy as np
+from app.country_colors import get_country_color
 
 ALLOWED_EXTENSIONS = {'eu4'}
 
 main_bp = Blueprint('main', __name__)
 
+def load_pyplot():
+    """Import pyplot on first use; it is the slowest import in the app"""
+    import matplotlib
+    matplotlib.use('Agg')  # Render to buffers only, no GUI backend
+    import matplotlib.pyplot as plt
+    return plt
+
+def render_income_png(series, map_colors=None):
+    """Render an income series as PNG bytes, or None if there is nothing to plot"""
+    if not series.income.size:
+        return None
+
+    plt = load_pyplot()
+    plt.figure(figsize=(10, 6))
+    for country_tag, incomes in zip(series.tags, series.income):
+        valid = ~np.isnan(incomes)
+        color = get_country_color(str(country_tag), map_colors)
+        plt.plot(series.years[valid], incomes[valid], label=str(country_tag),
+                 color=(color[0]/255, color[1]/255, color[2]/255))
+
+    png = None
+    if plt.gca().has_data():  # Only save if we actually plotted something
+        plt.xlabel('Year')
+        plt.ylabel('Income')
+        plt.title('Annual Income by Country')
+        plt.legend()
+        plt.grid(True)
+
+        buf = io.BytesIO()
+        plt.savefig(buf, format='png', bbox_inches='tight')
+        png = buf.getvalue()
+    plt.close()
+    return png
+
+def render_income_plot(series, map_colors=None):
+    """Render an income series as a base64 PNG for inline images"""
+    png = render_income_png(series, map_colors)
+    return base64.b64encode(png).decode('utf8') if png else None
+
 @main_bp.route('/file/<string:checksum>')
 @login_required
 def file_details(checksum):
@@ -31,89 +77,110 @@ def file_details(checksum):
         flash('File not found or you don\'t have permission to view it', 'danger')
         return redirect(url_for('main.index'))
 
-    plot_url = None
+    owner_id = file_data['user_id']
+    campaign = db.get_campaign_for_file(checksum, owner_id)
+    file_count = campaign['file_count'] if campaign else 0
+    etag = make_etag(checksum, file_data['processed_at'], current_user.id, file_count)
+    cached = not_modified(etag, file_data['processed_at'])
+    if cached:
+        return cached
+
     try:
-        # Get all country data from database
-        countries = []
-        annual_income_data = {}  # For storing plot data
-        
-        # First get all unique country tags for this file
-        conn = db._get_connection()
-        cursor = conn.cursor(dictionary=True)
-        
-        try:
-            cursor.execute("""
-                SELECT DISTINCT country_tag 
-                FROM current_state 
-                WHERE file_checksum = %s
-            """, (checksum,))
-            country_tags = [row['country_tag'] for row in cursor.fetchall()]
+        # File data only changes as the owner's campaign grows, so it is cached
+        # per checksum, owner and campaign size: another user's copy of the
+        # same save resolves against their own campaign
+        view = CacheService().get_or_set(
+            'file_details', f"file:{checksum}",
+            lambda: load_file_view(db, checksum, file_data),
+            variant=f"{owner_id}:{file_count}"
+        )
             
-            # Get data for each country
-            for tag in country_tags:
-                country = {
-                    'country_tag': tag,
-                    'current_state': db.get_current_state(checksum, tag),
-                    'annual_income': db.get_annual_income(checksum, tag),
-                    'historical_events': db.get_historical_events(checksum, tag)
-                }
-                countries.append(country)
-                
-                # Store annual income data for plotting
-                if country['annual_income']:
-                    annual_income_data[tag] = {
-                        'annual_income': country['annual_income']
-                    }
-
-        finally:
-            cursor.close()
-            conn.close()
-            
-        # Generate plot if we have annual income data
-        if annual_income_data:
-            plt.figure(figsize=(10, 6))
-            for country_tag, data in annual_income_data.items():
-                try:
-                    # Ensure we have valid data to plot
-                    if not data['annual_income']:
-                        continue
-                        
-                    years = []
-                    incomes = []
-                    for income in data['annual_income']:
-                        try:
-                            year = int(income['year']) if 'year' in income else None
-                            income_val = float(income['income']) if 'income' in income else None
-                            if year is not None and income_val is not None:
-                                years.append(year)
-                                incomes.append(income_val)
-                        except (ValueError, TypeError):
-                            continue
-                    
-                    if years and incomes:
-                        color = get_country_color(country_tag)
-                        plt.plot(years, incomes, label=country_tag, color=(color[0]/255, color[1]/255, color[2]/255))
-                
-                except Exception as e:
-                    current_app.logger.error(f"Error plotting data for {country_tag}: {str(e)}")
-                    continue
+        # Ensure timestamp exists for template
+        if 'processed_at' in file_data and 'timestamp' not in file_data:
+            file_data['timestamp'] = file_data['processed_at']
             
-            if plt.gca().has_data():  # Only save if we actually plotted something
-                plt.xlabel('Year')
-                plt.ylabel('Income')
-                plt.title('Annual Income by Country')
-                plt.legend()
-                plt.grid(True)
-                
-                buf = io.BytesIO()
-                plt.savefig(buf, format='png', bbox_inches='tight')
-                buf.seek(0)
-                plot_url = base64.b64encode(buf.getvalue()).decode('utf8')
-                plt.close()
-            else:
-                plot_url = None
-
-        # Preserve the JSON file by writing the data we just fetched
+    except Exception as e:
+        flash(f'Error loading file data: {str(e)}', 'danger')
+        return redirect(url_for('main.index'))
+    
+    response = make_response(render_template('main/file_details.html',
+                         file_data=file_data,
+                         countries=view['countries'],
+                         has_plot=view['has_plot'],
+                         ruler_stats=view['ruler_stats'],
+                         campaign=campaign))
+    return set_validators(response, etag, file_data['processed_at'])
+
+@main_bp.route('/file/<string:checksum>/income.png')
+@login_required
+def file_income_plot(checksum):
+    """Income plot for a file, served separately so browsers can cache it"""
+    db = Database()
+    file_data = db.get_file_by_checksum(checksum, current_user.id)
+    if not file_data:
+        abort(404)
+
+    owner_id = file_data['user_id']
+    etag = make_etag('plot', checksum, file_data['processed_at'], owner_id)
+    cached = not_modified(etag, file_data['processed_at'])
+    if cached:
+        return cached
+
+    png = CacheService().get_or_set(
+        'income_plot', f"file:{checksum}",
+        lambda: render_income_png(AnalyticsService.file_income(checksum, owner_id),
+                                  db.get_map_colors(checksum, owner_id)) or b'',
+        variant=str(owner_id)
+    )
+    if not png:
+        abort(404)
+
+    response = set_validators(make_response(png), etag, file_data['processed_at'])
+    response.mimetype = 'image/png'
+    # The plot only changes if the file is deleted, so skip revalidation for a day
+    response.cache_control.no_cache = None
+    response.cache_control.max_age = 86400
+    return response
+
+def load_file_view(db, checksum, file_data):
+    """Fetch everything the file details page shows about a file's countries"""
+    countries = []
+    owner_id = file_data['user_id']
+    
+    # First get all unique country tags for this file
+    conn = db._get_connection()
+    cursor = conn.cursor(dictionary=True)
+    
+    try:
+        cursor.execute("""
+            SELECT DISTINCT country_tag 
+            FROM current_state 
+            WHERE file_checksum = %s
+        """, (checksum,))
+        country_tags = [row['country_tag'] for row in cursor.fetchall()]
+        
+        # Get data for each country
+        for tag in country_tags:
+            country = {
+                'country_tag': tag,
+                'current_state': db.get_current_state(checksum, tag),
+                'annual_income': db.get_annual_income(checksum, tag, owner_id),
+                'historical_events': db.get_historical_events(checksum, tag, owner_id)
+            }
+            countries.append(country)
+
+    finally:
+        cursor.close()
+        conn.close()
+        
+    # The plot itself is served by file_income_plot; only record whether there is one
+    has_plot = bool(db.get_income_rows(checksum, owner_id))
+
+    ruler_stats = db.get_ruler_stats(checksum, owner_id)
+
+    # Preserve the JSON file by writing the data we just fetched. Stored
+    # artifacts are content-addressed and never rewritten.
+    if not ArtifactStore.is_artifact(file_data['json_path']):
         try:
             json_data = {
                 'file_checksum': checksum,
@@ -121,43 +188,115 @@ def file_details(checksum):
                 'processed_data': countries,
                 'timestamp': file_data.get('processed_at', '')
             }
-            
+
             with open(file_data['json_path'], 'w', encoding='utf-8') as f:
-                json.dump(json_data, f, indent=2)
+                json.dump(json_data, f, indent=2, default=str)
         except Exception as e:
             current_app.logger.error(f"Failed to update JSON file: {str(e)}")
             # Continue even if JSON update fails
-            
-        # Ensure timestamp exists for template
-        if 'processed_at' in file_data and 'timestamp' not in file_data:
-            file_data['timestamp'] = file_data['processed_at']
-            
-    except Exception as e:
-        flash(f'Error loading file data: {str(e)}', 'danger')
+
+    return {'countries': countries, 'has_plot': has_plot, 'ruler_stats': ruler_stats}
+
+@main_bp.route('/campaign/<int:campaign_id>')
+@login_required
+def campaign_timeline(campaign_id):
+    """Show the unified timeline across every save of a campaign"""
+    db = Database()
+    campaign = db.get_campaign(campaign_id, current_user.id)
+    if not campaign:
+        flash('Campaign not found or you don\'t have permission to view it', 'danger')
         return redirect(url_for('main.index'))
-    
-    return render_template('main/file_details.html',
-                         file_data=file_data,
-                         countries=countries,
-                         plot_url=plot_url)
+
+    series = AnalyticsService.campaign_income(campaign_id)
+    return render_template('main/campaign.html',
+                         campaign=campaign,
+                         plot_url=render_income_plot(series, db.get_campaign_map_colors(campaign_id)),
+                         threshold_years=series.threshold_years(Config.LEADERBOARD_INCOME_THRESHOLD),
+                         threshold=Config.LEADERBOARD_INCOME_THRESHOLD)
+
+@main_bp.route('/api/campaign/<int:campaign_id>/income')
+@login_required
+def campaign_income_api(campaign_id):
+    """Income analytics for the unified campaign timeline"""
+    window = request.args.get('window', 5, type=int)
+    if window < 1:
+        return jsonify({'error': 'window must be at least 1'}), 400
+    db = Database()
+    if not db.get_campaign(campaign_id, current_user.id):
+        return jsonify({'error': 'Campaign not found'}), 404
+
+    series = AnalyticsService.campaign_income(campaign_id)
+    tags = request.args.getlist('tag')
+    if tags:
+        series = series.compare(tags)
+    return jsonify(series.to_dict(window=window, threshold=Config.LEADERBOARD_INCOME_THRESHOLD))
+
+@main_bp.route('/api/file/<string:checksum>/income')
+@login_required
+def file_income_api(checksum):
+    """Income analytics for a file, shared by the details page and charts"""
+    window = request.args.get('window', 5, type=int)
+    if window < 1:
+        return jsonify({'error': 'window must be at least 1'}), 400
+    db = Database()
+    file_data = db.get_file_by_checksum(checksum, current_user.id)
+    if not file_data:
+        return jsonify({'error': 'File not found'}), 404
+
+    etag = make_etag('income', checksum, file_data['processed_at'], file_data['user_id'],
+                     request.query_string.decode())
+    cached = not_modified(etag, file_data['processed_at'])
+    if cached:
+        return cached
+
+    series = AnalyticsService.file_income(checksum, file_data['user_id'])
+    tags = request.args.getlist('tag')
+    if tags:
+        series = series.compare(tags)
+    response = jsonify(series.to_dict(window=window, threshold=Config.LEADERBOARD_INCOME_THRESHOLD))
+    return set_validators(response, etag, file_data['processed_at'])
+
+@main_bp.route('/api/income')
+@login_required
+def user_income_api():
+    """Income analytics across all of the current user's saves"""
+    window = request.args.get('window', 5, type=int)
+    if window < 1:
+        return jsonify({'error': 'window must be at least 1'}), 400
+    series = AnalyticsService.user_income(current_user.id)
+    tags = request.args.getlist('tag')
+    if tags:
+        series = series.compare(tags)
+    return jsonify(series.to_dict(window=window, threshold=Config.LEADERBOARD_INCOME_THRESHOLD))
 
 @main_bp.route('/')
 @login_required
 def index():
     db = Database()
-    files = db.get_user_files(current_user.id)
-    shared_files = db.get_shared_files(current_user.id)
-    
-    # Ensure each file has a timestamp field
-    for file in files:
-        if 'processed_at' in file and 'timestamp' not in file:
-            file['timestamp'] = file['processed_at']
-    
-    for file in shared_files:
-        if 'processed_at' in file and 'timestamp' not in file:
-            file['timestamp'] = file['processed_at']
-    
-    return render_template('main/index.html', files=files, shared_files=shared_files)
+
+    def load_index():
+        files = db.get_user_files(current_user.id)
+        shared_files = db.get_shared_files(current_user.id)
+        
+        # Ensure each file has a timestamp field
+        for file in files:
+            if 'processed_at' in file and 'timestamp' not in file:
+                file['timestamp'] = file['processed_at']
+        
+        for file in shared_files:
+            if 'processed_at' in file and 'timestamp' not in file:
+                file['timestamp'] = file['processed_at']
+        return files, shared_files
+
+    files, shared_files = CacheService().get_or_set('index', f"user:{current_user.id}", load_index)
+    uploads = [dict(job, preview=describe_save(job['meta'])) for job in IngestJobs().for_user(current_user.id)]
+    return render_template('main/index.html', files=files, shared_files=shared_files, uploads=uploads)
+
+@main_bp.route('/cache/stats')
+@login_required
+def cache_stats():
+    """Cache hit/miss counters for this worker"""
+    return jsonify(CacheService().stats())
 
 @main_bp.route('/upload', methods=['POST'])
 @login_required
@@ -176,35 +315,59 @@ def upload_file():
         return redirect(url_for('main.index'))
 
     if file:
+        # One directory per upload; the background ingest owns it until it finishes
+        temp_root = os.path.join(current_app.instance_path, 'temp')
+        os.makedirs(temp_root, exist_ok=True)
+        upload_dir = tempfile.mkdtemp(dir=temp_root)
+        temp_path = os.path.join(upload_dir, secure_filename(file.filename))
+
+        # Validate from the meta block before anything reaches S3 or the parser
         try:
-            # Save to temp location
-            temp_dir = os.path.join(current_app.instance_path, 'temp')
-            os.makedirs(temp_dir, exist_ok=True)
-            filename = secure_filename(file.filename)
-            temp_path = os.path.join(temp_dir, filename)
             file.save(temp_path)
-            
-            # Process file
-            result = FileService.process_file(temp_path, current_user.id)
-            
-            # Check if user wants to share with friends
-            share_with_friends = request.form.get('share_with_friends') == 'on'
-            if share_with_friends:
-                db = Database()
-                file_data = db.get_file_by_checksum(result['checksum'], current_user.id)
-                if file_data:
-                    db.share_file_with_all_friends(file_data['id'], current_user.id)
-            
-            # Clean up
-            os.remove(temp_path)
-            
-            flash('File processed successfully!', 'success')
-            return redirect(url_for('main.file_details', checksum=result['checksum']))
-        
-        except Exception as e:
-            flash(f'{str(e)}', 'danger')
+            meta = read_save_meta(temp_path)
+            IngestJobs().submit(temp_path, current_user.id, meta,
+                                share_with_friends=request.form.get('share_with_friends') == 'on')
+        except InvalidSave as e:
+            shutil.rmtree(upload_dir, ignore_errors=True)
+            flash(str(e), 'danger')
             return redirect(url_for('main.index'))
-        
+        except IngestBusy as e:
+            shutil.rmtree(upload_dir, ignore_errors=True)
+            flash(str(e), 'warning')
+            response = redirect(url_for('main.index'))
+            response.headers['Retry-After'] = str(e.retry_after)  # For scripted uploads
+            return response
+        except Exception:
+            shutil.rmtree(upload_dir, ignore_errors=True)
+            raise
+
+        flash(f"{describe_save(meta)}: processing in the background, "
+              f"it will appear in your files shortly.", 'info')
+        return redirect(url_for('main.index'))
+
+def describe_save(meta):
+    """One-line preview of a save's meta block"""
+    who = meta['country_name'] or meta['player'] or 'Observer'
+    if meta['player'] and meta['country_name']:
+        who += f" ({meta['player']})"
+    if not meta['multiplayer']:
+        mode = 'single player'
+    elif meta['player_count']:
+        mode = f"multiplayer, {meta['player_count']} players"
+    else:
+        mode = 'multiplayer'
+    version = f", EU4 {meta['version']}" if meta['version'] else ''
+    return f"{who}, {meta['date']}{version}, {mode}"
+
+@main_bp.route('/upload/<string:job_id>')
+@login_required
+def upload_status(job_id):
+    """Status of a background ingest, polled by the index page"""
+    job = IngestJobs().get(job_id, current_user.id)
+    if not job:
+        abort(404)
+    return jsonify({'state': job['state'], 'checksum': job['checksum'], 'error': job['error']})
+
 @main_bp.route('/share_file/<string:checksum>', methods=['POST'])
 @login_required
 def share_file(checksum):
@@ -237,9 +400,10 @@ def share_file(checksum):
     try:
         # 5. Share the file
         db.share_file(file_data['id'], friend['id'])
+        CacheService().invalidate_users([friend['id']])
         flash(f'File successfully shared with {friend_username}!', 'success')
-    except mysql.connector.Error as err:
-        if err.errno == errorcode.ER_DUP_ENTRY:
+    except DatabaseError as err:
+        if is_duplicate_entry(err):
             flash(f'This file is already shared with {friend_username}', 'warning')
         else:
             flash(f'Error sharing file: {str(err)}', 'danger')
@@ -248,22 +412,25 @@ def share_file(checksum):
     
     return redirect(url_for('main.file_details', checksum=checksum))
 
-def parse_country_colors(file_path):
-    country_colors = {}
-    with open(file_path, 'r') as file:
-        for line in file:
-            if '=' in line:
-                tag, color = line.split('=')
-                tag = tag.strip()
-                color = tuple(map(int, color.strip().split()))
-                country_colors[tag] = color
-    return country_colors
+@main_bp.route('/share_file/<string:checksum>/friends', methods=['POST'])
+@login_required
+def share_file_with_friends(checksum):
+    """Share a file with all of the owner's friends, including future ones"""
+    db = Database()
+
+    file_data = db.get_file_by_checksum(checksum, current_user.id)
+    if not file_data or file_data['user_id'] != current_user.id:
+        flash('File not found or you don\'t have permission to share it', 'danger')
+        return redirect(url_for('main.index'))
 
-# Load country colors from the generated file
-COUNTRY_COLORS = parse_country_colors('country_colors.txt')
+    try:
+        db.share_file_with_friends(file_data['id'], current_user.id)
+        CacheService().invalidate_users(db.get_friend_ids(current_user.id))
+        flash('File shared with all of your friends!', 'success')
+    except Exception as e:
+        flash(f'Error sharing file: {str(e)}', 'danger')
 
-def get_country_color(country_tag):
-    return COUNTRY_COLORS.get(country_tag, (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255)))
+    return redirect(url_for('main.file_details', checksum=checksum))
 
 @main_bp.route('/delete_file/<string:checksum>', methods=['POST'])
 @login_required
@@ -280,11 +447,18 @@ def delete_file(checksum):
             return redirect(url_for('main.index'))
 
         # Attempt to delete the file
+        audience = db.get_file_audience(file_data['id'])
         success = db.delete_file(file_data['id'], current_user.id)
+        if success:
+            cache = CacheService()
+            cache.invalidate_users(audience)
+            cache.invalidate_file(checksum)
 
         # Also delete the local JSON file, if it exists
         try:
-            if success and os.path.exists(file_data['json_path']):
+            # Artifacts may be shared; the reaper removes them once unreferenced
+            if (success and not ArtifactStore.is_artifact(file_data['json_path'])
+                    and os.path.exists(file_data['json_path'])):
                 os.remove(file_data['json_path'])
         except Exception as e:
             current_app.logger.error(f"Error deleting JSON file: {str(e)}")
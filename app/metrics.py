@@ -0,0 +1,221 @@
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+from flask import Response, abort, g, has_request_context, request
+from .config import Config
+
+slow_query_log = logging.getLogger('app.slow_query')
+
+# Upper bounds in seconds, shared by every histogram
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+HELP = {
+    'http_request_duration_seconds': 'Time spent handling a request',
+    'db_queries_total': 'Queries executed, by route',
+    'db_query_duration_seconds_total': 'Time spent in queries, by route',
+    'db_slow_queries_total': 'Queries slower than SLOW_QUERY_MS, by route',
+    'ingest_stage_seconds': 'Time spent in each stage of FileService.process_file',
+    'parser_stage_seconds': 'Stage timings reported by the Rust parser',
+    's3_transfer_seconds': 'Time spent in S3 operations',
+    's3_transfer_bytes_total': 'Bytes moved to and from S3',
+    'artifact_write_seconds': 'Time spent compressing artifacts into the store',
+    'artifact_read_seconds': 'Time spent reading and parsing stored parser outputs',
+    'artifact_raw_bytes_total': 'Uncompressed bytes written to the artifact store',
+    'artifact_stored_bytes_total': 'Compressed bytes written to the artifact store',
+    'reaper_deleted_total': 'Orphaned S3 objects, artifacts and rows deleted by the reaper',
+    'admission_parses_active': 'Parses currently admitted',
+    'admission_queue_depth': 'Uploads waiting for memory to parse in',
+    'admission_memory_reserved_bytes': 'Estimated memory reserved by admitted parses',
+    'admission_memory_budget_bytes': 'Memory budget admitted parses may reserve',
+    'admission_wait_seconds': 'Time uploads waited to be admitted',
+    'admission_rejected_total': 'Uploads turned away because parsing was saturated',
+    'save_meta_seconds': 'Time spent validating uploads from their meta block',
+    'ingest_jobs_total': 'Background ingests finished, by outcome',
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+class Metrics:
+    """Process-local counters and histograms exported in Prometheus text format
+
+    Each worker process keeps its own registry, so scrape every worker (or
+    run a single worker per container) when deploying with gunicorn.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(Metrics, cls).__new__(cls)
+            cls._instance._lock = threading.Lock()
+            cls._instance._counters = {}
+            cls._instance._gauges = {}
+            cls._instance._histograms = {}
+        return cls._instance
+
+    @staticmethod
+    def _labels(labels: Dict[str, object]) -> Labels:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        """Add to a counter"""
+        key = self._labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels) -> None:
+        """Set a gauge"""
+        key = self._labels(labels)
+        with self._lock:
+            self._gauges.setdefault(name, {})[key] = value
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        """Record a duration in a histogram"""
+        key = self._labels(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            # Per-bucket counts, then sum and count
+            hist = series.setdefault(key, [0] * len(BUCKETS) + [0.0, 0])
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    hist[i] += 1
+                    break
+            hist[-2] += seconds
+            hist[-1] += 1
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        """Time a block into a histogram, even if it raises"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def record_query(self, sql: str, seconds: float) -> None:
+        """Account a query to the current route and log it if slow"""
+        route = current_route()
+        if has_request_context() and 'db_queries' in g:
+            g.db_queries += 1
+            g.db_seconds += seconds
+        self.inc('db_queries_total', route=route)
+        self.inc('db_query_duration_seconds_total', seconds, route=route)
+        if Config.SLOW_QUERY_MS and seconds * 1000 >= Config.SLOW_QUERY_MS:
+            self.inc('db_slow_queries_total', route=route)
+            slow_query_log.warning("%.1f ms [%s] %s", seconds * 1000, route,
+                                   re.sub(r'\s+', ' ', sql).strip()[:500])
+
+    def render(self) -> str:
+        """Prometheus text exposition of every metric"""
+        def fmt(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+            pairs = list(labels) + ([extra] if extra else [])
+            if not pairs:
+                return ''
+            return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# HELP {name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{name}{fmt(labels)} {value:g}")
+            for name, series in sorted(self._gauges.items()):
+                lines.append(f"# HELP {name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} gauge")
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{name}{fmt(labels)} {value:g}")
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# HELP {name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+                for labels, hist in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(BUCKETS, hist):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{fmt(labels, ('le', f'{bound:g}'))} {cumulative}")
+                    lines.append(f"{name}_bucket{fmt(labels, ('le', '+Inf'))} {hist[-1]}")
+                    lines.append(f"{name}_sum{fmt(labels)} {hist[-2]:g}")
+                    lines.append(f"{name}_count{fmt(labels)} {hist[-1]}")
+        return '\n'.join(lines) + '\n'
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def current_route() -> str:
+    """URL rule of the current request, or 'background' outside one"""
+    if not has_request_context():
+        return 'background'
+    return request.url_rule.rule if request.url_rule else 'unmatched'
+
+
+class InstrumentedCursor:
+    """Cursor proxy that times execute/executemany"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def _timed(self, method, operation, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(operation, *args, **kwargs)
+        finally:
+            Metrics().record_query(operation, time.perf_counter() - start)
+
+    def execute(self, operation, *args, **kwargs):
+        return self._timed(self._cursor.execute, operation, *args, **kwargs)
+
+    def executemany(self, operation, *args, **kwargs):
+        return self._timed(self._cursor.executemany, operation, *args, **kwargs)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+class InstrumentedConnection:
+    """Connection proxy whose cursors report query timings"""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._conn.cursor(*args, **kwargs))
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def init_app(app):
+    """Time every request and expose /metrics"""
+    if not Config.METRICS_ENABLED:
+        return
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.add_url_rule('/metrics', 'metrics', _metrics_endpoint)
+
+def _start_request():
+    g.request_start = time.perf_counter()
+    g.db_queries = 0
+    g.db_seconds = 0.0
+
+def _finish_request(response):
+    if 'request_start' in g:
+        elapsed = time.perf_counter() - g.request_start
+        Metrics().observe('http_request_duration_seconds', elapsed,
+                          method=request.method, route=current_route(), status=response.status_code)
+        # Per-request breakdown for the browser's network panel
+        response.headers['Server-Timing'] = (
+            f'db;dur={g.db_seconds * 1000:.1f};desc="{g.db_queries} queries", '
+            f'total;dur={elapsed * 1000:.1f}'
+        )
+    return response
+
+def _metrics_endpoint():
+    if Config.METRICS_TOKEN and request.headers.get('Authorization') != f"Bearer {Config.METRICS_TOKEN}":
+        abort(401)
+    return Response(Metrics().render(), mimetype='text/plain; version=0.0.4')
@@ -1,8 +1,13 @@
 from flask_login import UserMixin
+from .config import Config
 
 class User(UserMixin):
     def __init__(self, id, username, email, password_hash=''):
         self.id = id
         self.username = username
         self.email = email
-        self.password_hash = password_hash # Not used for verification anymore
\ No newline at end of file
+        self.password_hash = password_hash # Not used for verification anymore
+
+    @property
+    def is_admin(self):
+        return self.username in Config.ADMIN_USERNAMES
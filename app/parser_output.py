@@ -0,0 +1,85 @@
+import io
+import json
+import time
+from typing import Any, Dict, Iterator
+from .artifact_store import ArtifactStore
+from .metrics import Metrics
+
+class ParserOutput:
+    """Record-at-a-time reader for the Rust parser's output
+
+    The parser writes NDJSON: a header record, one record per country and
+    a footer with stage timings, so ingest only ever holds one country in
+    memory. Outputs written as a single JSON document by older parser
+    builds are still accepted, at the cost of loading them whole.
+
+        output = ParserOutput(path)
+        output.header['file_checksum']
+        for country in output.countries():
+            ...
+        output.footer['stage_timings_ms']
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.footer: Dict[str, Any] = {}
+        self._text = io.TextIOWrapper(ArtifactStore().open(path), encoding='utf-8')
+        self._document = None
+        try:
+            first = self._text.readline()
+        except Exception:
+            self.close()
+            raise
+        try:
+            record = json.loads(first)
+        except ValueError:
+            record = None
+        if isinstance(record, dict) and record.get('record') == 'header':
+            self.header = record
+        else:
+            # Legacy single document, usually pretty-printed
+            try:
+                self._document = json.loads(first + self._text.read())
+            finally:
+                self.close()
+            self.header = {k: v for k, v in self._document.items()
+                           if k not in ('processed_data', 'stage_timings_ms')}
+            self.footer = {'stage_timings_ms': self._document.get('stage_timings_ms', {})}
+
+    def countries(self) -> Iterator[Dict[str, Any]]:
+        """Yield each country's data in output order; the footer is read last"""
+        if self._document is not None:
+            yield from self._document.get('processed_data', [])
+            return
+        try:
+            for line in self._text:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if record.get('record') == 'country':
+                    yield record
+                elif record.get('record') == 'footer':
+                    self.footer = record
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        self._text.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+def load_output(path: str) -> Dict[str, Any]:
+    """Read a whole parser output into the single-document shape"""
+    start = time.perf_counter()
+    with ParserOutput(path) as output:
+        data = dict(output.header)
+        data['processed_data'] = list(output.countries())
+        data['stage_timings_ms'] = output.footer.get('stage_timings_ms', {})
+    Metrics().observe('artifact_read_seconds', time.perf_counter() - start,
+                      kind='output' if ArtifactStore.is_artifact(path) else 'legacy')
+    return data
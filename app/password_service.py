@@ -0,0 +1,86 @@
+import bcrypt
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from .config import Config
+
+def _hash_password(password: bytes, rounds: int) -> bytes:
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+
+def _check_password(password: bytes, password_hash: bytes) -> bool:
+    return bcrypt.checkpw(password, password_hash)
+
+def _ready() -> bool:
+    return True
+
+class PasswordServiceBusy(RuntimeError):
+    """Raised when too many hashes are already queued"""
+
+class PasswordService:
+    """Runs bcrypt in a bounded process pool so hashing doesn't serialize request threads
+
+    BCRYPT_WORKERS = 0 hashes inline on the calling thread instead.
+    """
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(PasswordService, cls).__new__(cls)
+            cls._instance._init_pool()
+        return cls._instance
+
+    def _init_pool(self):
+        self.rounds = Config.BCRYPT_ROUNDS
+        self.workers = Config.BCRYPT_WORKERS
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(Config.BCRYPT_MAX_PENDING)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        # Created on first use so importing the app never starts processes.
+        # Spawned, not forked: the server is multithreaded by then, and a
+        # forked child could inherit locks held by other threads
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context('spawn'))
+        return self._pool
+
+    def _run(self, func, *args):
+        if not self.workers:
+            return func(*args)
+        if not self._slots.acquire(timeout=Config.BCRYPT_QUEUE_TIMEOUT):
+            raise PasswordServiceBusy("Password hashing queue is full")
+        try:
+            return self._get_pool().submit(func, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password: str) -> str:
+        """Hash a password at the configured cost"""
+        return self._run(_hash_password, password.encode('utf-8'), self.rounds).decode('utf-8')
+
+    def verify(self, password: str, password_hash: str) -> bool:
+        """Check a password against a stored hash"""
+        return self._run(_check_password, password.encode('utf-8'), password_hash.encode('utf-8'))
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """Whether a stored hash was made with a different cost than configured"""
+        try:
+            return int(password_hash.split('$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def start_workers(self) -> None:
+        """Spawn every worker process now instead of on the first logins"""
+        if self.workers:
+            pool = self._get_pool()
+            for future in [pool.submit(_ready) for _ in range(self.workers)]:
+                future.result()
+
+    def shutdown(self) -> None:
+        """Stop the worker processes"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
@@ -0,0 +1,91 @@
+import cProfile
+import logging
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+from .config import Config
+from .metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = os.path.join('processed', 'profiles')
+
+# Held by the one sampled ingest capturing at a time: from Python 3.12 a
+# profiler is process-wide and enabling a second one raises ValueError
+_capture_lock = threading.Lock()
+
+def profile_sample_rate(db) -> float:
+    """Fraction of uploads to profile: the admin toggle if set, else INGEST_PROFILE_RATE"""
+    override = db.get_setting('ingest_profile_rate')
+    return float(override) if override is not None else Config.INGEST_PROFILE_RATE
+
+class IngestProfile:
+    """Stage timings for one ingest, plus a cProfile capture when sampled
+
+    Stage timings always feed the ingest_stage_seconds metric; only sampled
+    ingests keep a .prof file (pstats format, readable by snakeviz, pstats
+    or flameprof) and an ingest_profiles row next to the uploaded_files row.
+    """
+
+    def __init__(self, sample_rate: float = 0.0):
+        self.sampled = sample_rate > 0 and random.random() < sample_rate
+        self.stages: Dict[str, float] = {}
+        self._profiler = cProfile.Profile() if self.sampled else None
+        self._start = time.perf_counter()
+
+    def __enter__(self):
+        if self._profiler:
+            # Another ingest is being captured: keep the timings, skip the capture
+            if not _capture_lock.acquire(blocking=False):
+                self._unsample()
+            else:
+                try:
+                    self._profiler.enable()
+                except ValueError as e:
+                    # A profiler enabled outside this module holds the hook
+                    _capture_lock.release()
+                    self._unsample()
+                    logger.debug("Skipping ingest profile capture: %s", e)
+        return self
+
+    def __exit__(self, *exc):
+        if self._profiler:
+            self._profiler.disable()
+            _capture_lock.release()
+        self.total_ms = (time.perf_counter() - self._start) * 1000
+        return False
+
+    def _unsample(self) -> None:
+        self.sampled = False
+        self._profiler = None
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time one ingest stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.stages[name] = elapsed * 1000
+            Metrics().observe('ingest_stage_seconds', elapsed, stage=name)
+
+    def save(self, db, conn, file_id: int, checksum: str,
+             parser_stages: Optional[Dict[str, Any]] = None) -> None:
+        """Write the capture and its timings for a sampled ingest (commits)"""
+        if not self.sampled:
+            return
+        try:
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            profile_path = os.path.join(PROFILE_DIR, f"{file_id}_{checksum[:8]}.prof")
+            self._profiler.dump_stats(profile_path)
+            db.save_ingest_profile(conn, file_id, self.total_ms, self.stages,
+                                   parser_stages or {}, profile_path)
+            conn.commit()
+        except Exception as e:
+            # A lost profile must never fail an upload that already committed
+            conn.rollback()
+            logger.warning("Failed to store ingest profile for file %s: %s", file_id, e)
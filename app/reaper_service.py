@@ -0,0 +1,169 @@
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from .artifact_store import ARTIFACT_DIR
+from .config import Config
+from .database import Database
+from .file_service import FileService
+from .metrics import Metrics
+from .profiling import PROFILE_DIR
+from .s3_service import S3Service
+
+S3_DELETE_BATCH = 1000  # Most keys delete_objects accepts per request
+
+class _Throttle:
+    """Spaces batches so at most `rate` run per second"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = time.monotonic()
+
+    def wait(self) -> None:
+        now = time.monotonic()
+        if now < self._next:
+            time.sleep(self._next - now)
+        self._next = max(now, self._next) + self.interval
+
+
+class ReaperService:
+    """Delete S3 objects, processed/ artifacts and data rows nothing refers to anymore.
+
+    Runs outside the request path (see reap.py), deleting in throttled
+    batches so cleanup never competes with user traffic. Anything younger
+    than REAPER_GRACE_SECONDS is left alone, since an ingest writes its S3
+    object and artifacts before the uploaded_files row commits.
+    """
+
+    def __init__(self, batch_size: Optional[int] = None, rate: Optional[float] = None,
+                 grace_seconds: Optional[int] = None, dry_run: bool = False):
+        self.batch_size = batch_size or Config.REAPER_BATCH_SIZE
+        self.throttle = _Throttle(rate if rate is not None else Config.REAPER_BATCHES_PER_SECOND)
+        self.grace = timedelta(seconds=Config.REAPER_GRACE_SECONDS if grace_seconds is None else grace_seconds)
+        self.dry_run = dry_run
+        self.db = Database()
+        self.s3 = S3Service()
+
+    def _record(self, kind: str, count: int) -> None:
+        if count and not self.dry_run:
+            Metrics().inc('reaper_deleted_total', count, kind=kind)
+
+    def reap_s3(self) -> int:
+        """Delete objects under user_*/ that no uploaded_files row points to"""
+        if not self.s3.client:
+            return 0
+        referenced = self.db.get_referenced_s3_keys()
+        cutoff = datetime.now(timezone.utc) - self.grace
+        deleted = 0
+        batch: List[str] = []
+
+        def flush():
+            nonlocal deleted
+            self.throttle.wait()
+            count = len(batch) if self.dry_run else self.s3.delete_files(batch)
+            self._record('s3', count)
+            deleted += count
+            batch.clear()
+
+        for key, last_modified in self.s3.list_objects('user_'):
+            if key in referenced or last_modified > cutoff:
+                continue
+            batch.append(key)
+            if len(batch) >= min(self.batch_size, S3_DELETE_BATCH):
+                flush()
+        if batch:
+            flush()
+        return deleted
+
+    def _orphaned_artifacts(self) -> List[str]:
+        """Paths under processed/ that belong to no uploaded file"""
+        refs = self.db.get_artifact_references()
+        json_paths = {os.path.realpath(p) for p in refs['json_paths'] if p}
+        profiles = {os.path.realpath(p) for p in refs['profiles'] if p}
+        cutoff = time.time() - self.grace.total_seconds()
+
+        orphans = []
+        processed_dir = FileService.ensure_processed_dir()
+        entries = list(os.scandir(processed_dir))
+        if os.path.isdir(PROFILE_DIR):
+            entries += list(os.scandir(PROFILE_DIR))
+        for kind in ('original', 'output'):
+            for root, _, _ in os.walk(os.path.join(ARTIFACT_DIR, kind)):
+                entries += list(os.scandir(root))
+
+        for entry in entries:
+            if not entry.is_file() or entry.stat().st_mtime > cutoff:
+                continue
+            path = os.path.realpath(entry.path)
+            if entry.name.endswith('.zst'):
+                # Originals are addressed by checksum, outputs by their stored path
+                if os.path.basename(os.path.dirname(os.path.dirname(path))) == 'original':
+                    orphan = entry.name[:-len('.zst')] not in refs['checksums']
+                else:
+                    orphan = path not in json_paths
+            elif entry.name.endswith('.prof'):
+                orphan = path not in profiles
+            elif entry.name.endswith(('.ndjson', '.json')):
+                orphan = path not in json_paths
+            elif entry.name.endswith('.eu4'):
+                # The parser's copy of the original; backfills read it when S3 is off
+                orphan = entry.name not in refs['originals']
+            else:
+                continue
+            if orphan:
+                orphans.append(entry.path)
+        return orphans
+
+    def reap_artifacts(self) -> int:
+        """Delete parser outputs, original copies, stored artifacts and profiles no longer referenced"""
+        orphans = self._orphaned_artifacts()
+        if self.dry_run:
+            return len(orphans)
+        deleted = 0
+        for start in range(0, len(orphans), self.batch_size):
+            self.throttle.wait()
+            count = 0
+            for path in orphans[start:start + self.batch_size]:
+                try:
+                    os.remove(path)
+                    count += 1
+                except FileNotFoundError:
+                    pass
+            self._record('artifact', count)
+            deleted += count
+        return deleted
+
+    def reap_rows(self) -> Dict[str, int]:
+        """Delete data rows whose checksum has no uploaded_files row, per table
+
+        A dry run counts orphaned checksums instead of rows.
+        """
+        deleted = {}
+        for table in Database.CHECKSUM_TABLES:
+            if self.dry_run:
+                deleted[table] = len(self.db.get_orphaned_checksums(table, limit=self.batch_size))
+                continue
+            deleted[table] = 0
+            # Re-scanned after every batch, so finished checksums drop out
+            while True:
+                checksums = self.db.get_orphaned_checksums(table, limit=100)
+                if not checksums:
+                    break
+                self.throttle.wait()
+                count = self.db.delete_orphaned_rows(table, checksums, self.batch_size)
+                self._record(table, count)
+                deleted[table] += count
+                if not count:
+                    break  # Re-uploaded since the scan
+        return deleted
+
+    def run(self) -> Dict[str, Any]:
+        """One full pass over S3, processed/ and the data tables; returns run statistics"""
+        started = time.perf_counter()
+        stats = {
+            's3_objects': self.reap_s3(),
+            'artifacts': self.reap_artifacts(),
+            'rows': self.reap_rows(),
+        }
+        stats['seconds'] = time.perf_counter() - started
+        return stats
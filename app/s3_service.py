@@ -1,9 +1,14 @@
 import os
-import boto3
-from botocore.exceptions import ClientError
 from .config import Config
-from typing import Optional
+from .metrics import Metrics
+from typing import Iterator, List, Optional, Tuple
 import uuid
+from datetime import datetime
+
+# boto3/botocore take a noticeable share of app start-up, so they are
+# imported with the first client; the methods below only catch ClientError
+# once a client exists.
+ClientError = None
 
 class S3Service:
     _instance = None
@@ -15,11 +20,14 @@ class S3Service:
         return cls._instance
     
     def _init_client(self):
+        global ClientError
         if not Config.S3_ENABLED:
             self.client = None
             return
             
         try:
+            import boto3
+            from botocore.exceptions import ClientError
             session = boto3.session.Session()
             client_config = {
                 'region_name': Config.S3_REGION,
@@ -49,16 +57,36 @@ class S3Service:
             file_name = os.path.basename(file_path)
             object_key = f"user_{user_id}/{uuid.uuid4().hex}_{file_name}"
             
-            self.client.upload_file(
-                Filename=file_path,
-                Bucket=Config.S3_BUCKET,
-                Key=object_key
-            )
+            with Metrics().timer('s3_transfer_seconds', operation='upload'):
+                self.client.upload_file(
+                    Filename=file_path,
+                    Bucket=Config.S3_BUCKET,
+                    Key=object_key
+                )
+            Metrics().inc('s3_transfer_bytes_total', os.path.getsize(file_path), operation='upload')
             return object_key
         except ClientError as e:
             print(f"Error uploading file to S3: {e}")
             return None
     
+    def download_file(self, object_key: str, dest_path: str) -> bool:
+        """Stream an object from S3 to a local file"""
+        if not self.client or not object_key:
+            return False
+            
+        try:
+            with Metrics().timer('s3_transfer_seconds', operation='download'):
+                self.client.download_file(
+                    Bucket=Config.S3_BUCKET,
+                    Key=object_key,
+                    Filename=dest_path
+                )
+            Metrics().inc('s3_transfer_bytes_total', os.path.getsize(dest_path), operation='download')
+            return True
+        except ClientError as e:
+            print(f"Error downloading file from S3: {e}")
+            return False
+    
     def get_file_url(self, object_key: str, expires_in: int = 3600) -> Optional[str]:
         """Generate a presigned URL for the file"""
         if not self.client or not object_key:
@@ -80,11 +108,40 @@ class S3Service:
             return False
             
         try:
-            self.client.delete_object(
-                Bucket=Config.S3_BUCKET,
-                Key=object_key
-            )
+            with Metrics().timer('s3_transfer_seconds', operation='delete'):
+                self.client.delete_object(
+                    Bucket=Config.S3_BUCKET,
+                    Key=object_key
+                )
             return True
         except ClientError as e:
             print(f"Error deleting file from S3: {e}")
-            return False
\ No newline at end of file
+            return False
+
+    def list_objects(self, prefix: str = 'user_') -> Iterator[Tuple[str, datetime]]:
+        """Yield (key, last_modified) for every object under a prefix, a page at a time"""
+        if not self.client:
+            return
+        paginator = self.client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=Config.S3_BUCKET, Prefix=prefix):
+            for obj in page.get('Contents', []):
+                yield obj['Key'], obj['LastModified']
+
+    def delete_files(self, object_keys: List[str]) -> int:
+        """Delete up to 1000 objects in one request and return how many were deleted"""
+        if not self.client or not object_keys:
+            return 0
+
+        try:
+            with Metrics().timer('s3_transfer_seconds', operation='delete_batch'):
+                response = self.client.delete_objects(
+                    Bucket=Config.S3_BUCKET,
+                    Delete={'Objects': [{'Key': key} for key in object_keys], 'Quiet': True}
+                )
+            # Quiet mode only reports failures
+            for error in response.get('Errors', []):
+                print(f"Error deleting {error.get('Key')} from S3: {error.get('Message')}")
+            return len(object_keys) - len(response.get('Errors', []))
+        except ClientError as e:
+            print(f"Error deleting files from S3: {e}")
+            return 0
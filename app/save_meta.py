@@ -0,0 +1,73 @@
+import re
+import time
+import zipfile
+from typing import Any, Dict
+from .metrics import Metrics
+
+# Meta fields sit at the top of a text save; never read further than this
+META_SCAN_BYTES = 1 << 20
+
+TEXT_MAGIC = b'EU4txt'
+BINARY_MAGIC = b'EU4bin'
+ZIP_MAGIC = b'PK\x03\x04'
+
+_DATE = re.compile(r'^date=(\d+\.\d+\.\d+)', re.M)
+_PLAYER = re.compile(r'^player="([^"]*)"', re.M)
+_COUNTRY_NAME = re.compile(r'^displayed_country_name="([^"]*)"', re.M)
+_VERSION = re.compile(r'^savegame_version=\{\s*first=(\d+)\s*second=(\d+)\s*third=(\d+)\s*forth=(\d+)', re.M)
+_MULTIPLAYER = re.compile(r'^multi_player=yes', re.M)
+_PLAYERS = re.compile(r'^players_countries=\{([^}]*)\}', re.M)
+
+class InvalidSave(ValueError):
+    """Raised for uploads the parser cannot read, with a message for the user"""
+
+def _check_compressed(path: str) -> None:
+    """Explain why a zipped save is rejected, telling Ironman saves apart"""
+    try:
+        with zipfile.ZipFile(path) as archive, archive.open('meta') as meta:
+            head = meta.read(len(BINARY_MAGIC))
+    except (zipfile.BadZipFile, KeyError, OSError):
+        raise InvalidSave("This file is not an EU4 save.") from None
+    if head == BINARY_MAGIC:
+        raise InvalidSave("Ironman saves are not supported. Upload a non-Ironman save.")
+    raise InvalidSave("This save is compressed. Untick \"Compress saves\" in EU4's settings, "
+                      "save the game again and upload the new file.")
+
+def read_save_meta(path: str) -> Dict[str, Any]:
+    """Validate a save from its header and return its meta block
+
+    Reads at most META_SCAN_BYTES, so it answers in milliseconds however big
+    the save is. Raises InvalidSave for compressed and Ironman saves and for
+    files that are not EU4 saves at all.
+    """
+    start = time.perf_counter()
+    with open(path, 'rb') as f:
+        head = f.read(META_SCAN_BYTES)
+    if head.startswith(ZIP_MAGIC):
+        _check_compressed(path)
+    if head.startswith(BINARY_MAGIC):
+        raise InvalidSave("Ironman saves are not supported. Upload a non-Ironman save.")
+    if not head.startswith(TEXT_MAGIC):
+        raise InvalidSave("This file is not an EU4 save.")
+
+    text = head.decode('cp1252', errors='replace')  # EU4 writes text saves in Windows-1252
+    date = _DATE.search(text)
+    if not date:
+        raise InvalidSave("This save is incomplete or damaged: it has no game date.")
+    player = _PLAYER.search(text)
+    country_name = _COUNTRY_NAME.search(text)
+    version = _VERSION.search(text)
+    players = _PLAYERS.search(text)
+    multiplayer = bool(_MULTIPLAYER.search(text))
+
+    meta = {
+        'player': player.group(1) if player and player.group(1) else None,
+        'country_name': country_name.group(1) if country_name else None,
+        'date': date.group(1),
+        'version': '.'.join(version.groups()) if version else None,
+        'multiplayer': multiplayer,
+        # players_countries alternates player name and country tag
+        'player_count': len(re.findall(r'"[^"]*"', players.group(1))) // 2 if players else (None if multiplayer else 1),
+    }
+    Metrics().observe('save_meta_seconds', time.perf_counter() - start)
+    return meta
@@ -0,0 +1,266 @@
+"""Schema for the SQLite backend
+
+Mirrors the MySQL tables in Database._create_tables, including every index
+the queries rely on. Prefix indexes on TEXT columns become full-column
+indexes, ENUMs become CHECK constraints and AUTO_INCREMENT becomes
+AUTOINCREMENT so ids are never reused, as with InnoDB.
+"""
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username VARCHAR(255) NOT NULL UNIQUE,
+    email VARCHAR(255) NOT NULL UNIQUE,
+    password_hash VARCHAR(255) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS uploaded_files (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    original_filename VARCHAR(255) NOT NULL,
+    checksum VARCHAR(64) NOT NULL,
+    json_path TEXT NOT NULL,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    s3_key VARCHAR(512),
+    processed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_uploaded_files_checksum ON uploaded_files (checksum, user_id);
+CREATE INDEX IF NOT EXISTS idx_uploaded_files_user ON uploaded_files (user_id, processed_at);
+
+CREATE TABLE IF NOT EXISTS current_state (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    file_checksum TEXT NOT NULL,
+    country_tag TEXT NOT NULL,
+    date TEXT NOT NULL,
+    income TEXT NOT NULL,
+    manpower REAL NOT NULL,
+    max_manpower REAL NOT NULL,
+    trade_income REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_current_state_file ON current_state (file_checksum, country_tag);
+
+CREATE TABLE IF NOT EXISTS historical_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    file_checksum TEXT NOT NULL,
+    country_tag TEXT NOT NULL,
+    date TEXT NOT NULL,
+    event_type TEXT NOT NULL,
+    details TEXT NOT NULL,
+    campaign_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_historical_events_file ON historical_events (file_checksum, country_tag);
+CREATE INDEX IF NOT EXISTS idx_historical_events_campaign ON historical_events (campaign_id, file_checksum);
+
+CREATE TABLE IF NOT EXISTS event_payloads (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    file_checksum VARCHAR(64) NOT NULL,
+    country_tag VARCHAR(8) NOT NULL,
+    date VARCHAR(16) NOT NULL,
+    event_type VARCHAR(64) NOT NULL,
+    name VARCHAR(255),
+    adm SMALLINT,
+    dip SMALLINT,
+    mil SMALLINT,
+    payload TEXT,
+    campaign_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_event_payloads_file ON event_payloads (file_checksum, country_tag);
+CREATE INDEX IF NOT EXISTS idx_event_payloads_campaign ON event_payloads (campaign_id, file_checksum);
+CREATE INDEX IF NOT EXISTS idx_event_payloads_type ON event_payloads (event_type, file_checksum);
+
+CREATE TABLE IF NOT EXISTS country_map_colors (
+    file_checksum VARCHAR(64) NOT NULL,
+    country_tag VARCHAR(8) NOT NULL,
+    r INTEGER NOT NULL,
+    g INTEGER NOT NULL,
+    b INTEGER NOT NULL,
+    PRIMARY KEY (file_checksum, country_tag)
+);
+
+CREATE TABLE IF NOT EXISTS annual_income (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    file_checksum TEXT NOT NULL,
+    country_tag TEXT NOT NULL,
+    year TEXT NOT NULL,
+    income REAL NOT NULL,
+    campaign_id INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_annual_income_file ON annual_income (file_checksum, country_tag);
+CREATE INDEX IF NOT EXISTS idx_annual_income_campaign ON annual_income (campaign_id, file_checksum);
+
+CREATE TABLE IF NOT EXISTS campaigns (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    campaign_key VARCHAR(64) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (user_id, campaign_key)
+);
+
+CREATE TABLE IF NOT EXISTS campaign_files (
+    campaign_id INTEGER NOT NULL REFERENCES campaigns(id) ON DELETE CASCADE,
+    file_checksum VARCHAR(64) NOT NULL,
+    seq INTEGER NOT NULL,
+    game_date VARCHAR(16) NOT NULL,
+    PRIMARY KEY (campaign_id, seq),
+    UNIQUE (campaign_id, file_checksum)
+);
+CREATE INDEX IF NOT EXISTS idx_campaign_files_checksum ON campaign_files (file_checksum);
+
+CREATE TABLE IF NOT EXISTS leaderboard_stats (
+    user_id INTEGER NOT NULL,
+    country_tag VARCHAR(8) NOT NULL,
+    plays INTEGER NOT NULL DEFAULT 0,
+    peak_income REAL NOT NULL DEFAULT 0,
+    first_year_over_threshold INTEGER,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, country_tag)
+);
+CREATE INDEX IF NOT EXISTS idx_leaderboard_first_year ON leaderboard_stats (first_year_over_threshold);
+CREATE INDEX IF NOT EXISTS idx_leaderboard_peak ON leaderboard_stats (peak_income);
+
+CREATE TABLE IF NOT EXISTS file_extractions (
+    file_id INTEGER NOT NULL REFERENCES uploaded_files(id) ON DELETE CASCADE,
+    extractor VARCHAR(64) NOT NULL,
+    version INTEGER NOT NULL,
+    extracted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (file_id, extractor)
+);
+
+CREATE TABLE IF NOT EXISTS ingest_profiles (
+    file_id INTEGER PRIMARY KEY REFERENCES uploaded_files(id) ON DELETE CASCADE,
+    total_ms REAL NOT NULL,
+    stages TEXT NOT NULL,
+    parser_stages TEXT NOT NULL,
+    profile_path VARCHAR(512) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_ingest_profiles_recent ON ingest_profiles (created_at, total_ms);
+
+CREATE TABLE IF NOT EXISTS app_settings (
+    name VARCHAR(64) PRIMARY KEY,
+    value VARCHAR(255),
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS cache_generations (
+    scope VARCHAR(128) PRIMARY KEY,
+    generation INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS backfill_checkpoints (
+    job VARCHAR(64) PRIMARY KEY,
+    last_file_id INTEGER NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS import_checkpoints (
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    source_hash CHAR(64) NOT NULL,
+    source VARCHAR(1024) NOT NULL,
+    sources_done INTEGER NOT NULL,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, source_hash)
+);
+
+CREATE TABLE IF NOT EXISTS ingest_jobs (
+    id CHAR(32) PRIMARY KEY,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    filename VARCHAR(255) NOT NULL,
+    meta TEXT NOT NULL,
+    state TEXT NOT NULL CHECK (state IN ('queued', 'processing', 'done', 'failed')),
+    checksum VARCHAR(64),
+    error TEXT,
+    worker VARCHAR(255) NOT NULL,
+    submitted_at REAL NOT NULL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_ingest_jobs_user ON ingest_jobs (user_id, submitted_at);
+CREATE INDEX IF NOT EXISTS idx_ingest_jobs_finished ON ingest_jobs (finished_at);
+
+CREATE TABLE IF NOT EXISTS user_friends (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    friend_id INTEGER NOT NULL REFERENCES users(id),
+    status TEXT NOT NULL CHECK (status IN ('pending', 'accepted')),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (user_id, friend_id)
+);
+CREATE INDEX IF NOT EXISTS idx_user_friends_recipient ON user_friends (friend_id, status);
+
+CREATE TABLE IF NOT EXISTS friendships (
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    friend_id INTEGER NOT NULL REFERENCES users(id),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, friend_id)
+);
+
+CREATE TABLE IF NOT EXISTS user_file_permissions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    file_id INTEGER NOT NULL REFERENCES uploaded_files(id),
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    permission_type TEXT NOT NULL CHECK (permission_type IN ('owner', 'shared')),
+    UNIQUE (file_id, user_id)
+);
+CREATE INDEX IF NOT EXISTS idx_permissions_user_file ON user_file_permissions (user_id, file_id);
+
+CREATE TABLE IF NOT EXISTS file_friend_shares (
+    file_id INTEGER PRIMARY KEY REFERENCES uploaded_files(id) ON DELETE CASCADE,
+    owner_id INTEGER NOT NULL REFERENCES users(id),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_file_friend_shares_owner ON file_friend_shares (owner_id);
+
+CREATE TABLE IF NOT EXISTS topics (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title VARCHAR(255) NOT NULL,
+    content TEXT NOT NULL,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS posts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    content TEXT NOT NULL,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    topic_id INTEGER NOT NULL REFERENCES topics(id) ON DELETE CASCADE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- SQLite has no ON UPDATE CURRENT_TIMESTAMP
+CREATE TRIGGER IF NOT EXISTS trg_leaderboard_stats_updated AFTER UPDATE OF plays, peak_income, first_year_over_threshold ON leaderboard_stats
+BEGIN
+    UPDATE leaderboard_stats SET updated_at = CURRENT_TIMESTAMP
+    WHERE user_id = NEW.user_id AND country_tag = NEW.country_tag;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_file_extractions_updated AFTER UPDATE OF version ON file_extractions
+BEGIN
+    UPDATE file_extractions SET extracted_at = CURRENT_TIMESTAMP
+    WHERE file_id = NEW.file_id AND extractor = NEW.extractor;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_app_settings_updated AFTER UPDATE OF value ON app_settings
+BEGIN
+    UPDATE app_settings SET updated_at = CURRENT_TIMESTAMP WHERE name = NEW.name;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_backfill_checkpoints_updated AFTER UPDATE OF last_file_id ON backfill_checkpoints
+BEGIN
+    UPDATE backfill_checkpoints SET updated_at = CURRENT_TIMESTAMP WHERE job = NEW.job;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_import_checkpoints_updated AFTER UPDATE OF sources_done ON import_checkpoints
+BEGIN
+    UPDATE import_checkpoints SET updated_at = CURRENT_TIMESTAMP
+    WHERE user_id = NEW.user_id AND source_hash = NEW.source_hash;
+END;
+"""
+
+# (table, column, column DDL, backfill statement) for columns added to
+# tables that existing databases already have
+ADDED_COLUMNS = [
+    (table, 'campaign_id', 'campaign_id INTEGER', f"""
+        UPDATE {table} SET campaign_id = (
+            SELECT cf.campaign_id FROM campaign_files cf
+            WHERE cf.file_checksum = {table}.file_checksum
+            LIMIT 1
+        )
+    """)
+    for table in ('historical_events', 'event_payloads', 'annual_income')
+]
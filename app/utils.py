@@ -1,7 +1,6 @@
 import mysql.connector
 from app.config import Config
 import subprocess
-import random
 
 def get_db_connection():
     try:
@@ -51,21 +50,3 @@ def initialize_database():
         print(f"Error initializing database schema: {e.stderr}")
     except mysql.connector.Error as err:
         print(f"Error connecting to MySQL: {err}")
-
-def parse_country_colors(file_path):
-    country_colors = {}
-    with open(file_path, 'r') as file:
-        for line in file:
-            if '=' in line:
-                tag, color = line.split('=')
-                tag = tag.strip()
-                color = tuple(map(int, color.strip().split()))
-                country_colors[tag] = color
-    return country_colors
-
-# Load country colors from the generated file
-COUNTRY_COLORS = parse_country_colors('country_colors.txt')
-
-def get_country_color(country_tag):
-    return COUNTRY_COLORS.get(country_tag, 
-        (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255)))
\ No newline at end of file
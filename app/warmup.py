@@ -0,0 +1,82 @@
+import logging
+import os
+import threading
+import time
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+_warmed_pid = None
+_warm_lock = threading.Lock()
+
+def warm_up() -> dict:
+    """Prepare this process for traffic and return how long each step took
+
+    Meant to run after the server forks its workers (pools and sockets must
+    not be shared across a fork), e.g. from gunicorn's post_worker_init hook:
+
+        def post_worker_init(worker):
+            from app.warmup import warm_up
+            warm_up()
+
+    Every step is best effort: a failure is logged and the lazy path
+    retries on first real use.
+    """
+    global _warmed_pid
+    _warmed_pid = os.getpid()
+    timings = {}
+
+    def step(name, func):
+        start = time.perf_counter()
+        try:
+            func()
+        except Exception as e:
+            logger.warning("Warm-up step %s failed: %s", name, e)
+        timings[name] = time.perf_counter() - start
+
+    def database():
+        from .database import Database
+        db = Database()  # Creates the schema on first use in this process
+        db._get_connection().close()  # Opens the connection pool
+
+    def password_workers():
+        from .password_service import PasswordService
+        PasswordService().start_workers()
+
+    def plotting():
+        from .main.routes import load_pyplot
+        load_pyplot()
+
+    def s3():
+        from .s3_service import S3Service
+        S3Service()
+
+    def country_colors():
+        from . import country_colors
+
+    step('database', database)
+    step('country_colors', country_colors)
+    step('password_workers', password_workers)
+    step('plotting', plotting)
+    step('s3', s3)
+    logger.info("Warm-up finished: %s", ', '.join(f"{k}={v * 1000:.0f}ms" for k, v in timings.items()))
+    return timings
+
+def init_app(app):
+    """Warm up each worker in the background when it serves its first request
+
+    Covers servers without a post-fork hook; warm_up() is idempotent per process.
+    """
+    if not Config.WARMUP_ENABLED:
+        return
+
+    @app.before_request
+    def _warm_up_worker():
+        global _warmed_pid
+        if _warmed_pid == os.getpid():
+            return
+        with _warm_lock:
+            if _warmed_pid == os.getpid():
+                return
+            _warmed_pid = os.getpid()
+        threading.Thread(target=warm_up, name='warm-up', daemon=True).start()
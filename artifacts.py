@@ -0,0 +1,65 @@
+import argparse
+import glob
+import os
+import random
+import time
+from dotenv import load_dotenv
+from pathlib import Path
+
+load_dotenv(Path(__file__).parent / '.env')
+
+from app.artifact_store import ARTIFACT_DIR, ArtifactStore
+from app.parser_output import load_output
+
+def percentile(sorted_values, q):
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))] if sorted_values else 0.0
+
+def output_paths():
+    return glob.glob(os.path.join(ARTIFACT_DIR, 'output', '*', '*.zst'))
+
+def train(args):
+    store = ArtifactStore()
+    paths = output_paths() + glob.glob(os.path.join('processed', '*.json')) + glob.glob(os.path.join('processed', '*.ndjson'))
+    random.shuffle(paths)
+    samples = []
+    for path in paths[:args.samples]:
+        with store.open(path) as f:
+            samples.append(f.read())
+    if not samples:
+        raise SystemExit('No parser outputs to train on')
+    dict_id = store.train_dictionary(samples, args.size)
+    print(f"Trained dictionary {dict_id} ({args.size // 1024} KiB) on {len(samples)} outputs; "
+          f"new outputs are compressed with it")
+
+def stats(args):
+    for kind, totals in ArtifactStore().stats().items():
+        ratio = totals['raw_bytes'] / totals['stored_bytes'] if totals['stored_bytes'] else 0.0
+        saved = totals['raw_bytes'] - totals['stored_bytes']
+        print(f"{kind:<9} {totals['artifacts']:>7} artifacts  {totals['raw_bytes'] / 1e6:>10.1f} MB raw  "
+              f"{totals['stored_bytes'] / 1e6:>9.1f} MB stored  {ratio:>5.1f}x  {saved / 1e6:>9.1f} MB saved")
+
+    # Read latency: decompress and parse a sample of outputs, as the app does
+    store = ArtifactStore()
+    paths = output_paths()
+    random.shuffle(paths)
+    latencies = []
+    for path in paths[:args.reads]:
+        start = time.perf_counter()
+        load_output(path)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    if latencies:
+        print(f"output reads: n={len(latencies)} p50={percentile(latencies, 0.5) * 1000:.1f}ms "
+              f"p95={percentile(latencies, 0.95) * 1000:.1f}ms max={latencies[-1] * 1000:.1f}ms")
+
+parser = argparse.ArgumentParser(description='Manage the compressed artifact store')
+subparsers = parser.add_subparsers(dest='command', required=True)
+train_parser = subparsers.add_parser('train', help='Train the zstd dictionary used for parser outputs')
+train_parser.add_argument('--samples', type=int, default=200, help='Outputs to train on')
+train_parser.add_argument('--size', type=int, default=112 * 1024, help='Dictionary size in bytes')
+train_parser.set_defaults(func=train)
+stats_parser = subparsers.add_parser('stats', help='Report storage savings and read latency')
+stats_parser.add_argument('--reads', type=int, default=50, help='Outputs to time reading')
+stats_parser.set_defaults(func=stats)
+args = parser.parse_args()
+args.func(args)
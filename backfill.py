@@ -0,0 +1,25 @@
+import argparse
+from dotenv import load_dotenv
+from pathlib import Path
+
+load_dotenv(Path(__file__).parent / '.env')
+
+from app.backfill_service import BackfillService
+from app.extractors import current_extractor_versions
+
+parser = argparse.ArgumentParser(description='Run new extractors over stored original saves')
+parser.add_argument('--extractor', action='append', dest='extractors',
+                    help='Extractor to backfill (repeatable, default: all). '
+                         f'Available: {", ".join(current_extractor_versions())}')
+parser.add_argument('--workers', type=int, help='Concurrent parses (default: BACKFILL_WORKERS)')
+parser.add_argument('--batch-size', type=int, default=20, help='Files per write transaction')
+parser.add_argument('--limit', type=int, help='Stop after this many files')
+parser.add_argument('--job', default='backfill', help='Checkpoint name used to resume')
+parser.add_argument('--restart', action='store_true', help='Ignore the saved checkpoint')
+args = parser.parse_args()
+
+service = BackfillService(job=args.job, workers=args.workers, batch_size=args.batch_size)
+stats = service.run(extractors=args.extractors, restart=args.restart, limit=args.limit)
+
+print(f"Backfill complete: {stats['processed']} files processed, {stats['failed']} failed "
+      f"in {stats['seconds']:.1f}s ({stats['files_per_second']:.2f} files/s)")
@@ -0,0 +1,73 @@
+"""Ingest memory benchmark
+
+Feeds synthetic parser outputs of growing size through
+FileService.process_file, each in a fresh interpreter against a scratch
+SQLite database, and reports the peak RSS the ingest added. NDJSON output
+is streamed a country at a time and should stay flat; the older
+single-document JSON is loaded whole and grows with the output.
+
+    python -m benchmarks.ingest_memory --scales 1,4,16
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+INGEST_SCRIPT = """
+import os, sys
+from benchmarks.synthetic_saves import write_synthetic_output
+from app.database import Database
+from app.file_service import FileService
+
+fmt, events, work_dir = sys.argv[1], int(sys.argv[2]), sys.argv[3]
+output_path = os.path.join(work_dir, 'output.' + fmt)
+write_synthetic_output(output_path, f'memory-{events}', ndjson=fmt == 'ndjson',
+                       countries=20, events_per_country=events, end_year=1821)
+FileService.run_parser = staticmethod(lambda file_path, user_id, checksum=None: output_path)
+save_path = os.path.join(work_dir, 'memory.eu4')
+open(save_path, 'w').write('x')
+user_id = Database().create_user('memory', 'memory@example.com', 'x')
+
+def rss_kb(field):
+    with open('/proc/self/status') as f:
+        return next(int(line.split()[1]) for line in f if line.startswith(field))
+
+before = rss_kb('VmRSS:')
+with open('/proc/self/clear_refs', 'w') as f:
+    f.write('5')  # Reset VmHWM so the peak covers only the ingest
+FileService.process_file(save_path, user_id)
+print(os.path.getsize(output_path), rss_kb('VmHWM:') - before)
+"""
+
+def measure(fmt, events):
+    """Output size in bytes and peak RSS added by one ingest, in KiB"""
+    with tempfile.TemporaryDirectory(prefix='eu4_ingest_memory_') as work_dir:
+        env = dict(os.environ, DB_BACKEND='sqlite', SQLITE_PATH=os.path.join(work_dir, 'bench.sqlite3'),
+                   ARTIFACT_STORE_ENABLED='false', S3_ENABLED='false', BCRYPT_WORKERS='0',
+                   INGEST_PROFILE_RATE='0')
+        result = subprocess.run([sys.executable, '-c', INGEST_SCRIPT, fmt, str(events), work_dir],
+                                cwd=work_dir, env={**env, 'PYTHONPATH': PROJECT_ROOT},
+                                capture_output=True, text=True, check=True)
+        size, peak_kb = result.stdout.strip().splitlines()[-1].split()
+        return int(size), int(peak_kb)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', default='1,4,16', help='Output sizes, as multiples of the base save')
+    parser.add_argument('--events', type=int, default=250, help='Events per country at scale 1')
+    args = parser.parse_args()
+
+    if not os.path.exists('/proc/self/clear_refs'):
+        parser.error('needs Linux /proc to read peak RSS')
+
+    print(f"{'scale':>5} {'format':<7} {'output MB':>10} {'peak RSS added MB':>18}")
+    for scale in (int(s) for s in args.scales.split(',')):
+        for fmt in ('json', 'ndjson'):
+            size, peak_kb = measure(fmt, args.events * scale)
+            print(f"{scale:>5} {fmt:<7} {size / 1e6:>10.1f} {peak_kb / 1024:>18.1f}")
+
+if __name__ == '__main__':
+    main()
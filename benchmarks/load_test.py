@@ -0,0 +1,353 @@
+"""Load test for the web tier
+
+Seeds a throwaway MySQL database with synthetic users, friendships, saves
+and forum content, serves the app on a local threaded server with S3 and
+the Rust parser stubbed out, then drives a weighted mix of index,
+file_details, upload, share and forum traffic from concurrent virtual
+users and reports latency percentiles and throughput per route.
+
+    python -m benchmarks.load_test --users 50 --concurrency 20 --duration 60
+
+The database named by --db-name (default eu4stats_loadtest) is created on
+the MySQL server from .env and dropped afterwards unless --keep-data. With
+--backend sqlite it is a <db-name>.sqlite3 file in the working directory
+instead, deleted the same way.
+"""
+import argparse
+import http.cookiejar
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+from collections import defaultdict
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+load_dotenv(PROJECT_ROOT / '.env')
+
+from app.config import Config
+
+DEFAULT_MIX = 'index=35,file_details=25,file_api=10,forum=10,topic=8,post=4,share=4,upload=4'
+PASSWORD = 'loadtest-password'
+
+
+class StubS3Client:
+    """In-memory stand-in for the boto3 client calls S3Service makes"""
+
+    def __init__(self):
+        self.objects = {}
+        self._lock = threading.Lock()
+
+    def upload_file(self, Filename, Bucket, Key):
+        with open(Filename, 'rb') as f, self._lock:
+            self.objects[Key] = f.read()
+
+    def download_file(self, Bucket, Key, Filename):
+        with open(Filename, 'wb') as f:
+            f.write(self.objects[Key])
+
+    def delete_object(self, Bucket, Key):
+        with self._lock:
+            self.objects.pop(Key, None)
+
+    def generate_presigned_url(self, operation, Params, ExpiresIn):
+        return f"https://s3.invalid/{Params['Key']}"
+
+
+def fake_save(seed, campaign):
+    """A file that passes upload validation and tells the stub parser what to generate"""
+    return f'EU4txt\ndate=1444.11.11\nplayer="FRA"\nmulti_player=yes\n{seed}|{campaign}'
+
+
+def install_stubs(processed_dir):
+    """Replace S3 with StubS3Client and the parser binary with synthetic output"""
+    from app import s3_service
+    from app.file_service import FileService
+    from benchmarks.synthetic_saves import write_synthetic_output
+
+    class StubClientError(Exception):
+        pass
+
+    s3 = object.__new__(s3_service.S3Service)
+    s3.client = StubS3Client()
+    s3_service.S3Service._instance = s3
+    s3_service.ClientError = StubClientError
+
+    def run_parser(file_path, user_id, checksum=None):
+        # The fake .eu4 file holds the synthetic seed and campaign after its header
+        seed, campaign = Path(file_path).read_text().splitlines()[-1].split('|')
+        output_path = os.path.join(processed_dir, f"{Path(file_path).stem}_{uuid.uuid4().hex[:8]}.ndjson")
+        write_synthetic_output(output_path, seed, ndjson=True, campaign_id=campaign, user_id=user_id)
+        return output_path
+
+    FileService.run_parser = staticmethod(run_parser)
+
+
+def seed_data(args, run_id, upload_dir):
+    """Create users, friendships, saves and forum content; return what traffic needs"""
+    from app.database import Database
+    from app.file_service import FileService
+    from app.password_service import PasswordService
+
+    db = Database()
+    password_hash = PasswordService().hash(PASSWORD)
+    rng = random.Random(run_id)
+
+    users = []
+    for i in range(args.users):
+        username = f"lt{run_id}_{i}"
+        users.append({'id': db.create_user(username, f"{username}@loadtest.invalid", password_hash),
+                      'username': username, 'files': [], 'friends': set(), 'shared': False})
+
+    for user in users:
+        for friend in rng.sample(users, min(args.friends, len(users) - 1)):
+            if friend['id'] != user['id'] and db.create_friend_request(user['id'], friend['id']):
+                db.accept_friend_request(friend['id'], user['id'])
+                user['friends'].add(friend['id'])
+                friend['friends'].add(user['id'])
+
+    for user in users:
+        campaign = f"{run_id}-{user['id']}"
+        for j in range(args.files):
+            path = os.path.join(upload_dir, f"lt{run_id}_{user['id']}_{j}.eu4")
+            Path(path).write_text(fake_save(f"{run_id}-{user['id']}-{j}", campaign))
+            result = FileService.process_file(path, user['id'])
+            user['files'].append(result['checksum'])
+        if user['files'] and rng.random() < 0.5:
+            file_data = db.get_file_by_checksum(user['files'][0], user['id'])
+            db.share_file_with_friends(file_data['id'], user['id'])
+            user['shared'] = True
+
+    topics = []
+    for i in range(args.topics):
+        author = rng.choice(users)
+        topic_id = db.create_topic(f"Load test topic {i}", "Opening post", author['id'])
+        for _ in range(args.posts):
+            db.add_post("Synthetic reply " * rng.randint(1, 20), rng.choice(users)['id'], topic_id)
+        topics.append(topic_id)
+
+    return users, topics
+
+
+class VirtualUser:
+    """A logged-in browser session driving one route at a time"""
+
+    def __init__(self, base_url, user, users, topics, rng):
+        self.base_url = base_url
+        self.user = user
+        self.users = users
+        self.topics = topics
+        self.rng = rng
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar())
+        )
+
+    def request(self, path, data=None, headers=None):
+        req = urllib.request.Request(self.base_url + path, data=data, headers=headers or {})
+        try:
+            with self.opener.open(req, timeout=120) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+    def post_form(self, path, fields):
+        return self.request(path, urllib.parse.urlencode(fields).encode('utf-8'))
+
+    def login(self):
+        return self.post_form('/login', {'username': self.user['username'], 'password': PASSWORD})
+
+    def visible_file(self):
+        friend_files = [c for u in self.users if u['shared'] and u['id'] in self.user['friends']
+                        for c in u['files'][:1]]
+        own = self.user['files']
+        return self.rng.choice(own) if own and (not friend_files or self.rng.random() < 0.7) \
+            else self.rng.choice(friend_files)
+
+    def run(self, scenario):
+        if scenario == 'index':
+            return self.request('/')
+        if scenario == 'file_details':
+            return self.request(f"/file/{self.visible_file()}")
+        if scenario == 'file_api':
+            return self.request(f"/api/file/{self.visible_file()}/income")
+        if scenario == 'forum':
+            return self.request('/forum/forum')
+        if scenario == 'topic':
+            return self.request(f"/forum/forum/topic/{self.rng.choice(self.topics)}")
+        if scenario == 'post':
+            return self.post_form(f"/forum/forum/topic/{self.rng.choice(self.topics)}/add_post",
+                                  {'content': 'Load test reply'})
+        if scenario == 'share':
+            if not self.user['files']:
+                return self.request('/')
+            friend = self.rng.choice(self.users)
+            return self.post_form(f"/share_file/{self.rng.choice(self.user['files'])}",
+                                  {'friend_username': friend['username']})
+        if scenario == 'upload':
+            return self.upload()
+        raise ValueError(f"Unknown scenario {scenario}")
+
+    def upload(self):
+        name = f"lt_{self.user['id']}_{uuid.uuid4().hex[:8]}.eu4"
+        content = fake_save(name, f"{self.user['id']}-live").encode('utf-8')
+        boundary = uuid.uuid4().hex
+        body = (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="file"; filename="{name}"\r\n'
+            f"Content-Type: application/octet-stream\r\n\r\n"
+        ).encode('utf-8') + content + f"\r\n--{boundary}--\r\n".encode('utf-8')
+        return self.request('/upload', body, {'Content-Type': f"multipart/form-data; boundary={boundary}"})
+
+
+def parse_mix(mix):
+    weights = {}
+    for item in mix.split(','):
+        name, weight = item.split('=')
+        weights[name.strip()] = float(weight)
+    return weights
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(q / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def drive_traffic(base_url, users, topics, args):
+    """Run virtual users for the configured duration and collect per-route samples"""
+    mix = parse_mix(args.mix)
+    scenarios, weights = list(mix), list(mix.values())
+    samples = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+    deadline = time.monotonic() + args.duration
+
+    def worker(n):
+        rng = random.Random(n)
+        vu = VirtualUser(base_url, users[n % len(users)], users, topics, rng)
+        vu.login()
+        while time.monotonic() < deadline:
+            scenario = rng.choices(scenarios, weights)[0]
+            start = time.perf_counter()
+            try:
+                status = vu.run(scenario)
+            except Exception:
+                status = 599
+            elapsed = time.perf_counter() - start
+            with lock:
+                samples[scenario].append(elapsed)
+                if status >= 400:
+                    errors[scenario] += 1
+            if args.think_time:
+                time.sleep(rng.expovariate(1 / args.think_time))
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(args.concurrency)]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, errors, time.monotonic() - start
+
+
+def report(samples, errors, elapsed):
+    print(f"\n{'route':<14} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'errors':>7}")
+    total = 0
+    for scenario, latencies in sorted(samples.items()):
+        latencies.sort()
+        total += len(latencies)
+        print(f"{scenario:<14} {len(latencies):>9} {len(latencies) / elapsed:>8.1f} "
+              f"{percentile(latencies, 50) * 1000:>8.1f} {percentile(latencies, 95) * 1000:>8.1f} "
+              f"{percentile(latencies, 99) * 1000:>8.1f} {errors[scenario]:>7}")
+    all_latencies = sorted(l for latencies in samples.values() for l in latencies)
+    print(f"{'all':<14} {total:>9} {total / elapsed:>8.1f} "
+          f"{percentile(all_latencies, 50) * 1000:>8.1f} {percentile(all_latencies, 95) * 1000:>8.1f} "
+          f"{percentile(all_latencies, 99) * 1000:>8.1f} {sum(errors.values()):>7}")
+
+
+def drop_database(name):
+    if Config.DB_BACKEND == 'sqlite':
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(Config.SQLITE_PATH + suffix):
+                os.remove(Config.SQLITE_PATH + suffix)
+        return
+    import mysql.connector
+    conn = mysql.connector.connect(host=Config.DB_HOST, user=Config.DB_USER, password=Config.DB_PASSWORD)
+    try:
+        conn.cursor().execute(f"DROP DATABASE IF EXISTS `{name}`")
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db-name', default='eu4stats_loadtest',
+                        help='Scratch database to seed (must contain "loadtest")')
+    parser.add_argument('--backend', choices=['mysql', 'sqlite'], default=Config.DB_BACKEND)
+    parser.add_argument('--users', type=int, default=30)
+    parser.add_argument('--friends', type=int, default=5, help='Friend requests sent per user')
+    parser.add_argument('--files', type=int, default=3, help='Saves seeded per user')
+    parser.add_argument('--topics', type=int, default=20)
+    parser.add_argument('--posts', type=int, default=10, help='Replies seeded per topic')
+    parser.add_argument('--concurrency', type=int, default=16, help='Virtual users')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds of traffic')
+    parser.add_argument('--think-time', type=float, default=0, help='Mean pause between requests (s)')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'Route weights (default: {DEFAULT_MIX})')
+    parser.add_argument('--port', type=int, default=0, help='Local port (default: any free port)')
+    parser.add_argument('--keep-data', action='store_true', help='Keep the seeded database')
+    args = parser.parse_args()
+
+    if 'loadtest' not in args.db_name:
+        parser.error('--db-name must contain "loadtest"; it is dropped after the run')
+
+    # Point the app at the scratch database before anything connects
+    Config.DB_BACKEND = args.backend
+    Config.DB_NAME = args.db_name
+    Config.SQLITE_PATH = f"{args.db_name}.sqlite3"
+    Config.BCRYPT_ROUNDS = 4  # Seeding and logins shouldn't be dominated by bcrypt
+    Config.WARMUP_ENABLED = False
+
+    run_id = uuid.uuid4().hex[:6]
+    work_dir = tempfile.mkdtemp(prefix='eu4_loadtest_')
+    processed_dir = os.path.join(work_dir, 'processed')
+    os.makedirs(processed_dir)
+
+    from werkzeug.serving import make_server
+    from app import create_app
+
+    install_stubs(processed_dir)
+    app = create_app()
+    app.config['WTF_CSRF_ENABLED'] = False
+
+    try:
+        start = time.perf_counter()
+        users, topics = seed_data(args, run_id, work_dir)
+        print(f"Seeded {len(users)} users, {sum(len(u['files']) for u in users)} saves and "
+              f"{len(topics)} topics in {time.perf_counter() - start:.1f}s")
+
+        server = make_server('127.0.0.1', args.port, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_port}"
+        print(f"Driving {args.concurrency} virtual users against {base_url} for {args.duration:.0f}s")
+
+        samples, errors, elapsed = drive_traffic(base_url, users, topics, args)
+        server.shutdown()
+        report(samples, errors, elapsed)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+        if not args.keep_data:
+            drop_database(args.db_name)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""Login throughput benchmark for sizing BCRYPT_WORKERS
+
+Simulates a burst of concurrent logins (request threads verifying
+passwords) for several pool sizes and reports logins/s and latency.
+
+    python -m benchmarks.login_throughput --workers 0 1 2 4 --concurrency 16
+"""
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.password_service import PasswordService
+
+def run_burst(service, password_hash, logins, concurrency):
+    """Verify `logins` passwords from `concurrency` threads, returning per-login latencies"""
+    def login(_):
+        start = time.perf_counter()
+        assert service.verify('correct horse battery staple', password_hash)
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=concurrency) as request_threads:
+        return list(request_threads.map(login, range(logins)))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', type=int, nargs='+', default=[0, 1, 2, 4],
+                        help='Pool sizes to compare (0 = inline on the request thread)')
+    parser.add_argument('--rounds', type=int, help='bcrypt cost (default: BCRYPT_ROUNDS)')
+    parser.add_argument('--logins', type=int, default=64, help='Logins per burst')
+    parser.add_argument('--concurrency', type=int, default=16, help='Simultaneous request threads')
+    args = parser.parse_args()
+
+    service = PasswordService()
+    if args.rounds:
+        service.rounds = args.rounds
+    service.workers = 0
+    password_hash = service.hash('correct horse battery staple')
+
+    print(f"bcrypt cost {service.rounds}, {args.logins} logins, {args.concurrency} concurrent")
+    print(f"{'workers':>8} {'logins/s':>10} {'p50 ms':>8} {'p95 ms':>8}")
+    for workers in args.workers:
+        service.shutdown()
+        service.workers = workers
+        if workers:
+            # Warm the pool so process start-up isn't counted
+            run_burst(service, password_hash, workers, workers)
+
+        start = time.perf_counter()
+        latencies = run_burst(service, password_hash, args.logins, args.concurrency)
+        elapsed = time.perf_counter() - start
+
+        latencies.sort()
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        print(f"{workers:>8} {args.logins / elapsed:>10.1f} "
+              f"{statistics.median(latencies) * 1000:>8.1f} {p95 * 1000:>8.1f}")
+    service.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""Parser run benchmark
+
+Runs parser binaries on a save in a scratch directory and reports wall time
+and peak RSS per binary, so builds can be compared before and after a change
+to how the parser reads its input.
+
+    python -m benchmarks.parser_input --binary old/eu4_parser --binary eu4_parser.exe
+    python -m benchmarks.parser_input --save samples/mp_Byzantium1527_11_02.eu4 --runs 10
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def run_once(binary, save_path):
+    """Wall seconds and peak RSS in MiB of one parser run"""
+    with tempfile.TemporaryDirectory(prefix='eu4_parser_input_') as work_dir:
+        start = time.perf_counter()
+        proc = subprocess.Popen([binary, save_path, '1'], cwd=work_dir, stdout=subprocess.DEVNULL)
+        _, status, usage = os.wait4(proc.pid, 0)  # rusage of this child alone
+        elapsed = time.perf_counter() - start
+        if os.waitstatus_to_exitcode(status):
+            raise SystemExit(f"{binary} exited with {os.waitstatus_to_exitcode(status)}")
+        return elapsed, usage.ru_maxrss / 1024
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--binary', action='append', help='Parser binary to time (repeatable)')
+    parser.add_argument('--save', default=os.path.join(PROJECT_ROOT, 'samples', 'mp_Byzantium1527_11_02.eu4'))
+    parser.add_argument('--runs', type=int, default=5, help='Runs per binary')
+    args = parser.parse_args()
+
+    binaries = args.binary or [os.path.join(PROJECT_ROOT, 'eu4_parser.exe')]
+    save_path = os.path.abspath(args.save)
+    print(f"Save: {save_path} ({os.path.getsize(save_path) / 1e6:.1f} MB), {args.runs} runs each")
+    print(f"{'binary':<40} {'median s':>9} {'min s':>7} {'peak RSS MiB':>13}")
+    for binary in binaries:
+        binary = shutil.which(binary) or os.path.abspath(binary)
+        run_once(binary, save_path)  # Warm the page cache
+        results = [run_once(binary, save_path) for _ in range(args.runs)]
+        times = [t for t, _ in results]
+        print(f"{binary[-40:]:<40} {statistics.median(times):>9.3f} {min(times):>7.3f} "
+              f"{max(rss for _, rss in results):>13.1f}")
+
+if __name__ == '__main__':
+    main()
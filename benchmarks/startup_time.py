@@ -0,0 +1,70 @@
+"""App start-up benchmark
+
+Times fresh interpreters importing the app and running create_app(), and
+lists the slowest imports reported by `python -X importtime`.
+
+    python -m benchmarks.startup_time --runs 5
+    python -m benchmarks.startup_time --warm-up   # also time warm_up() (needs MySQL)
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STARTUP_SCRIPT = """
+import time
+start = time.perf_counter()
+from app import create_app
+create_app()
+print(time.perf_counter() - start)
+"""
+
+WARMUP_SCRIPT = """
+import json
+from app.warmup import warm_up
+print(json.dumps(warm_up()))
+"""
+
+def run_python(script, *flags):
+    return subprocess.run([sys.executable, *flags, '-c', script], cwd=PROJECT_ROOT,
+                          capture_output=True, text=True, check=True)
+
+def slowest_imports(stderr, top):
+    """Parse -X importtime output into (cumulative seconds, module), slowest first"""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, module = line.split(':', 1)[1].split('|')
+        imports.append((int(cumulative_us) / 1e6, module.strip()))
+    return sorted(imports, reverse=True)[:top]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters to time')
+    parser.add_argument('--top', type=int, default=15, help='Slowest imports to list')
+    parser.add_argument('--warm-up', action='store_true', help='Also time the warm-up phase')
+    args = parser.parse_args()
+
+    times = [float(run_python(STARTUP_SCRIPT).stdout.strip().splitlines()[-1])
+             for _ in range(args.runs)]
+    print(f"create_app() from a cold interpreter over {args.runs} runs: "
+          f"median {statistics.median(times) * 1000:.0f} ms, "
+          f"min {min(times) * 1000:.0f} ms, max {max(times) * 1000:.0f} ms")
+
+    print("\nSlowest imports (cumulative):")
+    for seconds, module in slowest_imports(run_python(STARTUP_SCRIPT, '-X', 'importtime').stderr, args.top):
+        print(f"{seconds * 1000:>8.1f} ms  {module}")
+
+    if args.warm_up:
+        print("\nWarm-up steps:")
+        timings = json.loads(run_python(WARMUP_SCRIPT).stdout.strip().splitlines()[-1])
+        for name, seconds in timings.items():
+            print(f"{seconds * 1000:>8.1f} ms  {name}")
+
+if __name__ == '__main__':
+    main()
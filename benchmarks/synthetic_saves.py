@@ -0,0 +1,92 @@
+"""Synthetic parser output for benchmarks and load tests
+
+Produces the output the Rust parser writes to processed/ (NDJSON records or
+a single JSON document), so the ingest path can be exercised without real
+.eu4 saves or the parser binary.
+"""
+import hashlib
+import json
+import random
+from typing import Any, Dict
+
+TAGS = ['FRA', 'ENG', 'CAS', 'POR', 'HAB', 'BRA', 'POL', 'MOS', 'TUR', 'VEN',
+        'SWE', 'DAN', 'MNG', 'MAM', 'TIM', 'BYZ', 'NED', 'PRU', 'SPA', 'GBR']
+EVENT_TYPES = ['Monarch', 'Heir', 'Queen', 'Leader', 'ChangedTagFrom', 'Capital', 'Decision']
+
+def synthetic_output(seed: str, countries: int = 6, start_year: int = 1444,
+                     end_year: int = 1600, events_per_country: int = 40,
+                     campaign_id: str = None, user_id: int = 1) -> Dict[str, Any]:
+    """Deterministic parser output for `seed` covering `start_year`..`end_year`"""
+    rng = random.Random(seed)
+    checksum = hashlib.sha256(seed.encode('utf-8')).hexdigest()
+    processed = []
+    for tag in rng.sample(TAGS, min(countries, len(TAGS))):
+        income = rng.uniform(50, 150)
+        annual_income = []
+        for year in range(start_year, end_year + 1):
+            income *= rng.uniform(0.98, 1.06)
+            annual_income.append({'year': str(year), 'income': round(income, 3)})
+
+        events = []
+        for _ in range(events_per_country):
+            event_type = rng.choice(EVENT_TYPES)
+            year = rng.randint(start_year, end_year)
+            date = f"{year}.{rng.randint(1, 12)}.{rng.randint(1, 28)}"
+            if event_type in ('Monarch', 'Heir', 'Queen'):
+                adm, dip, mil = (rng.randint(0, 6) for _ in range(3))
+                name = f"{rng.choice(['Karl', 'Louis', 'Henry', 'Ivan', 'Osman'])} {rng.randint(1, 20)}"
+                payload = {'kind': 'ruler', 'name': name, 'adm': adm, 'dip': dip, 'mil': mil}
+                details = f"Name: {name}, ADM: {adm}, DIP: {dip}, MIL: {mil}"
+            elif event_type == 'Capital':
+                province = rng.randint(1, 4000)
+                payload = {'kind': 'province', 'province_id': province}
+                details = f"Province: {province}"
+            else:
+                payload = {'kind': 'text', 'value': f"{event_type.lower()}_{rng.randint(1, 500)}"}
+                details = payload['value']
+            events.append({'date': date, 'event_type': event_type,
+                           'details': details, 'payload': payload})
+        events.sort(key=lambda e: tuple(int(p) for p in e['date'].split('.')))
+
+        processed.append({
+            'country_tag': tag,
+            'current_state': {
+                'date': f"{end_year}.1.1",
+                'income': [round(rng.uniform(0, 30), 2) for _ in range(18)],
+                'manpower': rng.uniform(1000, 50000),
+                'max_manpower': rng.uniform(50000, 100000),
+                'trade_income': rng.uniform(0, 100),
+                'annual_income': {e['year']: e['income'] for e in annual_income},
+                'map_color': [rng.randint(0, 255) for _ in range(3)],
+            },
+            'historical_events': events,
+            'annual_income': annual_income,
+        })
+
+    return {
+        'original_filename': f"{seed}.eu4",
+        'file_checksum': checksum,
+        'campaign_id': campaign_id or f"campaign-{seed}",
+        'game_date': f"{end_year:04d}-01-01",
+        'user_id': user_id,
+        'processed_data': processed,
+        'stage_timings_ms': {},
+    }
+
+def write_synthetic_output(path: str, seed: str, ndjson: bool = False, **kwargs) -> Dict[str, Any]:
+    """Write synthetic parser output to `path` and return it
+
+    `ndjson` writes the parser's record-per-line layout instead of one document.
+    """
+    output = synthetic_output(seed, **kwargs)
+    with open(path, 'w', encoding='utf-8') as f:
+        if not ndjson:
+            json.dump(output, f)
+            return output
+        header = {k: v for k, v in output.items() if k not in ('processed_data', 'stage_timings_ms')}
+        f.write(json.dumps({'record': 'header', **header}) + '\n')
+        for country in output['processed_data']:
+            f.write(json.dumps({'record': 'country', **country}) + '\n')
+        f.write(json.dumps({'record': 'footer', 'countries': len(output['processed_data']),
+                            'stage_timings_ms': output['stage_timings_ms']}) + '\n')
+    return output
@@ -0,0 +1,31 @@
+import argparse
+from dotenv import load_dotenv
+from pathlib import Path
+
+load_dotenv(Path(__file__).parent / '.env')
+
+from app.import_service import ImportService
+
+# Guarded: the import's worker processes are spawned and re-import this module
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Import a directory or S3 prefix of saves for one user')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--dir', help='Directory to import .eu4 saves from (recursively)')
+    source.add_argument('--s3-prefix', help='S3 key prefix in S3_BUCKET to import .eu4 saves from')
+    parser.add_argument('--user-id', type=int, required=True, help='User the imported files belong to')
+    parser.add_argument('--workers', type=int, help='Concurrent parses (default: IMPORT_WORKERS, '
+                                                    'or sized to cores and available memory)')
+    parser.add_argument('--batch-size', type=int, default=20, help='Files per write transaction')
+    parser.add_argument('--limit', type=int, help='Stop after this many files')
+    parser.add_argument('--restart', action='store_true', help='Ignore the checkpoint saved for this user and source')
+    args = parser.parse_args()
+
+    sources = ImportService.list_sources(directory=args.dir, s3_prefix=args.s3_prefix)
+    source_key = ImportService.source_key(directory=args.dir, s3_prefix=args.s3_prefix)
+    service = ImportService(args.user_id, source_key, workers=args.workers, batch_size=args.batch_size)
+    stats = service.run(sources, restart=args.restart, limit=args.limit)
+
+    print(f"Import complete with {stats['workers']} workers: {stats['imported']} imported, "
+          f"{stats['duplicates']} duplicates, {stats['failed']} failed of {len(sources)} saves "
+          f"in {stats['seconds']:.1f}s ({stats['files_per_second']:.2f} files/s, "
+          f"{stats['mb_per_second']:.1f} MB/s)")
@@ -1,42 +1,190 @@
+import argparse
+import colorsys
+import json
 import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-def parse_country_colors(countries_file, output_file):
-    country_colors = {}
-    
-    # Read the 00_countries.txt file to map tags to country files
-    with open(countries_file, 'r') as file:
-        for line in file:
-            if '=' in line and not line.strip().startswith('#'):
-                tag, country_file = line.split('=')
-                tag = tag.strip()
-                country_file = country_file.strip().strip('"')
-                country_colors[tag] = country_file
-    
-    # Now, parse each country file to extract the color
-    for tag, country_file in country_colors.items():
-        print(tag, " ", country_file)
-        if os.path.exists(country_file):
-            with open(country_file, 'r') as cf:
-                for line in cf:
-                    if line.strip().startswith('color = {'):
-                        # Extract the color values
-                        color = line.strip().split('{')[1].split('}')[0].strip()
-                        country_colors[tag] = color
-                        break
-    
-    # Write the results to the output file
+# Paradox script: comments, quoted strings, braces, operators and bare words
+TOKEN_RE = re.compile(r'#[^\n]*|"(?:[^"\\]|\\.)*"|[{}]|[<>!]?=|[<>]|[^\s{}=<>#"]+')
+TAG_RE = re.compile(r'^[A-Z][A-Z0-9]{2}$')
+
+def tokenize(text):
+    """Split Paradox script into tokens, dropping comments"""
+    for match in TOKEN_RE.finditer(text):
+        token = match.group()
+        if not token.startswith('#'):
+            yield token
+
+def parse_script(text):
+    """Parse Paradox script into nested lists of (key, value) pairs
+
+    Values are strings, lists of pairs for blocks, or ('rgb'/'hsv', block)
+    for tagged blocks such as `color = hsv { 0.5 0.4 0.8 }`. Bare values
+    inside a block (e.g. the numbers of a color) are stored with a key of None.
+    """
+    tokens = list(tokenize(text))
+    pos = 0
+
+    def parse_value():
+        nonlocal pos
+        token = tokens[pos]
+        pos += 1
+        if token == '{':
+            return parse_block()
+        if pos < len(tokens) and tokens[pos] == '{':
+            pos += 1
+            return (token.lower(), parse_block())
+        return token.strip('"')
+
+    def parse_block():
+        nonlocal pos
+        items = []
+        while pos < len(tokens):
+            token = tokens[pos]
+            if token == '}':
+                pos += 1
+                return items
+            if pos + 1 < len(tokens) and tokens[pos + 1] in ('=', '<', '>', '<=', '>=', '!='):
+                key = token.strip('"')
+                pos += 2
+                items.append((key, parse_value() if pos < len(tokens) else ''))
+            else:
+                items.append((None, parse_value()))
+        return items
+
+    return parse_block()
+
+def parse_color(value):
+    """Turn a parsed color value into an (r, g, b) tuple, validating its range"""
+    space = 'rgb'
+    if isinstance(value, tuple):
+        space, value = value
+    if not isinstance(value, list):
+        raise ValueError(f"color is not a block: {value!r}")
+    numbers = [float(v) for k, v in value if k is None and isinstance(v, str)]
+    if len(numbers) != 3:
+        raise ValueError(f"color needs 3 components, got {len(numbers)}")
+
+    if space == 'hsv':
+        numbers = [c * 255 for c in colorsys.hsv_to_rgb(*numbers)]
+    elif space != 'rgb':
+        raise ValueError(f"unsupported color space {space!r}")
+
+    color = tuple(int(round(c)) for c in numbers)
+    if any(not 0 <= c <= 255 for c in color):
+        raise ValueError(f"color out of range: {color}")
+    return color
+
+def read_script(path):
+    """Read a game file; Paradox files are usually Windows-1252, sometimes UTF-8 with BOM"""
+    with open(path, 'rb') as file:
+        data = file.read()
+    try:
+        return data.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        return data.decode('cp1252', errors='replace')
+
+def read_country_tags(tag_files, base_dir):
+    """Map tags to country file paths; later files override earlier ones like the game does"""
+    country_files = {}
+    for tag_file in tag_files:
+        for tag, country_file in parse_script(read_script(tag_file)):
+            if tag is None or not isinstance(country_file, str):
+                continue
+            country_files[tag] = os.path.join(base_dir or os.path.dirname(tag_file), country_file)
+    return country_files
+
+def extract_color(tag, country_file):
+    """Read one country file and return (tag, color, error)"""
+    try:
+        items = parse_script(read_script(country_file))
+    except OSError as e:
+        return tag, None, f"cannot read {country_file}: {e.strerror}"
+
+    for key, value in items:
+        if key == 'color':
+            try:
+                return tag, parse_color(value), None
+            except ValueError as e:
+                return tag, None, f"{country_file}: {e}"
+    return tag, None, f"{country_file}: no color block"
+
+def parse_country_colors(tag_files, base_dir=None, workers=8):
+    """Extract every country's color in parallel, returning (colors, errors)"""
+    country_files = read_country_tags(tag_files, base_dir)
+
+    colors = {}
+    errors = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for tag, color, error in executor.map(lambda item: extract_color(*item),
+                                              country_files.items()):
+            if not TAG_RE.match(tag):
+                errors.append(f"{tag}: invalid country tag")
+            elif error:
+                errors.append(f"{tag}: {error}")
+            else:
+                colors[tag] = color
+    return colors, errors
+
+def write_color_table(country_colors, output_file):
+    """Write the colors as an importable Python module"""
+    with open(output_file, 'w') as outfile:
+        outfile.write("# Generated by generate_country_colors.py - do not edit by hand.\n")
+        outfile.write("COUNTRY_COLORS = {\n")
+        for tag, (r, g, b) in sorted(country_colors.items()):
+            outfile.write(f"    {tag!r}: ({r}, {g}, {b}),\n")
+        outfile.write("}\n")
+
+def write_color_json(country_colors, output_file):
+    """Write the colors as a JSON object of tag -> [r, g, b]"""
     with open(output_file, 'w') as outfile:
-        for tag, color in country_colors.items():
-            outfile.write(f"{tag} = {color}\n")
+        json.dump({tag: list(color) for tag, color in sorted(country_colors.items())},
+                  outfile, separators=(',', ':'))
+
+def collect_tag_files(paths):
+    """Expand directories (e.g. common/country_tags) into their .txt files in load order"""
+    tag_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            tag_files.extend(sorted(os.path.join(path, name) for name in os.listdir(path)
+                                    if name.endswith('.txt')))
+        else:
+            tag_files.append(path)
+    return tag_files
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the country color table from EU4 game data')
+    parser.add_argument('tag_files', nargs='*', default=['00_countries.txt'],
+                        help='country_tags files or directories (default: 00_countries.txt)')
+    parser.add_argument('--base-dir', help='Directory country file paths are relative to '
+                                           '(default: the directory of each tag file)')
+    parser.add_argument('--workers', type=int, default=8, help='Country files read in parallel')
+    parser.add_argument('--format', choices=['py', 'json'], default='py', help='Output format')
+    parser.add_argument('--output', help='Output file (default: app/country_color_table.py, '
+                                         'or country_colors.json for --format json)')
+    parser.add_argument('--strict', action='store_true',
+                        help='Fail instead of writing a table when any country is invalid')
+    args = parser.parse_args()
 
-# Path to the 00_countries.txt file
-countries_file = '00_countries.txt'
-# Output file to store the country colors
-output_file = 'country_colors.txt'
+    output_file = args.output or (os.path.join('app', 'country_color_table.py')
+                                  if args.format == 'py' else 'country_colors.json')
 
-# Generate the country colors file
-parse_country_colors(countries_file, output_file)
+    start = time.perf_counter()
+    colors, errors = parse_country_colors(collect_tag_files(args.tag_files),
+                                          args.base_dir, args.workers)
+    elapsed = time.perf_counter() - start
 
-print(f"Country colors have been written to {output_file}")
+    for error in errors:
+        print(f"warning: {error}")
+    if not colors or (errors and args.strict):
+        raise SystemExit(f"Not writing {output_file}: {len(errors)} invalid countries")
 
+    if args.format == 'json':
+        write_color_json(colors, output_file)
+    else:
+        write_color_table(colors, output_file)
 
+    print(f"Wrote {len(colors)} country colors to {output_file} in {elapsed:.2f}s "
+          f"({len(errors)} skipped)")
@@ -0,0 +1,30 @@
+import argparse
+import time
+from dotenv import load_dotenv
+from pathlib import Path
+
+load_dotenv(Path(__file__).parent / '.env')
+
+from app.reaper_service import ReaperService
+
+parser = argparse.ArgumentParser(description='Delete orphaned S3 objects, processed/ artifacts and data rows')
+parser.add_argument('--batch-size', type=int, help='Keys, files or rows per delete (default: REAPER_BATCH_SIZE)')
+parser.add_argument('--rate', type=float, help='Delete batches per second, 0 for no limit '
+                                               '(default: REAPER_BATCHES_PER_SECOND)')
+parser.add_argument('--grace', type=int, help='Leave anything newer than this many seconds '
+                                              '(default: REAPER_GRACE_SECONDS)')
+parser.add_argument('--interval', type=float, help='Keep running, starting a pass every INTERVAL seconds')
+parser.add_argument('--dry-run', action='store_true', help='Report what would be deleted')
+args = parser.parse_args()
+
+service = ReaperService(batch_size=args.batch_size, rate=args.rate,
+                        grace_seconds=args.grace, dry_run=args.dry_run)
+while True:
+    stats = service.run()
+    rows = ', '.join(f"{table}={count}" for table, count in stats['rows'].items())
+    print(f"Reaper {'dry run' if args.dry_run else 'pass'} complete in {stats['seconds']:.1f}s: "
+          f"{stats['s3_objects']} S3 objects, {stats['artifacts']} artifacts, "
+          f"{'orphaned checksums' if args.dry_run else 'rows'}: {rows}")
+    if not args.interval:
+        break
+    time.sleep(max(0.0, args.interval - stats['seconds']))
@@ -10,11 +10,5 @@ load_dotenv(env_path)
 
 app = create_app()
 
-@app.template_filter('datetimeformat')
-def datetimeformat(value, format='%Y-%m-%d %H:%M:%S'):
-    if value is None:
-        return ""
-    return value.strftime(format)
-
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
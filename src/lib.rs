@@ -9,6 +9,7 @@ pub struct CurrentState {
     pub max_manpower: f64,
     pub trade_income: f64,
     pub annual_income: BTreeMap<String, f64>,
+    pub map_color: Vec<u8>,
 }
 
 #[derive(Serialize, Deserialize, Debug)]
@@ -16,6 +17,20 @@ pub struct HistoricalEvent {
     pub date: String,
     pub event_type: String,
     pub details: String,
+    pub payload: EventPayload,
+}
+
+/// Typed event data, serialized as a compact JSON object tagged by `kind`
+/// so the web app can store stats in columns instead of parsing `details`.
+#[derive(Serialize, Deserialize, Debug, PartialEq)]
+#[serde(tag = "kind", rename_all = "snake_case")]
+pub enum EventPayload {
+    Ruler { name: String, adm: u16, dip: u16, mil: u16 },
+    Leader { name: String, leader_kind: String },
+    Province { province_id: u16 },
+    Text { value: String },
+    Color { rgb: Vec<u8> },
+    Empty,
 }
 
 pub mod parser;
@@ -33,10 +48,29 @@ mod tests {
             max_manpower: 1500.0,
             trade_income: 50.0,
             annual_income: [("1444".to_string(), 120.0)].iter().cloned().collect(),
+            map_color: vec![40, 120, 200],
         };
 
         let serialized = serde_json::to_string(&state).unwrap();
         assert!(serialized.contains("\"date\":\"1444.11.11\""));
+        assert!(serialized.contains("\"map_color\":[40,120,200]"));
         assert!(serialized.contains("\"manpower\":1000.0"));
     }
+
+    #[test]
+    fn test_event_payload_serialization() {
+        let payload = EventPayload::Ruler {
+            name: "Test".to_string(),
+            adm: 3,
+            dip: 4,
+            mil: 5,
+        };
+
+        let serialized = serde_json::to_string(&payload).unwrap();
+        assert_eq!(
+            serialized,
+            "{\"kind\":\"ruler\",\"name\":\"Test\",\"adm\":3,\"dip\":4,\"mil\":5}"
+        );
+        assert_eq!(serde_json::to_string(&EventPayload::Empty).unwrap(), "{\"kind\":\"empty\"}");
+    }
 }
\ No newline at end of file
@@ -1,19 +1,76 @@
 mod parser;
 
-use eu4_parser::{CurrentState, HistoricalEvent};
+use eu4_parser::{CurrentState, EventPayload, HistoricalEvent};
 use serde::Serialize;
+use std::collections::BTreeMap;
 use std::error::Error;
 use std::fs::File;
-use std::io::Write;
+use std::io::{BufWriter, Write};
 use std::path::{Path, PathBuf};
+use std::time::Instant;
 use std::{env, fs};
 
+/// Output layout: NDJSON (the default) streams one record per line so
+/// neither the parser nor the ingest side holds every country at once;
+/// `--format json` writes the older single pretty-printed document.
+#[derive(Clone, Copy, PartialEq)]
+pub enum OutputFormat {
+    Ndjson,
+    Json,
+}
+
+/// NDJSON records, tagged with a "record" field
+#[derive(Serialize)]
+#[serde(tag = "record", rename_all = "snake_case")]
+enum OutputRecord<'a> {
+    Header {
+        original_filename: &'a str,
+        file_checksum: &'a str,
+        campaign_id: &'a str,
+        game_date: &'a str,
+        user_id: i64,
+    },
+    Country(&'a CountryData),
+    Footer {
+        countries: usize,
+        stage_timings_ms: &'a BTreeMap<String, f64>,
+    },
+}
+
+fn write_record<W: Write>(writer: &mut W, record: &OutputRecord) -> Result<(), Box<dyn Error>> {
+    serde_json::to_writer(&mut *writer, record)?;
+    writer.write_all(b"\n")?;
+    Ok(())
+}
+
 #[derive(Serialize)]
 struct OutputData {
     original_filename: String,
     file_checksum: String,
+    campaign_id: String,
+    game_date: String,
     user_id: i64,
     processed_data: Vec<CountryData>,
+    stage_timings_ms: BTreeMap<String, f64>,
+}
+
+/// Records how long each parser stage took, reported in the output JSON
+struct StageTimer {
+    stage_start: Instant,
+    timings: BTreeMap<String, f64>,
+}
+
+impl StageTimer {
+    fn new() -> Self {
+        StageTimer { stage_start: Instant::now(), timings: BTreeMap::new() }
+    }
+
+    /// Ends the current stage under `name` and starts the next one
+    fn lap(&mut self, name: &str) {
+        let elapsed = self.stage_start.elapsed().as_secs_f64() * 1000.0;
+        self.timings.insert(name.to_string(), elapsed);
+        self.stage_start = Instant::now();
+    }
 }
 
 #[derive(Serialize)]
@@ -30,7 +87,7 @@ struct AnnualIncomeEntry {
     income: f64,
 }
 
-pub async fn run(path: &str, user_id: i64) -> Result<(), Box<dyn Error>> {
+pub async fn run(path: &str, user_id: i64, format: OutputFormat) -> Result<(), Box<dyn Error>> {
     println!("[DEBUG] Starting file processing for: {}", path);
 
     // Create processed directory if it doesn't exist
@@ -40,12 +97,15 @@ pub async fn run(path: &str, user_id: i64) -> Result<(), Box<dyn Error>> {
         println!("[DEBUG] Created processed directory");
     }
 
-    let data = fs::read(path)?;
-    println!("[DEBUG] File read successfully, size: {} bytes", data.len());
-    
-    let checksum = parser::calculate_checksum(&data);
-    println!("[DEBUG] Calculated checksum: {}", checksum);
-    
+    let mut timer = StageTimer::new();
+    let data = parser::SaveInput::open(path)?;
+    timer.lap("read");
+    println!(
+        "[DEBUG] File {} successfully, size: {} bytes",
+        if matches!(data, parser::SaveInput::Mapped(_)) { "mapped" } else { "read" },
+        data.len()
+    );
+
     let source_file = PathBuf::from(path);
     let file_name = source_file.file_name()
         .unwrap()
@@ -53,18 +113,31 @@ pub async fn run(path: &str, user_id: i64) -> Result<(), Box<dyn Error>> {
         .unwrap()
         .to_string();
 
+    println!("[DEBUG] Starting processing for file: {}", file_name);
+
+    // Parse the save file, hashing it on a second thread meanwhile
+    println!("[DEBUG] Parsing save file...");
+    let (parsed, (checksum, checksum_ms)) = std::thread::scope(|scope| {
+        let hasher = scope.spawn(|| {
+            let start = Instant::now();
+            (parser::calculate_checksum(&data), start.elapsed().as_secs_f64() * 1000.0)
+        });
+        let parsed = parser::parse_save_file(&data);
+        (parsed, hasher.join().expect("checksum thread panicked"))
+    });
+    let (save, save_query, _tokens) = parsed?;
+    timer.lap("parse");
+    timer.timings.insert("checksum".to_string(), checksum_ms); // Overlaps "parse"
+    println!("[DEBUG] Calculated checksum: {}", checksum);
+
     // Generate unique output filename with checksum
     let output_filename = format!(
-        "{}_{}.json",
+        "{}_{}.{}",
         source_file.file_stem().unwrap().to_str().unwrap(),
-        &checksum[0..8] // Using first 8 chars of checksum for brevity
+        &checksum[0..8], // Using first 8 chars of checksum for brevity
+        if format == OutputFormat::Ndjson { "ndjson" } else { "json" }
     );
-
-    println!("[DEBUG] Starting processing for file: {}", file_name);
-
-    // Parse the save file
-    println!("[DEBUG] Parsing save file...");
-    let (save, save_query, _tokens) = parser::parse_save_file(&data)?;
+    let json_output_path = processed_dir.join(&output_filename);
 
     println!("[DEBUG] Processing file: {}", file_name);
     println!("[DEBUG] Player tag: {}", save.meta.player);
@@ -73,6 +146,7 @@ pub async fn run(path: &str, user_id: i64) -> Result<(), Box<dyn Error>> {
     let province_owners = save_query.province_owners();
     let nation_events = save_query.nation_events(&province_owners);
     let player_histories = save_query.player_histories(&nation_events);
+    timer.lap("query");
     println!("[DEBUG] Found {} player histories", player_histories.len());
 
     if player_histories.is_empty() {
@@ -82,9 +156,34 @@ pub async fn run(path: &str, user_id: i64) -> Result<(), Box<dyn Error>> {
     let mut output_data = OutputData {
         original_filename: file_name.clone(),
         file_checksum: checksum,
+        campaign_id: save.meta.campaign_id.clone(),
+        game_date: format!(
+            "{:04}-{:02}-{:02}",
+            save.meta.date.year(),
+            save.meta.date.month(),
+            save.meta.date.day()
+        ),
         user_id,
         processed_data: Vec::new(),
+        stage_timings_ms: BTreeMap::new(),
+    };
+
+    // NDJSON: write the header now and each country as soon as it is extracted
+    let mut ndjson = match format {
+        OutputFormat::Ndjson => {
+            let mut writer = BufWriter::new(File::create(&json_output_path)?);
+            write_record(&mut writer, &OutputRecord::Header {
+                original_filename: &output_data.original_filename,
+                file_checksum: &output_data.file_checksum,
+                campaign_id: &output_data.campaign_id,
+                game_date: &output_data.game_date,
+                user_id,
+            })?;
+            Some(writer)
+        }
+        OutputFormat::Json => None,
     };
+    let mut countries_written = 0;
 
     for player_history in player_histories {
         let country_tag = player_history.history.latest.to_string();
@@ -127,12 +226,17 @@ pub async fn run(path: &str, user_id: i64) -> Result<(), Box<dyn Error>> {
                     })
                     .collect();
 
-                output_data.processed_data.push(CountryData {
+                let country_data = CountryData {
                     country_tag: country_tag.clone(),
                     current_state,
                     historical_events,
                     annual_income,
-                });
+                };
+                match ndjson.as_mut() {
+                    Some(writer) => write_record(writer, &OutputRecord::Country(&country_data))?,
+                    None => output_data.processed_data.push(country_data),
+                }
+                countries_written += 1;
 
                 println!("[DEBUG] Successfully processed data for {}", country_tag);
             }
@@ -142,20 +246,35 @@ pub async fn run(path: &str, user_id: i64) -> Result<(), Box<dyn Error>> {
         }
     }
 
-    // Create destination paths
-    let json_output_path = processed_dir.join(&output_filename);
+    timer.lap("extract");
+    output_data.stage_timings_ms = timer.timings;
+
     let file_copy_path = processed_dir.join(&file_name);
 
-    // Write output to JSON file
-    let mut file = File::create(&json_output_path)?;
-    let json = serde_json::to_string_pretty(&output_data)?;
-    file.write_all(json.as_bytes())?;
+    match ndjson {
+        Some(mut writer) => {
+            write_record(&mut writer, &OutputRecord::Footer {
+                countries: countries_written,
+                stage_timings_ms: &output_data.stage_timings_ms,
+            })?;
+            writer.flush()?;
+        }
+        None => {
+            // Write output to JSON file
+            let mut file = File::create(&json_output_path)?;
+            let json = serde_json::to_string_pretty(&output_data)?;
+            file.write_all(json.as_bytes())?;
+        }
+    }
 
-    // Copy original file to processed directory
-    fs::copy(path, &file_copy_path)?;
+    // Copy original file to processed directory; a stream can only be written from memory
+    match &data {
+        parser::SaveInput::Mapped(_) => { fs::copy(path, &file_copy_path)?; }
+        parser::SaveInput::Buffered(bytes) => fs::write(&file_copy_path, bytes)?,
+    }
 
     println!("\n[SUCCESS] Processing complete:");
-    println!("- Countries processed: {}", output_data.processed_data.len());
+    println!("- Countries processed: {}", countries_written);
     println!("- Original file copied to: {}", file_copy_path.display());
     println!("- JSON output written to: {}", json_output_path.display());
 
@@ -168,14 +287,19 @@ async fn main() -> Result<(), Box<dyn std::error::Error>> {
     println!("[START] Program started with args: {:?}", args);
 
     if args.len() < 3 {
-        eprintln!("Usage: {} <file_path> <user_id>", args[0]);
+        eprintln!("Usage: {} <file_path> <user_id> [--format ndjson|json]", args[0]);
         return Ok(());
     }
 
     let file_path = &args[1];
     let user_id: i64 = args[2].parse()?;
+    let format = match args.iter().position(|a| a == "--format").and_then(|i| args.get(i + 1)) {
+        Some(f) if f == "json" => OutputFormat::Json,
+        Some(f) if f != "ndjson" => return Err(format!("Unknown output format: {}", f).into()),
+        _ => OutputFormat::Ndjson,
+    };
 
-    run(file_path, user_id).await
+    run(file_path, user_id, format).await
 }
 
 #[tokio::test]
@@ -187,7 +311,7 @@ async fn test_run_with_real_file() {
     let _ = std::fs::remove_dir_all("processed");
 
     // Run the processor
-    let result = run(path, 1).await;
+    let result = run(path, 1, OutputFormat::Json).await;
     assert!(result.is_ok(), "Failed to process real save file: {:?}", result.err());
 
     // Verify output was created by checking for any JSON file with the expected prefix
@@ -219,4 +343,19 @@ async fn test_run_with_real_file() {
 
     // Clean up
     let _ = std::fs::remove_dir_all("processed");
-}
\ No newline at end of file
+}
+#[test]
+fn test_ndjson_records_are_tagged_lines() {
+    let timings = BTreeMap::from([("parse".to_string(), 1.5)]);
+    let mut buf = Vec::new();
+    write_record(&mut buf, &OutputRecord::Footer { countries: 2, stage_timings_ms: &timings }).unwrap();
+
+    let line = String::from_utf8(buf).unwrap();
+    assert!(line.ends_with('\n'));
+    assert_eq!(line.matches('\n').count(), 1);
+
+    let value: serde_json::Value = serde_json::from_str(&line).unwrap();
+    assert_eq!(value["record"], "footer");
+    assert_eq!(value["countries"], 2);
+    assert_eq!(value["stage_timings_ms"]["parse"], 1.5);
+}
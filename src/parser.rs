@@ -1,9 +1,54 @@
-use crate::{CurrentState, HistoricalEvent};
+use crate::{CurrentState, EventPayload, HistoricalEvent};
 use eu4save::models::{CountryEvent, Eu4Save};
 use eu4save::query::Query;
 use eu4save::{Eu4File, SegmentedResolver};
+use memmap2::Mmap;
 use sha2::{Digest, Sha256};
 use std::error::Error;
+use std::fmt::{self, Write};
+use std::fs::File;
+use std::io::Read;
+use std::ops::Deref;
+
+/// A save's bytes: memory-mapped when the input is a regular file, so large
+/// saves are paged in from the page cache instead of copied onto the heap,
+/// and read into memory for pipes and other streams that cannot be mapped
+pub enum SaveInput {
+    Mapped(Mmap),
+    Buffered(Vec<u8>),
+}
+
+impl SaveInput {
+    pub fn open(path: &str) -> std::io::Result<Self> {
+        let mut file = File::open(path)?;
+        if file.metadata()?.is_file() {
+            // Safety: the web tier writes the upload in full before starting the
+            // parser and nothing modifies it while we run
+            match unsafe { Mmap::map(&file) } {
+                Ok(map) => {
+                    #[cfg(unix)]
+                    let _ = map.advise(memmap2::Advice::Sequential);
+                    return Ok(SaveInput::Mapped(map));
+                }
+                Err(e) => println!("[WARN] Could not map {}, reading it instead: {}", path, e),
+            }
+        }
+        let mut data = Vec::new();
+        file.read_to_end(&mut data)?;
+        Ok(SaveInput::Buffered(data))
+    }
+}
+
+impl Deref for SaveInput {
+    type Target = [u8];
+
+    fn deref(&self) -> &[u8] {
+        match self {
+            SaveInput::Mapped(map) => &map[..],
+            SaveInput::Buffered(data) => &data[..],
+        }
+    }
+}
 
 /// Parses EU4 save file and returns parsed data structures
 pub fn parse_save_file(data: &[u8]) -> Result<(Eu4Save, Query, SegmentedResolver), Box<dyn Error>> {
@@ -32,6 +77,7 @@ pub fn extract_current_state(
     let manpower = country.manpower;
     let max_manpower = country.max_manpower;
     let trade_income = income_breakdown.trade;
+    let map_color = country.colors.map_color.iter().map(|c| *c as u8).collect();
 
     // Group income data by year and calculate annual income
     let mut annual_income = std::collections::BTreeMap::new();
@@ -51,6 +97,7 @@ pub fn extract_current_state(
         max_manpower: max_manpower as f64,
         trade_income: trade_income as f64,
         annual_income,
+        map_color,
     })
 }
 
@@ -58,65 +105,121 @@ pub fn extract_current_state(
 pub fn extract_historical_events(
     events: &[(eu4save::Eu4Date, eu4save::models::CountryEvent)],
 ) -> Vec<HistoricalEvent> {
-    let mut historical_events = Vec::new();
+    let mut historical_events = Vec::with_capacity(events.len());
 
     for (date, event) in events {
-        let (event_type, details) = match event {
-            CountryEvent::Monarch(monarch) => (
-                "Monarch",
-                format!(
-                    "Name: {}, Dip: {}, Adm: {}, Mil: {}",
-                    monarch.name, monarch.dip, monarch.adm, monarch.mil
-                ),
+        let (event_type, payload) = match event {
+            CountryEvent::Monarch(monarch) => ("Monarch".to_string(), ruler_payload(monarch)),
+            CountryEvent::Heir(heir) => ("Heir".to_string(), ruler_payload(heir)),
+            CountryEvent::Queen(queen) => ("Queen".to_string(), ruler_payload(queen)),
+            CountryEvent::Leader(leader) => (
+                "Leader".to_string(),
+                EventPayload::Leader {
+                    name: leader.name.clone(),
+                    leader_kind: format!("{:?}", leader.kind),
+                },
             ),
-            CountryEvent::Heir(heir) => (
-                "Heir",
-                format!(
-                    "Name: {}, Dip: {}, Adm: {}, Mil: {}",
-                    heir.name, heir.dip, heir.adm, heir.mil
-                ),
+            CountryEvent::Capital(province_id) => (
+                "Capital".to_string(),
+                EventPayload::Province {
+                    province_id: province_id.as_u16(),
+                },
             ),
-            CountryEvent::Leader(leader) => (
-                "Leader",
-                format!("Name: {}, Kind: {:?}", leader.name, leader.kind),
+            CountryEvent::ChangedCountryNameFrom(name) => (
+                "ChangedCountryNameFrom".to_string(),
+                EventPayload::Text { value: name.to_string() },
             ),
-            CountryEvent::Capital(province_id) => {
-                ("Capital", format!("Province ID: {}", province_id))
-            }
-            CountryEvent::ChangedCountryNameFrom(name) => {
-                ("ChangedCountryNameFrom", format!("From: {}", name))
-            }
             CountryEvent::ChangedCountryAdjectiveFrom(adjective) => (
-                "ChangedCountryAdjectiveFrom",
-                format!("From: {}", adjective),
+                "ChangedCountryAdjectiveFrom".to_string(),
+                EventPayload::Text { value: adjective.to_string() },
             ),
-            CountryEvent::ChangedCountryMapColorFrom(color) => {
-                ("ChangedCountryMapColorFrom", format!("From: {:?}", color))
-            }
-            CountryEvent::Queen(queen) => (
-                "Queen",
-                format!(
-                    "Name: {}, Dip: {}, Adm: {}, Mil: {}",
-                    queen.name, queen.dip, queen.adm, queen.mil
-                ),
+            CountryEvent::ChangedCountryMapColorFrom(color) => (
+                "ChangedCountryMapColorFrom".to_string(),
+                EventPayload::Color {
+                    rgb: color.iter().map(|c| *c as u8).collect(),
+                },
             ),
-            CountryEvent::NationalFocus(focus) => ("NationalFocus", format!("Focus: {:?}", focus)),
-            CountryEvent::AddAcceptedCulture(culture) => {
-                ("AddAcceptedCulture", format!("Culture: {}", culture))
-            }
-            _ => ("Unknown", format!("{:?}", event)),
+            CountryEvent::NationalFocus(focus) => (
+                "NationalFocus".to_string(),
+                EventPayload::Text { value: format!("{:?}", focus) },
+            ),
+            CountryEvent::AddAcceptedCulture(culture) => (
+                "AddAcceptedCulture".to_string(),
+                EventPayload::Text { value: culture.to_string() },
+            ),
+            // Only the variant name is kept for events we don't extract; the
+            // full Debug dump was large and nobody read it.
+            _ => (variant_name(event), EventPayload::Empty),
         };
 
         historical_events.push(HistoricalEvent {
             date: format!("{:?}", date),
-            event_type: event_type.to_string(),
-            details,
+            details: describe_payload(&event_type, &payload),
+            event_type,
+            payload,
         });
     }
 
     historical_events
 }
 
+fn ruler_payload(monarch: &eu4save::models::Monarch) -> EventPayload {
+    EventPayload::Ruler {
+        name: monarch.name.clone(),
+        adm: monarch.adm as u16,
+        dip: monarch.dip as u16,
+        mil: monarch.mil as u16,
+    }
+}
+
+/// Human readable summary of a payload, shown in the events table. The text
+/// must stay byte-for-byte what earlier releases produced: campaign dedupe
+/// compares it against rows written by older saves.
+fn describe_payload(event_type: &str, payload: &EventPayload) -> String {
+    match payload {
+        EventPayload::Ruler { name, adm, dip, mil } => {
+            format!("Name: {}, Dip: {}, Adm: {}, Mil: {}", name, dip, adm, mil)
+        }
+        EventPayload::Leader { name, leader_kind } => {
+            format!("Name: {}, Kind: {}", name, leader_kind)
+        }
+        EventPayload::Province { province_id } => format!("Province ID: {}", province_id),
+        EventPayload::Text { value } => match event_type {
+            "NationalFocus" => format!("Focus: {}", value),
+            "AddAcceptedCulture" => format!("Culture: {}", value),
+            _ => format!("From: {}", value),
+        },
+        EventPayload::Color { rgb } => format!("From: {:?}", rgb),
+        EventPayload::Empty => String::new(),
+    }
+}
+
+/// Writer that keeps the leading identifier of a Debug representation and
+/// aborts formatting as soon as the variant name is complete.
+struct VariantName(String);
+
+impl fmt::Write for VariantName {
+    fn write_str(&mut self, s: &str) -> fmt::Result {
+        for c in s.chars() {
+            if !(c.is_alphanumeric() || c == '_') {
+                return Err(fmt::Error);
+            }
+            self.0.push(c);
+        }
+        Ok(())
+    }
+}
+
+fn variant_name(event: &CountryEvent) -> String {
+    let mut name = VariantName(String::new());
+    let _ = write!(name, "{:?}", event);
+    if name.0.is_empty() {
+        "Unknown".to_string()
+    } else {
+        name.0
+    }
+}
+
 /// Utility function to calculate file checksum
 pub fn calculate_checksum(data: &[u8]) -> String {
     let mut hasher = Sha256::new();
@@ -137,6 +240,17 @@ mod tests {
         assert_eq!(checksum.len(), 64);
     }
 
+    #[test]
+    fn test_save_input_maps_regular_files() {
+        let mut file = tempfile::NamedTempFile::new().unwrap();
+        std::io::Write::write_all(&mut file, b"EU4txt\ndate=1444.11.11").unwrap();
+
+        let input = SaveInput::open(file.path().to_str().unwrap()).unwrap();
+        assert!(matches!(input, SaveInput::Mapped(_)));
+        assert_eq!(&*input, b"EU4txt\ndate=1444.11.11");
+        assert_eq!(calculate_checksum(&input), calculate_checksum(b"EU4txt\ndate=1444.11.11"));
+    }
+
     #[test]
     fn test_extract_historical_events_empty() {
         let events = vec![];
@@ -169,6 +283,10 @@ mod tests {
         assert_eq!(result.len(), 1);
         assert_eq!(result[0].event_type, "Monarch");
         assert!(result[0].details.contains("Name: Test"));
+        assert_eq!(
+            result[0].payload,
+            EventPayload::Ruler { name: "Test".to_string(), adm: 3, dip: 3, mil: 3 }
+        );
     }
 
     #[test]
@@ -181,6 +299,7 @@ mod tests {
             max_manpower: 1500.0,
             trade_income: 50.0,
             annual_income: [("1444".to_string(), 120.0)].iter().cloned().collect(),
+            map_color: vec![40, 120, 200],
         };
 
         assert_eq!(result.date, "1444.11.11");